@@ -0,0 +1,271 @@
+# -*- coding: utf-8 -*-
+"""
+  aio.py
+  Author : Jacek 'Szumak' Kotlarski --<szumak@virthost.pl>
+  Created: 17.10.2026, 07:41:15
+
+  Purpose: Asyncio conversion API for many concurrent conversions.
+
+  Input bytes are split into batches of lines, every batch is parsed and
+  sorted in executor. At the end sorted batches are merged lazily and
+  converted in chunks in executor, so the event loop is never blocked
+  for the time of converting the whole export:
+
+      async for kind, text in convert_stream(upload):
+          ...
+"""
+
+import asyncio, heapq
+
+from collections import deque
+from concurrent.futures import Executor
+from itertools import islice
+from operator import attrgetter
+from typing import (
+    AsyncIterable,
+    AsyncIterator,
+    Deque,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+from jsktoolbox.attribtool import ReadOnlyClass
+
+from libs.base import BMiles
+from libs.conversion import parse_batch
+from libs.formatter import (
+    COST_CSV_HEADER,
+    FUELING_CSV_HEADER,
+    format_cost,
+    format_fuel,
+)
+from libs.model import MotoStatRecord
+from libs.reader import RecordSplitter
+from libs.streaming import COST, FUEL
+
+# number of lines parsed at once
+BATCH_SIZE: int = 1000
+
+# maximum number of batches in progress of a single conversion
+DEPTH: int = 2
+
+# number of records converted at once
+CHUNK_SIZE: int = 5000
+
+# maximum size of a single record in bytes
+RECORD_LIMIT: int = 1024 * 1024
+
+# sort key of records
+_KEY = attrgetter("key")
+
+
+class _Keys(object, metaclass=ReadOnlyClass):
+    """Internal Keys container class."""
+
+    BATCH: str = "__batch__"
+    BATCH_SIZE: str = "__batch_size__"
+    COUNT: str = "__count__"
+    DEPTH: str = "__depth__"
+    ERRORS: str = "__errors__"
+    EXECUTOR: str = "__executor__"
+    PENDING: str = "__pending__"
+    RECORD_LIMIT: str = "__record_limit__"
+    RUNS: str = "__runs__"
+    SPLITTER: str = "__splitter__"
+
+
+def _parse_sorted(
+    lines: List[str], miles: bool, row: int
+) -> Tuple[List[MotoStatRecord], List[str]]:
+    """Returns records of batch in output order and messages about skipped rows."""
+    records, errors = parse_batch(lines, miles, row)
+    records.sort(key=_KEY, reverse=True)
+    return records, errors
+
+
+def _convert_chunk(records: List[MotoStatRecord]) -> Tuple[List[str], List[str]]:
+    """Returns cost and fuel csv lines of sorted records."""
+    costs: List[str] = []
+    fuels: List[str] = []
+    for record in records:
+        if record.cost_id:
+            costs.append(format_cost(record))
+        if record.fuel_id:
+            fuels.append(format_fuel(record))
+    return costs, fuels
+
+
+class AsyncConversion(BMiles):
+    """Incremental conversion of motostat export fed with bytes.
+
+    Buffered input is limited to a batch of lines, an incomplete record
+    and 'depth' batches in executor; feed() waits for the oldest batch
+    when the limit is reached, so a fast producer is slowed down to the
+    speed of parsing.
+    """
+
+    def __init__(
+        self,
+        miles: bool = False,
+        executor: Optional[Executor] = None,
+        batch_size: int = BATCH_SIZE,
+        depth: int = DEPTH,
+        record_limit: int = RECORD_LIMIT,
+    ) -> None:
+        """Constructor.
+
+        ### Arguments:
+        - miles [bool] - mileage in miles flag.
+        - executor [Optional[Executor]] - executor for parsing and conversion,
+          default executor of the event loop if None.
+        - batch_size [int] - number of lines parsed at once.
+        - depth [int] - maximum number of batches in executor.
+        - record_limit [int] - maximum size of a single record in bytes.
+        """
+        self.miles = miles
+        self._set_data(key=_Keys.EXECUTOR, value=executor)
+        self._set_data(key=_Keys.BATCH_SIZE, value=batch_size, set_default_type=int)
+        self._set_data(key=_Keys.DEPTH, value=max(depth, 1), set_default_type=int)
+        self._set_data(key=_Keys.RECORD_LIMIT, value=record_limit, set_default_type=int)
+        self._set_data(key=_Keys.SPLITTER, value=RecordSplitter())
+        self._set_data(key=_Keys.BATCH, value=[], set_default_type=List)
+        self._set_data(key=_Keys.PENDING, value=deque(), set_default_type=Deque)
+        self._set_data(key=_Keys.RUNS, value=[], set_default_type=List)
+        self._set_data(key=_Keys.ERRORS, value=[], set_default_type=List)
+        self._set_data(key=_Keys.COUNT, value=0, set_default_type=int)
+
+    @property
+    def count(self) -> int:
+        """Returns number of received records."""
+        return self._get_data(key=_Keys.COUNT)  # type: ignore
+
+    @property
+    def records(self) -> int:
+        """Returns number of parsed motostat records."""
+        return sum(len(run) for run in self._data[_Keys.RUNS])
+
+    def pop_errors(self) -> List[str]:
+        """Returns and clears list of messages about skipped rows."""
+        out: List[str] = self._data[_Keys.ERRORS]
+        self._data[_Keys.ERRORS] = []
+        return out
+
+    async def feed(self, data: bytes) -> None:
+        """Adds chunk of export bytes, records may be split between chunks.
+
+        Raises ValueError if incomplete record exceeds the record limit.
+        """
+        splitter: RecordSplitter = self._data[_Keys.SPLITTER]
+        batch: List[str] = self._data[_Keys.BATCH]
+        batch.extend(splitter.feed(data))
+        if splitter.buffered > self._data[_Keys.RECORD_LIMIT]:
+            raise ValueError(
+                f"row {self.count + len(batch) + 1}: record exceeds "
+                f"{self._data[_Keys.RECORD_LIMIT]} bytes"
+            )
+        size: int = self._data[_Keys.BATCH_SIZE]
+        while len(batch) >= size:
+            await self.__submit(batch[:size])
+            del batch[:size]
+
+    async def finish(self) -> None:
+        """Parses the rest of input and waits for all batches."""
+        batch: List[str] = self._data[_Keys.BATCH]
+        batch.extend(self._data[_Keys.SPLITTER].flush())
+        if batch:
+            await self.__submit(list(batch))
+            batch.clear()
+        pending: Deque[asyncio.Future] = self._data[_Keys.PENDING]
+        while pending:
+            await self.__collect()
+
+    async def chunks(
+        self, header: bool = True, chunk_size: int = CHUNK_SIZE
+    ) -> AsyncIterator[Tuple[str, str]]:
+        """Yields kind and text of converted lines, call after finish().
+
+        Concatenated texts of a kind give the content of its csv file.
+
+        ### Arguments:
+        - header [bool] - first text of a kind starts with csv header.
+        - chunk_size [int] - number of records converted at once.
+        """
+        loop = asyncio.get_running_loop()
+        # sorted batches are merged stable, as list.sort of all records
+        merged: Iterator[MotoStatRecord] = heapq.merge(
+            *self._data[_Keys.RUNS], key=_KEY, reverse=True
+        )
+        headers = {COST: COST_CSV_HEADER, FUEL: FUELING_CSV_HEADER}
+        while True:
+            records: List[MotoStatRecord] = list(islice(merged, chunk_size))
+            if not records:
+                break
+            costs, fuels = await loop.run_in_executor(
+                self._data[_Keys.EXECUTOR], _convert_chunk, records
+            )
+            for kind, lines in ((COST, costs), (FUEL, fuels)):
+                if not lines:
+                    continue
+                if header and kind in headers:
+                    lines.insert(0, headers.pop(kind))
+                yield kind, "\n".join(lines) + "\n"
+
+    async def __submit(self, lines: List[str]) -> None:
+        """Sends batch to executor, waits for the oldest batch over the limit."""
+        loop = asyncio.get_running_loop()
+        pending: Deque[asyncio.Future] = self._data[_Keys.PENDING]
+        pending.append(
+            loop.run_in_executor(
+                self._data[_Keys.EXECUTOR],
+                _parse_sorted,
+                lines,
+                self.miles,
+                self._data[_Keys.COUNT],
+            )
+        )
+        self._data[_Keys.COUNT] += len(lines)
+        while len(pending) > self._data[_Keys.DEPTH]:
+            await self.__collect()
+
+    async def __collect(self) -> None:
+        """Stores result of the oldest batch."""
+        records, errors = await self._data[_Keys.PENDING].popleft()
+        if records:
+            self._data[_Keys.RUNS].append(records)
+        self._data[_Keys.ERRORS].extend(errors)
+
+
+async def convert_stream(
+    stream: AsyncIterable[bytes],
+    miles: bool = False,
+    executor: Optional[Executor] = None,
+    header: bool = True,
+    errors: Optional[List[str]] = None,
+) -> AsyncIterator[Tuple[str, str]]:
+    """Yields kind and text of converted lines of export read from stream.
+
+    Kinds are COST and FUEL, concatenated texts of a kind give the content
+    of its csv file.
+
+    ### Arguments:
+    - stream [AsyncIterable[bytes]] - chunks of motostat export.
+    - miles [bool] - convert distances to miles.
+    - executor [Optional[Executor]] - executor for parsing and conversion,
+      default executor of the event loop if None.
+    - header [bool] - first text of a kind starts with csv header.
+    - errors [Optional[List[str]]] - list extended with messages about
+      skipped rows.
+    """
+    conversion = AsyncConversion(miles, executor)
+    async for data in stream:
+        await conversion.feed(data)
+    await conversion.finish()
+    if errors is not None:
+        errors.extend(conversion.pop_errors())
+    async for item in conversion.chunks(header):
+        yield item
+
+
+# #[EOF]#######################################################################
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""
+  api.py
+  Author : Jacek 'Szumak' Kotlarski --<szumak@virthost.pl>
+  Created: 17.10.2026, 06:52:31
+
+  Purpose: Embeddable conversion API without threads, logger and sys.exit.
+
+  Functions of this module run in the calling thread and change no global
+  state, so they can be called from other Python applications:
+
+      costs, fuels = convert(lines)
+      convert_to(data, costs=costs_stream, fuels=fuels_stream)
+"""
+
+import io, os
+
+from itertools import islice
+from typing import IO, Iterable, Iterator, List, Optional, Tuple, Union
+
+from libs.compression import decompressor, detect
+from libs.conversion import Conversion
+from libs.formatter import COST_CSV_HEADER, FUELING_CSV_HEADER
+from libs.reader import RecordSplitter
+
+# number of lines parsed at once
+BATCH_SIZE: int = 1000
+
+# size of a single read from file source
+CHUNK_SIZE: int = 1024 * 1024
+
+# type of conversion source: export text, bytes, path, file or lines
+TSource = Union[str, bytes, bytearray, memoryview, os.PathLike, IO, Iterable[str]]
+
+
+def _binary_chunks(stream: IO[bytes]) -> Iterator[bytes]:
+    """Returns chunks of binary stream, compressed data is decompressed."""
+    if not hasattr(stream, "peek"):
+        stream = io.BufferedReader(stream)  # type: ignore
+    fmt: Optional[str] = detect(stream.peek(8)[:8])  # type: ignore
+    if fmt is not None:
+        stream = decompressor(stream, fmt)  # type: ignore
+    return iter(lambda: stream.read(CHUNK_SIZE), b"")
+
+
+def _text_chunks(stream: IO[str]) -> Iterator[bytes]:
+    """Returns chunks of text stream encoded to bytes."""
+    for chunk in iter(lambda: stream.read(CHUNK_SIZE), ""):
+        yield chunk.encode()
+
+
+def _line_chunks(lines: Iterable[str]) -> Iterator[bytes]:
+    """Returns lines encoded to bytes, terminated with '\\n' if needed."""
+    for line in lines:
+        yield line.encode() if line.endswith("\n") else f"{line}\n".encode()
+
+
+def _path_chunks(path: str) -> Iterator[bytes]:
+    """Returns chunks of export file, the file is closed at the end."""
+    with open(path, "rb") as file:
+        yield from _binary_chunks(file)
+
+
+def _records(chunks: Iterable[bytes]) -> Iterator[str]:
+    """Returns records of export chunks, multi-line notes are joined."""
+    splitter = RecordSplitter()
+    for chunk in chunks:
+        yield from splitter.feed(chunk)
+    yield from splitter.flush()
+
+
+def _lines(source: TSource) -> Iterator[str]:
+    """Returns iterator of export records from source."""
+    if isinstance(source, str):
+        return _records((source.encode(),))
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return _records(_binary_chunks(io.BytesIO(source)))  # type: ignore
+    if isinstance(source, os.PathLike):
+        return _records(_path_chunks(os.fspath(source)))
+    if isinstance(source, io.TextIOBase):
+        return _records(_text_chunks(source))  # type: ignore
+    if hasattr(source, "read"):
+        return _records(_binary_chunks(source))  # type: ignore
+    return _records(_line_chunks(source))
+
+
+def convert_records(
+    source: TSource, miles: bool = False, errors: Optional[List[str]] = None
+) -> Conversion:
+    """Returns conversion with records parsed from source.
+
+    ### Arguments:
+    - source [TSource] - export text, bytes, path, text or binary file,
+      or iterable of lines, compressed bytes and files are detected.
+      Text files should be opened with newline="" to keep '\\r\\n'
+      of multi-line notes.
+    - miles [bool] - convert distances to miles.
+    - errors [Optional[List[str]]] - list extended with messages about
+      skipped rows.
+    """
+    conversion = Conversion(miles=miles)
+    lines: Iterator[str] = _lines(source)
+    while True:
+        batch: List[str] = list(islice(lines, BATCH_SIZE))
+        if not batch:
+            break
+        conversion.add_batch(batch)
+    if errors is not None:
+        errors.extend(conversion.pop_errors())
+    return conversion
+
+
+def convert(
+    source: TSource, miles: bool = False, errors: Optional[List[str]] = None
+) -> Tuple[Iterator[str], Iterator[str]]:
+    """Returns iterators of spritmonitor cost and fuel csv lines.
+
+    Lines are sorted as in files written by converter, without headers
+    and line ends.
+
+    ### Arguments:
+    - source [TSource] - motostat export, see convert_records().
+    - miles [bool] - convert distances to miles.
+    - errors [Optional[List[str]]] - list extended with messages about
+      skipped rows.
+    """
+    costs, fuels = convert_records(source, miles, errors).convert()
+    return iter(costs), iter(fuels)
+
+
+def convert_to(
+    source: TSource,
+    costs: Optional[IO[str]] = None,
+    fuels: Optional[IO[str]] = None,
+    miles: bool = False,
+    header: bool = True,
+    errors: Optional[List[str]] = None,
+) -> Tuple[int, int]:
+    """Writes spritmonitor csv lines to streams, returns numbers of lines.
+
+    ### Arguments:
+    - source [TSource] - motostat export, see convert_records().
+    - costs [Optional[IO[str]]] - stream for cost lines, None to skip.
+    - fuels [Optional[IO[str]]] - stream for fuel lines, None to skip.
+    - miles [bool] - convert distances to miles.
+    - header [bool] - write csv headers before lines.
+    - errors [Optional[List[str]]] - list extended with messages about
+      skipped rows.
+    """
+    out: List[int] = []
+    lines: Tuple[List[str], List[str]] = convert_records(
+        source, miles, errors
+    ).convert()
+    for stream, csv_header, items in (
+        (costs, COST_CSV_HEADER, lines[0]),
+        (fuels, FUELING_CSV_HEADER, lines[1]),
+    ):
+        if stream is not None and items:
+            if header:
+                stream.write(csv_header + "\n")
+            stream.writelines(f"{line}\n" for line in items)
+        out.append(len(items))
+    return out[0], out[1]
+
+
+# #[EOF]#######################################################################
@@ -7,7 +7,7 @@
   Purpose: Base class for project.
 """
 
-import sys
+import sys, getopt
 
 from typing import List, Dict
 
@@ -19,13 +19,32 @@ from jsktoolbox.logstool.logs import LoggerClient, ThLoggerProcessor
 class _Keys(object, metaclass=ReadOnlyClass):
     """Internal _Keys container class."""
 
+    BATCH: str = "__batch__"
+    CACHE_DIR: str = "__cache_dir__"
+    CACHE_SIZE: str = "__cache_size__"
+    COLUMNAR: str = "__columnar__"
     COMMAND_LINE_OPTS: str = "__clo__"
+    COMPRESSION: str = "__compression__"
+    COSTS_OUT: str = "__costs_out__"
     DEBUG: str = "__debug__"
     DIR: str = "__dir__"
+    FSYNC: str = "__fsync__"
+    FUELS_OUT: str = "__fuels_out__"
+    INPUT_FILES: str = "__input_files__"
+    JOBS: str = "__jobs__"
     LOGGER_CLIENT: str = "__logger_client__"
+    MAX_REQUESTS: str = "__max_requests__"
+    MEMORY_LIMIT: str = "__memory_limit__"
     MILES: str = "__miles__"
+    PRESORTED: str = "__presorted__"
+    PROFILE_DIR: str = "__profile_dir__"
     PROC_LOGS: str = "__logger_processor__"
+    QUEUE_DEPTH: str = "__queue_depth__"
+    SERVE: str = "__serve__"
     SET_STOP: str = "__set_stop__"
+    STATE_FILE: str = "__state_file__"
+    STATS_FILE: str = "__stats_file__"
+    METRICS_FILE: str = "__metrics_file__"
     VERBOSE: str = "__verbose__"
 
 
@@ -127,6 +146,306 @@ class BDir(BData):
         self._set_data(key=_Keys.DIR, set_default_type=str, value=value)
 
 
+class BFsync(BData):
+    """Base class for flushing output files to disk."""
+
+    @property
+    def fsync(self) -> bool:
+        """Returns fsync flag."""
+        return self._get_data(
+            key=_Keys.FSYNC, set_default_type=bool, default_value=False
+        )  # type: ignore
+
+    @fsync.setter
+    def fsync(self, flag: bool) -> None:
+        """Sets fsync flag."""
+        self._set_data(key=_Keys.FSYNC, set_default_type=bool, value=flag)
+
+
+class BCompression(BData):
+    """Base class for compression format of output files."""
+
+    @property
+    def compression(self) -> str:
+        """Returns compression format of output files, empty for plain files."""
+        return self._get_data(
+            key=_Keys.COMPRESSION, set_default_type=str, default_value=""
+        )  # type: ignore
+
+    @compression.setter
+    def compression(self, value: str) -> None:
+        """Sets compression format of output files."""
+        self._set_data(key=_Keys.COMPRESSION, set_default_type=str, value=value)
+
+
+class BBatch(BData):
+    """Base class for batch mode flag."""
+
+    @property
+    def batch(self) -> bool:
+        """Returns batch flag."""
+        return self._get_data(
+            key=_Keys.BATCH, set_default_type=bool, default_value=False
+        )  # type: ignore
+
+    @batch.setter
+    def batch(self, flag: bool) -> None:
+        """Sets batch flag."""
+        self._set_data(key=_Keys.BATCH, set_default_type=bool, value=flag)
+
+
+class BColumnar(BData):
+    """Base class for columnar engine flag."""
+
+    @property
+    def columnar(self) -> bool:
+        """Returns columnar flag."""
+        return self._get_data(
+            key=_Keys.COLUMNAR, set_default_type=bool, default_value=False
+        )  # type: ignore
+
+    @columnar.setter
+    def columnar(self, flag: bool) -> None:
+        """Sets columnar flag."""
+        self._set_data(key=_Keys.COLUMNAR, set_default_type=bool, value=flag)
+
+
+class BMemory(BData):
+    """Base class for memory limit of streaming conversion."""
+
+    @property
+    def memory_limit(self) -> int:
+        """Returns memory limit in MiB, 0 if streaming is disabled."""
+        return self._get_data(
+            key=_Keys.MEMORY_LIMIT, set_default_type=int, default_value=0
+        )  # type: ignore
+
+    @memory_limit.setter
+    def memory_limit(self, value: int) -> None:
+        """Sets memory limit in MiB."""
+        self._set_data(key=_Keys.MEMORY_LIMIT, set_default_type=int, value=value)
+
+
+class BState(BData):
+    """Base class for state file of incremental conversion."""
+
+    @property
+    def state_file(self) -> str:
+        """Returns path to state file, empty if incremental mode is disabled."""
+        return self._get_data(
+            key=_Keys.STATE_FILE, set_default_type=str, default_value=""
+        )  # type: ignore
+
+    @state_file.setter
+    def state_file(self, value: str) -> None:
+        """Sets path to state file."""
+        self._set_data(key=_Keys.STATE_FILE, set_default_type=str, value=value)
+
+
+class BCache(BData):
+    """Base class for result cache options."""
+
+    @property
+    def cache_dir(self) -> str:
+        """Returns cache directory, empty if cache is disabled."""
+        return self._get_data(
+            key=_Keys.CACHE_DIR, set_default_type=str, default_value=""
+        )  # type: ignore
+
+    @cache_dir.setter
+    def cache_dir(self, value: str) -> None:
+        """Sets cache directory."""
+        self._set_data(key=_Keys.CACHE_DIR, set_default_type=str, value=value)
+
+    @property
+    def cache_size(self) -> int:
+        """Returns size limit of cache in MiB."""
+        return self._get_data(
+            key=_Keys.CACHE_SIZE, set_default_type=int, default_value=256
+        )  # type: ignore
+
+    @cache_size.setter
+    def cache_size(self, value: int) -> None:
+        """Sets size limit of cache in MiB."""
+        self._set_data(key=_Keys.CACHE_SIZE, set_default_type=int, value=value)
+
+
+class BJobs(BData):
+    """Base class for number of parsing processes."""
+
+    @property
+    def jobs(self) -> int:
+        """Returns number of parsing processes, 1 for parsing in thread."""
+        return self._get_data(
+            key=_Keys.JOBS, set_default_type=int, default_value=1
+        )  # type: ignore
+
+    @jobs.setter
+    def jobs(self, value: int) -> None:
+        """Sets number of parsing processes."""
+        self._set_data(key=_Keys.JOBS, set_default_type=int, value=value)
+
+
+class BQueue(BData):
+    """Base class for maximum depth of communication queue."""
+
+    @property
+    def queue_depth(self) -> int:
+        """Returns maximum number of batches in communication queue."""
+        return self._get_data(
+            key=_Keys.QUEUE_DEPTH, set_default_type=int, default_value=16
+        )  # type: ignore
+
+    @queue_depth.setter
+    def queue_depth(self, value: int) -> None:
+        """Sets maximum number of batches in communication queue."""
+        self._set_data(key=_Keys.QUEUE_DEPTH, set_default_type=int, value=value)
+
+
+class BOutput(BData):
+    """Base class for stream output targets."""
+
+    @property
+    def costs_out(self) -> str:
+        """Returns output target of cost lines, empty for file in output dir."""
+        return self._get_data(
+            key=_Keys.COSTS_OUT, set_default_type=str, default_value=""
+        )  # type: ignore
+
+    @costs_out.setter
+    def costs_out(self, value: str) -> None:
+        """Sets output target of cost lines."""
+        self._set_data(key=_Keys.COSTS_OUT, set_default_type=str, value=value)
+
+    @property
+    def fuels_out(self) -> str:
+        """Returns output target of fuel lines, empty for file in output dir."""
+        return self._get_data(
+            key=_Keys.FUELS_OUT, set_default_type=str, default_value=""
+        )  # type: ignore
+
+    @fuels_out.setter
+    def fuels_out(self, value: str) -> None:
+        """Sets output target of fuel lines."""
+        self._set_data(key=_Keys.FUELS_OUT, set_default_type=str, value=value)
+
+    @property
+    def presorted(self) -> bool:
+        """Returns input in output order flag."""
+        return self._get_data(
+            key=_Keys.PRESORTED, set_default_type=bool, default_value=False
+        )  # type: ignore
+
+    @presorted.setter
+    def presorted(self, flag: bool) -> None:
+        """Sets input in output order flag."""
+        self._set_data(key=_Keys.PRESORTED, set_default_type=bool, value=flag)
+
+
+class BStats(BData):
+    """Base class for run statistics output files."""
+
+    @property
+    def stats_file(self) -> str:
+        """Returns path of JSON statistics file, empty to disable."""
+        return self._get_data(
+            key=_Keys.STATS_FILE, set_default_type=str, default_value=""
+        )  # type: ignore
+
+    @stats_file.setter
+    def stats_file(self, value: str) -> None:
+        """Sets path of JSON statistics file."""
+        self._set_data(key=_Keys.STATS_FILE, set_default_type=str, value=value)
+
+    @property
+    def metrics_file(self) -> str:
+        """Returns path of Prometheus textfile, empty to disable."""
+        return self._get_data(
+            key=_Keys.METRICS_FILE, set_default_type=str, default_value=""
+        )  # type: ignore
+
+    @metrics_file.setter
+    def metrics_file(self, value: str) -> None:
+        """Sets path of Prometheus textfile."""
+        self._set_data(key=_Keys.METRICS_FILE, set_default_type=str, value=value)
+
+    @property
+    def profile_dir(self) -> str:
+        """Returns directory for profiling reports, empty to disable."""
+        return self._get_data(
+            key=_Keys.PROFILE_DIR, set_default_type=str, default_value=""
+        )  # type: ignore
+
+    @profile_dir.setter
+    def profile_dir(self, value: str) -> None:
+        """Sets directory for profiling reports."""
+        self._set_data(key=_Keys.PROFILE_DIR, set_default_type=str, value=value)
+
+
+class BServer(BData):
+    """Base class for HTTP conversion service options."""
+
+    @property
+    def serve(self) -> str:
+        """Returns '[HOST:]PORT' address of service, empty to disable."""
+        return self._get_data(
+            key=_Keys.SERVE, set_default_type=str, default_value=""
+        )  # type: ignore
+
+    @serve.setter
+    def serve(self, value: str) -> None:
+        """Sets address of service."""
+        self._set_data(key=_Keys.SERVE, set_default_type=str, value=value)
+
+    @property
+    def max_requests(self) -> int:
+        """Returns maximum number of conversions at once, 0 for 2 * jobs."""
+        return self._get_data(
+            key=_Keys.MAX_REQUESTS, set_default_type=int, default_value=0
+        )  # type: ignore
+
+    @max_requests.setter
+    def max_requests(self, value: int) -> None:
+        """Sets maximum number of conversions at once."""
+        self._set_data(key=_Keys.MAX_REQUESTS, set_default_type=int, value=value)
+
+
+class BInput(BData):
+    """Base class for input files list."""
+
+    @property
+    def input_files(self) -> List[str]:
+        """Returns list of input files paths."""
+        return self._get_data(
+            key=_Keys.INPUT_FILES, set_default_type=List, default_value=[]
+        )  # type: ignore
+
+    @input_files.setter
+    def input_files(self, value: List[str]) -> None:
+        """Sets list of input files paths."""
+        self._set_data(key=_Keys.INPUT_FILES, set_default_type=List, value=value)
+
+
+class ThLogsProcessor(ThLoggerProcessor):
+    """LoggerProcessor thread class with event driven shutdown.
+
+    The thread wakes up immediately after stop request and flushes
+    the rest of logs queue before exit.
+    """
+
+    def run(self) -> None:
+        """Start the procedure."""
+        if self.logger_engine is None or self.logger_client is None:
+            return ThLoggerProcessor.run(self)
+        if self._debug:
+            self.logger_client.message_debug = f"[{self._c_name}] starting..."
+        while self._stop_event and not self._stop_event.wait(self.sleep_period):
+            self.logger_engine.send()
+        if self._debug:
+            self.logger_client.message_debug = f"[{self._c_name}] stopped."
+        self.logger_engine.send()
+
+
 class BaseApp(BLogs, BStop):
     """Main app base class."""
 
@@ -154,6 +473,22 @@ class BaseApp(BLogs, BStop):
         """Set logs_processor."""
         self._set_data(key=_Keys.PROC_LOGS, value=value)
 
+    def _arguments(self, command_conf: Dict) -> List[str]:
+        """Returns list of command line arguments that are not options."""
+        short_opts: str = ""
+        long_opts: List[str] = []
+        for item in command_conf.keys():
+            if command_conf[item]["short"]:
+                short_opts += command_conf[item]["short"]
+                if command_conf[item]["has_value"]:
+                    short_opts += ":"
+            long_opts.append(item)
+        try:
+            _, args = getopt.getopt(sys.argv[1:], short_opts, long_opts)
+        except getopt.GetoptError:
+            return []
+        return args
+
     def _help(self, command_conf: Dict) -> None:
         """Show help information and shutdown."""
         command_opts: str = ""
@@ -192,7 +527,7 @@ class BaseApp(BLogs, BStop):
                 command_opts += f"{command_conf[item]['example']}"
             command_opts += " "
         print("###[HELP]###")
-        print(f"{sys.argv[0]} {command_opts}")
+        print(f"{sys.argv[0]} {command_opts}[file.csv ...]")
         print(f"")
         print("# Arguments:")
         for item in desc_opts:
@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+"""
+  batch.py
+  Author : Jacek 'Szumak' Kotlarski --<szumak@virthost.pl>
+  Created: 16.10.2026, 11:48:09
+
+  Purpose: Batch conversion of many motostat exports on a process pool.
+"""
+
+import glob, json, os, time
+
+from typing import Any, BinaryIO, Dict, List, Optional, Set, Tuple
+
+from jsktoolbox.logstool.logs import LoggerClient
+
+from libs.base import BDebug, BDir, BFsync, BLogs, BMiles
+from libs.compression import open_compressed
+from libs.conversion import Conversion, check_output_dir, output_names
+from libs.parallel import process_pool
+from libs.reader import ChunkReader, MmapReader
+
+# name of batch summary file
+SUMMARY_FILE: str = "spritmonitor_summary.json"
+
+
+def available_cores() -> int:
+    """Returns number of cores available for the process."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def find_exports(paths: List[str]) -> List[str]:
+    """Returns list of export files, directories are searched for motostat*.csv."""
+    out: List[str] = []
+    for path in paths:
+        if os.path.isdir(path):
+            out.extend(sorted(glob.glob(os.path.join(path, "motostat*.csv"))))
+        else:
+            out.append(path)
+    return out
+
+
+def unique_names(paths: List[str]) -> List[Tuple[str, str]]:
+    """Returns output file names of exports, numbered if names collide.
+
+    Exports with the same name in different directories get suffixes
+    '_2', '_3', ... in input order.
+    """
+    out: List[Tuple[str, str]] = []
+    used: Set[Tuple[str, str]] = set()
+    for path in paths:
+        names: Tuple[str, str] = output_names(path)
+        number: int = 1
+        while names in used:
+            number += 1
+            names = output_names(path, f"_{number}")
+        used.add(names)
+        out.append(names)
+    return out
+
+
+def convert_export(
+    path: str,
+    output_dir: str,
+    miles: bool,
+    fsync: bool = False,
+    names: Optional[Tuple[str, str]] = None,
+) -> Dict[str, Any]:
+    """Converts single motostat export, returns summary dict.
+
+    ### Arguments:
+    - path [str] - path to motostat export file, may be compressed.
+    - output_dir [str] - output directory.
+    - miles [bool] - mileage in miles flag.
+    - fsync [bool] - flush output files to disk.
+    - names [Optional[Tuple[str, str]]] - costs and fuels file names,
+      derived from path if not given.
+    """
+    start: float = time.perf_counter()
+    costs_file, fuels_file = names or output_names(path)
+    summary: Dict[str, Any] = {
+        "file": path,
+        "costs_file": costs_file,
+        "fuels_file": fuels_file,
+        "records": 0,
+        "skipped": 0,
+        "costs": 0,
+        "fuels": 0,
+        "time": 0.0,
+        "error": None,
+    }
+    try:
+        conversion = Conversion(miles=miles)
+        # compressed files are decompressed in thread while parsing
+        stream: Optional[BinaryIO] = open_compressed(path)
+        try:
+            reader = MmapReader(path) if stream is None else ChunkReader(stream)
+            for batch in reader.batches():
+                conversion.add_batch(batch)
+        finally:
+            if stream is not None:
+                stream.close()
+        summary["records"] = conversion.records
+        summary["skipped"] = conversion.skipped
+        summary["costs"], summary["fuels"] = conversion.write(
+            output_dir, costs_file, fuels_file, fsync=fsync
+        )
+    except Exception as ex:
+        summary["error"] = f"{ex}"
+    summary["time"] = round(time.perf_counter() - start, 6)
+    return summary
+
+
+class BatchProcessor(BLogs, BMiles, BDir, BDebug, BFsync):
+    """Batch converter of many motostat exports.
+
+    Every export is converted in a separate worker process and written
+    to its own output files.
+    """
+
+    def __init__(
+        self,
+        logger_client: LoggerClient,
+        miles: bool = False,
+        debug: bool = False,
+        fsync: bool = False,
+    ) -> None:
+        """Constructor.
+
+        ### Arguments:
+        - logger_client [LoggerClient] - logger client for messages.
+        - miles [bool] - mileage in miles flag.
+        - debug [bool] - debug flag.
+        - fsync [bool] - flush output files to disk.
+        """
+        self.logs = logger_client
+        self.miles = miles
+        self.debug = debug
+        self.fsync = fsync
+
+    def run(self, paths: List[str]) -> List[Dict[str, Any]]:
+        """Converts exports, returns list of per file summaries."""
+        error = check_output_dir(self.output_dir)
+        if error:
+            self.logs.message_error = error
+            return []
+        exports: List[str] = find_exports(paths)
+        if not exports:
+            self.logs.message_error = "No motostat exports found."
+            return []
+
+        start: float = time.perf_counter()
+        workers: int = min(available_cores(), len(exports))
+        if self.debug:
+            self.logs.message_debug = (
+                f"Converting {len(exports)} exports on {workers} workers."
+            )
+        with process_pool(workers) as executor:
+            summaries: List[Dict[str, Any]] = list(
+                executor.map(
+                    convert_export,
+                    exports,
+                    [self.output_dir] * len(exports),
+                    [self.miles] * len(exports),
+                    [self.fsync] * len(exports),
+                    unique_names(exports),
+                )
+            )
+        elapsed: float = time.perf_counter() - start
+
+        for item in summaries:
+            if item["error"]:
+                self.logs.message_error = f"{item['file']}: {item['error']}"
+            else:
+                self.logs.message_info = (
+                    f"{item['file']}: {item['records']} records, "
+                    f"{item['skipped']} skipped, "
+                    f"{item['costs']} costs, {item['fuels']} fuels "
+                    f"in {item['time']:.3f}s"
+                )
+        self.logs.message_info = (
+            f"Converted {len(summaries)} exports, "
+            f"{sum(item['records'] for item in summaries)} records "
+            f"in {elapsed:.3f}s."
+        )
+        try:
+            with open(os.path.join(self.output_dir, SUMMARY_FILE), "w") as file:
+                json.dump(
+                    {
+                        "workers": workers,
+                        "time": round(elapsed, 6),
+                        "exports": summaries,
+                    },
+                    file,
+                    indent=2,
+                )
+        except OSError as ex:
+            self.logs.message_error = f"Cannot write summary: {ex}"
+        return summaries
+
+
+# #[EOF]#######################################################################
@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""
+  cache.py
+  Author : Jacek 'Szumak' Kotlarski --<szumak@virthost.pl>
+  Created: 16.10.2026, 22:31:54
+
+  Purpose: On-disk cache of conversion results keyed by input hash.
+"""
+
+import hashlib, json, mmap, os, shutil, tempfile
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from jsktoolbox.attribtool import ReadOnlyClass
+from jsktoolbox.basetool.data import BData
+
+from libs.writer import copy_file
+
+# default size limit of cache in bytes
+CACHE_SIZE: int = 256 * 1024 * 1024
+
+# version of cached results, changed when output format changes
+CACHE_VERSION: int = 1
+
+# name of cache entry metadata file
+META_FILE: str = "meta.json"
+
+
+class _Keys(object, metaclass=ReadOnlyClass):
+    """Internal Keys container class."""
+
+    DIR: str = "__dir__"
+    SIZE: str = "__size__"
+
+
+def input_hash(miles: bool, compression: str = "") -> Any:
+    """Returns sha256 hash object seeded with conversion options."""
+    return hashlib.sha256(
+        f"v{CACHE_VERSION};miles={miles:d};compression={compression};".encode()
+    )
+
+
+def hash_files(paths: List[str], miles: bool, compression: str = "") -> str:
+    """Returns cache key of input files, content is hashed from memory map.
+
+    Files are hashed as stored on disk. The key of a single uncompressed
+    file is the same as the key of its content read from STDIN, compressed
+    files have their own keys, because STDIN is hashed after decompression.
+
+    ### Arguments:
+    - paths [List[str]] - paths to motostat export files.
+    - miles [bool] - mileage in miles flag.
+    - compression [str] - compression format of output files.
+    """
+    out = input_hash(miles, compression)
+    for path in paths:
+        with open(path, "rb") as file:
+            size: int = os.fstat(file.fileno()).st_size
+            if len(paths) > 1:
+                out.update(f"{size};".encode())
+            if size:
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                    out.update(buf)
+    return out.hexdigest()
+
+
+class ResultCache(BData):
+    """On-disk cache of spritmonitor files.
+
+    Every entry is a directory named by the input key with output files
+    and metadata. Entries are evicted in least recently used order when
+    the total size exceeds the limit.
+    """
+
+    def __init__(self, cache_dir: str, size_limit: int = CACHE_SIZE) -> None:
+        """Constructor.
+
+        ### Arguments:
+        - cache_dir [str] - cache directory, created if needed.
+        - size_limit [int] - size limit of cache in bytes.
+        """
+        os.makedirs(cache_dir, exist_ok=True)
+        self._set_data(key=_Keys.DIR, value=cache_dir, set_default_type=str)
+        self._set_data(key=_Keys.SIZE, value=size_limit, set_default_type=int)
+
+    @property
+    def cache_dir(self) -> str:
+        """Returns cache directory."""
+        return self._get_data(key=_Keys.DIR)  # type: ignore
+
+    @property
+    def size_limit(self) -> int:
+        """Returns size limit of cache in bytes."""
+        return self._get_data(key=_Keys.SIZE)  # type: ignore
+
+    def has(self, key: str) -> bool:
+        """Returns True if result for key is cached."""
+        return os.path.isfile(os.path.join(self.cache_dir, key, META_FILE))
+
+    def restore(
+        self, key: str, output_dir: str
+    ) -> Optional[Tuple[int, int, List[str]]]:
+        """Copies cached files to output dir.
+
+        Returns number of cost and fuel records and messages about skipped
+        rows, None if key is not cached.
+        """
+        entry: str = os.path.join(self.cache_dir, key)
+        try:
+            with open(os.path.join(entry, META_FILE), "r") as file:
+                meta: Dict[str, Any] = json.load(file)
+            for name in meta["files"]:
+                copy_file(os.path.join(entry, name), os.path.join(output_dir, name))
+        except (OSError, ValueError, KeyError):
+            return None
+        # mark as recently used
+        os.utime(entry)
+        return meta["costs"], meta["fuels"], meta["skipped"]
+
+    def store(
+        self,
+        key: str,
+        output_dir: str,
+        files: List[str],
+        costs: int,
+        fuels: int,
+        skipped: List[str],
+    ) -> None:
+        """Stores output files for key and evicts old entries.
+
+        ### Arguments:
+        - key [str] - cache key of input.
+        - output_dir [str] - directory with converted files.
+        - files [List[str]] - names of output files, missing files are omitted.
+        - costs [int] - number of cost records.
+        - fuels [int] - number of fuel records.
+        - skipped [List[str]] - messages about skipped rows.
+        """
+        entry: str = os.path.join(self.cache_dir, key)
+        if os.path.isdir(entry):
+            return
+        tmp: str = tempfile.mkdtemp(prefix=".tmp_", dir=self.cache_dir)
+        try:
+            names: List[str] = []
+            for name in files:
+                path: str = os.path.join(output_dir, name)
+                if os.path.isfile(path):
+                    shutil.copyfile(path, os.path.join(tmp, name))
+                    names.append(name)
+            with open(os.path.join(tmp, META_FILE), "w") as file:
+                json.dump(
+                    {
+                        "files": names,
+                        "costs": costs,
+                        "fuels": fuels,
+                        "skipped": skipped,
+                    },
+                    file,
+                )
+            os.rename(tmp, entry)
+        except OSError:
+            shutil.rmtree(tmp, ignore_errors=True)
+            return
+        self.__evict()
+
+    def __evict(self) -> None:
+        """Removes least recently used entries over size limit."""
+        entries: List[Tuple[float, int, str]] = []
+        total: int = 0
+        for name in os.listdir(self.cache_dir):
+            entry: str = os.path.join(self.cache_dir, name)
+            if name.startswith(".") or not os.path.isdir(entry):
+                continue
+            size: int = sum(
+                os.path.getsize(os.path.join(entry, item)) for item in os.listdir(entry)
+            )
+            entries.append((os.path.getmtime(entry), size, entry))
+            total += size
+        for _, size, entry in sorted(entries):
+            if total <= self.size_limit:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+
+
+# #[EOF]#######################################################################
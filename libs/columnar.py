@@ -0,0 +1,366 @@
+# -*- coding: utf-8 -*-
+"""
+  columnar.py
+  Author : Jacek 'Szumak' Kotlarski --<szumak@virthost.pl>
+  Created: 16.10.2026, 14:52:18
+
+  Purpose: Columnar batch engine with optional NumPy vectorized conversion.
+"""
+
+import math, os
+
+from typing import Any, Dict, List, Tuple
+
+from jsktoolbox.attribtool import ReadOnlyClass
+
+from libs.base import BMiles
+from libs.conversion import COSTS_FILE, FUELS_FILE
+from libs.dates import decode_date
+from libs.formatter import (
+    COST_CSV_HEADER,
+    DRIVING_STYLES,
+    FUELING_CSV_HEADER,
+    FUELING_TYPES,
+    ROADS,
+    cost_line,
+    fuel_line,
+)
+from libs.model import MILE, MOTOSTAT_HEADER
+from libs.tokenizer import split_line
+from libs.writer import write_csv_files
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# motostat column indexes
+_COL: Dict[str, int] = {key: i for i, key in enumerate(MOTOSTAT_HEADER)}
+
+
+class _Keys(object, metaclass=ReadOnlyClass):
+    """Internal Keys container class."""
+
+    COLUMNS: str = "__columns__"
+    COUNT: str = "__count__"
+    ERRORS: str = "__errors__"
+    INVALID: str = "__invalid__"
+    NUMPY: str = "__numpy__"
+    ROWS: str = "__rows__"
+
+
+class ColumnarConversion(BMiles):
+    """Conversion of whole motostat export stored in columns.
+
+    Numeric parsing, miles conversion, consumption formula, roads bitmask
+    and code mappings run on whole columns, with NumPy arrays if available.
+    """
+
+    def __init__(self, miles: bool = False, use_numpy: bool = True) -> None:
+        """Constructor.
+
+        ### Arguments:
+        - miles [bool] - mileage in miles flag.
+        - use_numpy [bool] - use NumPy if it is installed.
+        """
+        self.miles = miles
+        self._set_data(
+            key=_Keys.NUMPY, value=use_numpy and np is not None, set_default_type=bool
+        )
+        self._set_data(key=_Keys.COUNT, value=0, set_default_type=int)
+        self._set_data(key=_Keys.INVALID, value=0, set_default_type=int)
+        self._set_data(key=_Keys.ERRORS, value=[], set_default_type=List)
+        self._set_data(key=_Keys.ROWS, value=[], set_default_type=List)
+        self._set_data(
+            key=_Keys.COLUMNS,
+            value=[[] for _ in MOTOSTAT_HEADER],
+            set_default_type=List,
+        )
+
+    @property
+    def numpy(self) -> bool:
+        """Returns True if NumPy is used."""
+        return self._get_data(key=_Keys.NUMPY)  # type: ignore
+
+    @property
+    def count(self) -> int:
+        """Returns number of received lines."""
+        return self._get_data(key=_Keys.COUNT)  # type: ignore
+
+    @property
+    def records(self) -> int:
+        """Returns number of found motostat records."""
+        return len(self._data[_Keys.ROWS]) - self._data[_Keys.INVALID]
+
+    @property
+    def skipped(self) -> int:
+        """Returns number of rows skipped because of invalid data."""
+        return self._get_data(key=_Keys.INVALID)  # type: ignore
+
+    def pop_errors(self) -> List[str]:
+        """Returns and clears list of messages about skipped rows."""
+        out: List[str] = self._data[_Keys.ERRORS]
+        self._data[_Keys.ERRORS] = []
+        return out
+
+    def add_batch(self, lines: List[str]) -> None:
+        """Splits batch of lines into columns."""
+        size: int = len(MOTOSTAT_HEADER)
+        rows: List[int] = self._data[_Keys.ROWS]
+        columns: List[List[str]] = self._data[_Keys.COLUMNS]
+        appends = [column.append for column in columns]
+        row: int = self.count
+        for line in lines:
+            row += 1
+            data: List[str] = split_line(line.strip())
+            if len(data) == size - 2:
+                data.append("")
+                data.append("")
+            if len(data) != size or data[0] == MOTOSTAT_HEADER[0]:
+                continue
+            rows.append(row)
+            for append, value in zip(appends, data):
+                append(value)
+        self._data[_Keys.COUNT] = row
+
+    def convert(self) -> Tuple[List[str], List[str]]:
+        """Returns lists of sorted cost and fuel csv lines."""
+        rows: List[int] = self._data[_Keys.ROWS]
+        if not rows:
+            return [], []
+        cols: List[List[str]] = self._data[_Keys.COLUMNS]
+        bad: Dict[int, str] = {}
+
+        def raw(key: str) -> List[str]:
+            return cols[_COL[key]]
+
+        # validation and parsing of numeric columns
+        ids: List[str] = [c or f for c, f in zip(raw("cost_id"), raw("fueling_id"))]
+        ids_num = self.__numbers(ids, "id", bad, True)
+        ts, dates = self.__dates(raw("date"), bad)
+        odometer = self.__numbers(raw("odometer"), "odometer", bad)
+        trip = self.__numbers(raw("trip_odometer"), "trip_odometer", bad)
+        quantity = self.__numbers(raw("quantity"), "quantity", bad)
+        self.__numbers(raw("cost"), "cost", bad)
+        routes = [
+            self.__numbers(raw(key), key, bad)
+            for key in ("route_motorway", "route_country", "route_city")
+        ]
+        fuel_ids: List[str] = raw("fuel_id")
+        for key in ("trip_odometer", "route_motorway", "route_country", "route_city"):
+            for i, value in enumerate(raw(key)):
+                if fuel_ids[i] and not value:
+                    self.__error(bad, i, f"invalid number in '{key}': ''")
+
+        # sort keys, NaN of invalid rows would break ordering of valid ones
+        if self.numpy:
+            keys: Any = np.asarray(ts, dtype=np.float64) + ids_num / 10000
+            keys[np.isnan(keys)] = -math.inf
+            order: List[int] = np.argsort(-keys, kind="stable").tolist()
+        else:
+            keys = [t + i / 10000 for t, i in zip(ts, ids_num)]
+            keys = [-math.inf if math.isnan(key) else key for key in keys]
+            order = sorted(range(len(keys)), key=keys.__getitem__, reverse=True)
+
+        # odometer
+        odo: List[str] = raw("odometer")
+        if self.miles:
+            if self.numpy:
+                txt: List[str] = np.char.mod("%.0f", odometer * MILE).tolist()
+            else:
+                txt = [f"{value * MILE:.0f}" for value in odometer]
+            odo = [txt[i] if value else "" for i, value in enumerate(odo)]
+
+        fuels: List[str] = self.__fuels(
+            [i for i in order if fuel_ids[i]],
+            cols,
+            dates,
+            odo,
+            trip,
+            quantity,
+            routes,
+            bad,
+        )
+        # fueling checks may also skip rows with both ids
+        costs: List[str] = self.__costs(
+            [i for i in order if raw("cost_id")[i] and i not in bad], cols, dates, odo
+        )
+        self._data[_Keys.INVALID] = len(bad)
+        self._data[_Keys.ERRORS].extend(f"row {rows[i]}: {bad[i]}" for i in sorted(bad))
+        return costs, fuels
+
+    def write(
+        self,
+        output_dir: str,
+        costs_file: str = COSTS_FILE,
+        fuels_file: str = FUELS_FILE,
+        append: bool = False,
+        fsync: bool = False,
+    ) -> Tuple[int, int]:
+        """Converts and writes csv files, returns number of cost and fuel records.
+
+        ### Arguments:
+        - output_dir [str] - output directory.
+        - costs_file [str] - name of costs csv file.
+        - fuels_file [str] - name of fuels csv file.
+        - append [bool] - append records to existing files.
+        - fsync [bool] - flush files to disk before they replace old ones.
+        """
+        costs, fuels = self.convert()
+        write_csv_files(
+            [
+                (os.path.join(output_dir, costs_file), COST_CSV_HEADER, costs),
+                (os.path.join(output_dir, fuels_file), FUELING_CSV_HEADER, fuels),
+            ],
+            append,
+            fsync,
+        )
+        return len(costs), len(fuels)
+
+    def __error(self, bad: Dict[int, str], index: int, msg: str) -> None:
+        """Marks row as invalid, the first message is kept."""
+        if index not in bad:
+            bad[index] = msg
+
+    def __numbers(
+        self, values: List[str], key: str, bad: Dict[int, str], required: bool = False
+    ) -> Any:
+        """Returns column of floats, NaN for empty values."""
+        if self.numpy:
+            try:
+                out: Any = np.array(
+                    [value if value else "nan" for value in values], dtype=np.float64
+                )
+                if np.isfinite(out[np.asarray(values, dtype=bool)]).all() and not (
+                    required and not all(values)
+                ):
+                    return out
+            except ValueError:
+                pass
+        numbers: List[float] = []
+        for i, value in enumerate(values):
+            number: float = math.nan
+            if value:
+                try:
+                    number = float(value)
+                except ValueError:
+                    pass
+                if not math.isfinite(number):
+                    self.__error(bad, i, f"invalid number in '{key}': '{value}'")
+            elif required:
+                self.__error(bad, i, f"invalid number in '{key}': ''")
+            numbers.append(number)
+        if self.numpy:
+            return np.array(numbers, dtype=np.float64)
+        return numbers
+
+    def __dates(
+        self, values: List[str], bad: Dict[int, str]
+    ) -> Tuple[List[float], List[str]]:
+        """Returns timestamps and DD.MM.YYYY strings mapped from unique dates."""
+        unique: Dict[str, Tuple[float, str]] = {}
+        for value in set(values):
+            try:
+                unique[value] = decode_date(value)
+            except ValueError:
+                unique[value] = (math.nan, "")
+        for i, value in enumerate(values):
+            if not unique[value][1]:
+                self.__error(bad, i, f"invalid date: '{value}'")
+        return [unique[value][0] for value in values], [
+            unique[value][1] for value in values
+        ]
+
+    def __costs(
+        self,
+        order: List[int],
+        cols: List[List[str]],
+        dates: List[str],
+        odo: List[str],
+    ) -> List[str]:
+        """Returns sorted cost csv lines."""
+        cost_type: List[str] = cols[_COL["cost_type"]]
+        cost: List[str] = cols[_COL["cost"]]
+        currency: List[str] = cols[_COL["currency"]]
+        notes: List[str] = cols[_COL["notes"]]
+        return [
+            cost_line(dates[i], odo[i], cost_type[i], cost[i], currency[i], notes[i])
+            for i in order
+        ]
+
+    def __fuels(
+        self,
+        order: List[int],
+        cols: List[List[str]],
+        dates: List[str],
+        odo: List[str],
+        trip: Any,
+        quantity: Any,
+        routes: List[Any],
+        bad: Dict[int, str],
+    ) -> List[str]:
+        """Returns sorted fuel csv lines."""
+        if self.numpy:
+            if self.miles:
+                trip = np.round(trip * MILE, 0)
+            trips: List[str] = np.char.mod("%.2f", trip).tolist()
+            trip = np.array(trips, dtype=np.float64)
+            routes = [(column > 0).tolist() for column in routes]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                consumption: List[str] = np.char.mod(
+                    "%.2f", quantity * 100 / trip
+                ).tolist()
+            trip = trip.tolist()
+        else:
+            if self.miles:
+                trip = [round(value * MILE, 0) for value in trip]
+            trips = [f"{value:.2f}" for value in trip]
+            trip = [float(value) for value in trips]
+            routes = [[value > 0 for value in column] for column in routes]
+            consumption = [
+                f"{q * 100 / t:.2f}" if t > 0 else "" for q, t in zip(quantity, trip)
+            ]
+        # Roads: Sum of 2=motor-way, 4=city, 8=country roads
+        roads: List[str] = [ROADS[(c, m, r)] for m, r, c in zip(*routes)]
+
+        raw_quantity: List[str] = cols[_COL["quantity"]]
+        cost: List[str] = cols[_COL["cost"]]
+        currency: List[str] = cols[_COL["currency"]]
+        fueling_type: List[str] = cols[_COL["fueling_type"]]
+        tires: List[str] = cols[_COL["tires"]]
+        driving_style: List[str] = cols[_COL["driving_style"]]
+        fuel_name: List[str] = cols[_COL["fuel_name"]]
+        notes: List[str] = cols[_COL["notes"]]
+        station: List[str] = cols[_COL["gas_station_name"]]
+        out: List[str] = []
+        for i in order:
+            if trip[i] > 0 and not raw_quantity[i]:
+                self.__error(bad, i, "invalid number in 'quantity': ''")
+            if fueling_type[i] not in FUELING_TYPES and trip[i] != 0:
+                self.__error(bad, i, f"unknown fueling type: '{fueling_type[i]}'")
+            if driving_style[i] not in DRIVING_STYLES:
+                self.__error(bad, i, f"unknown driving style: '{driving_style[i]}'")
+            if i in bad:
+                continue
+            out.append(
+                fuel_line(
+                    dates[i],
+                    odo[i],
+                    trip[i],
+                    raw_quantity[i],
+                    cost[i],
+                    currency[i],
+                    fueling_type[i],
+                    tires[i],
+                    roads[i],
+                    driving_style[i],
+                    fuel_name[i],
+                    notes[i],
+                    consumption[i] if trip[i] > 0 else "",
+                    station[i],
+                )
+            )
+        return out
+
+
+# #[EOF]#######################################################################
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+  comms.py
+  Author : Jacek 'Szumak' Kotlarski --<szumak@virthost.pl>
+  Created: 16.10.2026, 23:52:40
+
+  Purpose: Bounded communication queue between reader and CsvProcessor.
+"""
+
+import time
+
+from queue import Full, Queue
+from threading import Event, Lock
+from typing import Any, Dict, Optional
+
+from jsktoolbox.attribtool import ReadOnlyClass
+from jsktoolbox.basetool.data import BData
+
+# default maximum number of batches in queue
+QUEUE_DEPTH: int = 16
+
+# default timeout of blocking operations in seconds
+TIMEOUT: float = 0.2
+
+
+class _Keys(object, metaclass=ReadOnlyClass):
+    """Internal Keys container class."""
+
+    BATCHES: str = "__batches__"
+    CLOSED: str = "__closed__"
+    CONSUMER_STALL: str = "__consumer_stall__"
+    LINES: str = "__lines__"
+    LOCK: str = "__lock__"
+    MAX_BATCH: str = "__max_batch__"
+    MAX_DEPTH: str = "__max_depth__"
+    PRODUCER_STALL: str = "__producer_stall__"
+    TIMEOUT: str = "__timeout__"
+
+
+class CommsQueue(Queue, BData):
+    """Bounded queue of record batches with statistics.
+
+    Producer blocks when the queue is full, so memory used by batches
+    waiting for processing is limited. Blocking operations wake up
+    after timeout to check if the other side is still working.
+    """
+
+    # attributes set by queue.Queue, BData does not allow undeclared ones
+    maxsize: int = 0
+    queue: Any = None
+    mutex: Any = None
+    not_empty: Any = None
+    not_full: Any = None
+    all_tasks_done: Any = None
+    unfinished_tasks: int = 0
+    is_shutdown: bool = False
+
+    def __init__(self, maxsize: int = QUEUE_DEPTH, timeout: float = TIMEOUT) -> None:
+        """Constructor.
+
+        ### Arguments:
+        - maxsize [int] - maximum number of batches in queue.
+        - timeout [float] - timeout of blocking operations in seconds.
+        """
+        Queue.__init__(self, maxsize)
+        self._set_data(key=_Keys.TIMEOUT, value=float(timeout), set_default_type=float)
+        self._set_data(key=_Keys.CLOSED, value=Event())
+        self._set_data(key=_Keys.LOCK, value=Lock())
+        self._set_data(key=_Keys.BATCHES, value=0, set_default_type=int)
+        self._set_data(key=_Keys.LINES, value=0, set_default_type=int)
+        self._set_data(key=_Keys.MAX_BATCH, value=0, set_default_type=int)
+        self._set_data(key=_Keys.MAX_DEPTH, value=0, set_default_type=int)
+        self._set_data(key=_Keys.PRODUCER_STALL, value=0.0, set_default_type=float)
+        self._set_data(key=_Keys.CONSUMER_STALL, value=0.0, set_default_type=float)
+
+    @property
+    def closed(self) -> bool:
+        """Returns True if consumer does not receive batches anymore."""
+        return self._data[_Keys.CLOSED].is_set()
+
+    @property
+    def timeout(self) -> float:
+        """Returns default timeout of blocking operations in seconds."""
+        return self._get_data(key=_Keys.TIMEOUT)  # type: ignore
+
+    def close(self) -> None:
+        """Marks queue as closed, waiting and next puts return immediately."""
+        self._data[_Keys.CLOSED].set()
+
+    def put(
+        self, item: Any, block: bool = True, timeout: Optional[float] = None
+    ) -> None:
+        """Puts batch into queue, blocks while the queue is full.
+
+        The batch is dropped if the queue is closed.
+        """
+        start: float = time.perf_counter()
+        stalled: bool = False
+        done: bool = False
+        while not self.closed:
+            try:
+                Queue.put(self, item, stalled, self.timeout)
+                done = True
+                break
+            except Full:
+                if not block:
+                    raise
+                stalled = True
+        with self._data[_Keys.LOCK]:
+            if stalled:
+                self._data[_Keys.PRODUCER_STALL] += time.perf_counter() - start
+            if not done:
+                return
+            if item is not None:
+                size: int = 1 if isinstance(item, str) else len(item)
+                self._data[_Keys.BATCHES] += 1
+                self._data[_Keys.LINES] += size
+                self._data[_Keys.MAX_BATCH] = max(self._data[_Keys.MAX_BATCH], size)
+            self._data[_Keys.MAX_DEPTH] = max(self._data[_Keys.MAX_DEPTH], self.qsize())
+
+    def get(self, block: bool = True, timeout: Optional[float] = None) -> Any:
+        """Returns batch from queue, raises Empty after timeout.
+
+        ### Arguments:
+        - block [bool] - wait for batch.
+        - timeout [Optional[float]] - timeout in seconds, default for the queue if None.
+        """
+        start: float = time.perf_counter()
+        try:
+            return Queue.get(
+                self, block, timeout if timeout is not None else self.timeout
+            )
+        finally:
+            with self._data[_Keys.LOCK]:
+                self._data[_Keys.CONSUMER_STALL] += time.perf_counter() - start
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns statistics of queue."""
+        with self._data[_Keys.LOCK]:
+            batches: int = self._data[_Keys.BATCHES]
+            lines: int = self._data[_Keys.LINES]
+            return {
+                "queue_depth": self.maxsize,
+                "max_queue_depth": self._data[_Keys.MAX_DEPTH],
+                "batches": batches,
+                "lines": lines,
+                "max_batch_size": self._data[_Keys.MAX_BATCH],
+                "avg_batch_size": round(lines / batches, 1) if batches else 0,
+                "producer_stall": round(self._data[_Keys.PRODUCER_STALL], 6),
+                "consumer_stall": round(self._data[_Keys.CONSUMER_STALL], 6),
+            }
+
+
+# #[EOF]#######################################################################
@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+"""
+  compression.py
+  Author : Jacek 'Szumak' Kotlarski --<szumak@virthost.pl>
+  Created: 17.10.2026, 02:11:36
+
+  Purpose: Transparent decompression of input and compression of output files.
+"""
+
+import bz2, gzip, io, lzma
+
+from queue import Queue
+from threading import Event, Thread
+from typing import Any, BinaryIO, Dict, List, Optional
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# supported formats with magic bytes at the start of compressed data
+MAGIC: Dict[str, bytes] = {
+    "gzip": b"\x1f\x8b",
+    "bz2": b"BZh",
+    "xz": b"\xfd7zXZ\x00",
+    "zstd": b"\x28\xb5\x2f\xfd",
+}
+
+# suffixes of compressed output files
+SUFFIXES: Dict[str, str] = {
+    "gzip": ".gz",
+    "bz2": ".bz2",
+    "xz": ".xz",
+    "zstd": ".zst",
+}
+
+# size of a single read of decompressed data
+CHUNK_SIZE: int = 1024 * 1024
+
+# maximum number of decompressed chunks waiting for reader
+DEPTH: int = 4
+
+
+def formats() -> List[str]:
+    """Returns list of formats available in this installation."""
+    return [fmt for fmt in MAGIC if fmt != "zstd" or zstandard is not None]
+
+
+def detect(head: bytes) -> Optional[str]:
+    """Returns format of compressed data by magic bytes, None for plain data."""
+    for fmt, magic in MAGIC.items():
+        if head.startswith(magic):
+            return fmt
+    return None
+
+
+def detect_file(path: str) -> Optional[str]:
+    """Returns format of compressed file, None for plain file."""
+    with open(path, "rb") as file:
+        return detect(file.read(8))
+
+
+def open_compressed(path: str) -> Optional[BinaryIO]:
+    """Returns stream of decompressed file data, None for plain file."""
+    fmt: Optional[str] = detect_file(path)
+    if fmt is None:
+        return None
+    file: BinaryIO = open(path, "rb")
+    try:
+        return ThreadedReader(decompressor(file, fmt), source=file)
+    except BaseException:
+        file.close()
+        raise
+
+
+def decompressor(stream: BinaryIO, fmt: str) -> BinaryIO:
+    """Returns stream of decompressed data.
+
+    ### Arguments:
+    - stream [BinaryIO] - stream of compressed data.
+    - fmt [str] - format of compressed data.
+    """
+    if fmt == "gzip":
+        return gzip.GzipFile(fileobj=stream, mode="rb")  # type: ignore
+    if fmt == "bz2":
+        return bz2.BZ2File(stream, "rb")  # type: ignore
+    if fmt == "xz":
+        return lzma.LZMAFile(stream, "rb")  # type: ignore
+    if fmt == "zstd" and zstandard is not None:
+        return zstandard.ZstdDecompressor().stream_reader(  # type: ignore
+            stream, read_across_frames=True
+        )
+    raise ValueError(f"Unsupported compression format: '{fmt}'")
+
+
+def compressor(stream: BinaryIO, fmt: str) -> BinaryIO:
+    """Returns stream compressing data written to stream.
+
+    Closing returned stream finishes compressed data, the underlying stream
+    stays open.
+
+    ### Arguments:
+    - stream [BinaryIO] - stream for compressed data.
+    - fmt [str] - compression format.
+    """
+    if fmt == "gzip":
+        return gzip.GzipFile(fileobj=stream, mode="wb", compresslevel=6)  # type: ignore
+    if fmt == "bz2":
+        return bz2.BZ2File(stream, "wb")  # type: ignore
+    if fmt == "xz":
+        return lzma.LZMAFile(stream, "wb")  # type: ignore
+    if fmt == "zstd" and zstandard is not None:
+        return zstandard.ZstdCompressor().stream_writer(  # type: ignore
+            stream, closefd=False
+        )
+    raise ValueError(f"Unsupported compression format: '{fmt}'")
+
+
+class ThreadedReader(io.RawIOBase):
+    """Reader of decompressed data prepared in a separate thread.
+
+    Decompression releases GIL, so the next chunks are decompressed
+    while the previous ones are parsed.
+    """
+
+    def __init__(
+        self,
+        stream: BinaryIO,
+        chunk_size: int = CHUNK_SIZE,
+        depth: int = DEPTH,
+        source: Optional[BinaryIO] = None,
+    ) -> None:
+        """Constructor.
+
+        ### Arguments:
+        - stream [BinaryIO] - stream of decompressed data.
+        - chunk_size [int] - size of a single read in bytes.
+        - depth [int] - maximum number of chunks waiting for reader.
+        - source [Optional[BinaryIO]] - file of compressed data, closed with
+          the reader.
+        """
+        io.RawIOBase.__init__(self)
+        self.__stream: BinaryIO = stream
+        self.__source: Optional[BinaryIO] = source
+        self.__chunk_size: int = chunk_size
+        self.__queue: Queue = Queue(depth)
+        self.__stop = Event()
+        self.__error: Optional[BaseException] = None
+        self.__eof: bool = False
+        # rest of the chunk not returned by previous read
+        self.__chunk: bytes = b""
+        self.__offset: int = 0
+        self.__thread = Thread(target=self.__run, daemon=True)
+        self.__thread.start()
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: Optional[int] = -1) -> bytes:  # type: ignore
+        """Returns up to size bytes, at most one chunk, empty bytes at the end.
+
+        All the rest of data is returned if size is negative.
+        """
+        if size is None or size < 0:
+            return self.readall()
+        return self.__next(size)
+
+    def readall(self) -> bytes:
+        """Returns all the rest of data."""
+        return b"".join(iter(lambda: self.__next(-1), b""))
+
+    def readinto(self, buffer: Any) -> int:
+        """Reads up to len(buffer) bytes into buffer, returns number of bytes."""
+        with memoryview(buffer) as view, view.cast("B") as out:
+            data: bytes = self.__next(len(out))
+            out[: len(data)] = data
+        return len(data)
+
+    def __next(self, size: int) -> bytes:
+        """Returns up to size bytes of the current chunk, whole rest if negative."""
+        chunk: bytes = self.__chunk
+        start: int = self.__offset
+        if start >= len(chunk):
+            chunk = self.__get()
+            start = 0
+            self.__chunk = chunk
+        end: int = len(chunk) if size < 0 else min(len(chunk), start + size)
+        self.__offset = end
+        if start == 0 and end == len(chunk):
+            return chunk
+        return chunk[start:end]
+
+    def __get(self) -> bytes:
+        """Returns the next decompressed chunk, empty bytes at the end of data."""
+        if self.__eof:
+            return b""
+        chunk: Optional[bytes] = self.__queue.get()
+        if chunk is None:
+            self.__eof = True
+            if self.__error is not None:
+                raise self.__error
+            return b""
+        return chunk
+
+    def close(self) -> None:
+        """Stops decompression thread and closes streams."""
+        if not self.closed:
+            self.__stop.set()
+            # unblock thread waiting for free place in queue
+            while self.__thread.is_alive():
+                while not self.__queue.empty():
+                    self.__queue.get_nowait()
+                self.__thread.join(0.05)
+            self.__stream.close()
+            if self.__source is not None:
+                self.__source.close()
+        io.RawIOBase.close(self)
+
+    def __run(self) -> None:
+        """Decompresses stream into queue of chunks."""
+        try:
+            while not self.__stop.is_set():
+                chunk: bytes = self.__stream.read(self.__chunk_size)
+                if not chunk:
+                    break
+                self.__queue.put(chunk)
+        except Exception as ex:
+            self.__error = ex
+        finally:
+            self.__queue.put(None)
+
+
+def open_input(stream: BinaryIO) -> BinaryIO:
+    """Returns stream of input data, compressed data is decompressed in thread.
+
+    ### Arguments:
+    - stream [BinaryIO] - input stream, for example sys.stdin.buffer.
+    """
+    if not hasattr(stream, "peek"):
+        stream = io.BufferedReader(stream)  # type: ignore
+    fmt: Optional[str] = detect(stream.peek(8)[:8])  # type: ignore
+    if fmt is None:
+        return stream
+    return ThreadedReader(decompressor(stream, fmt))  # type: ignore
+
+
+# #[EOF]#######################################################################
@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+"""
+  conversion.py
+  Author : Jacek 'Szumak' Kotlarski --<szumak@virthost.pl>
+  Created: 16.10.2026, 11:05:32
+
+  Purpose: Conversion of motostat records without threads and logger.
+"""
+
+import os
+
+from operator import attrgetter
+from typing import List, Optional, Tuple
+
+from jsktoolbox.attribtool import ReadOnlyClass
+from jsktoolbox.systemtool import PathChecker
+
+from libs.base import BMiles
+from libs.compression import SUFFIXES
+from libs.formatter import (
+    COST_CSV_HEADER,
+    FUELING_CSV_HEADER,
+    format_cost,
+    format_fuel,
+)
+from libs.model import MotoStat, MotoStatRecord, parse_record
+from libs.writer import write_csv_files
+
+# default names of output files
+COSTS_FILE: str = "spritmonitor_costs.csv"
+FUELS_FILE: str = "spritmonitor_fuels.csv"
+
+
+class _Keys(object, metaclass=ReadOnlyClass):
+    """Internal Keys container class."""
+
+    COUNT: str = "__count__"
+    DATA: str = "__data__"
+    ERRORS: str = "__errors__"
+    SKIPPED: str = "__skipped__"
+    SORTED: str = "__sorted__"
+
+
+def output_names(path: str, suffix: str = "") -> Tuple[str, str]:
+    """Returns costs and fuels file names derived from motostat export path.
+
+    ### Arguments:
+    - path [str] - path to motostat export, compression suffix is omitted.
+    - suffix [str] - text added to the name, used to avoid collisions.
+    """
+    name: str = os.path.basename(path)
+    for ext in SUFFIXES.values():
+        if name.endswith(ext):
+            name = name[: -len(ext)]
+            break
+    name = os.path.splitext(name)[0] + suffix
+    return f"spritmonitor_costs_{name}.csv", f"spritmonitor_fuels_{name}.csv"
+
+
+def check_output_dir(output_dir: str) -> Optional[str]:
+    """Creates output dir if needed, returns error message on failure."""
+    out_dir = PathChecker(f"{output_dir}/")
+    if out_dir.exists and out_dir.is_dir:
+        return None
+    if not out_dir.exists:
+        if not out_dir.create():
+            return f"Cannot create output directory: '{output_dir}', exiting."
+    if out_dir.is_file:
+        return f"Output dir: '{output_dir}' existing and is a file, exiting."
+    return None
+
+
+def parse_batch(
+    lines: List[str], miles: bool = False, row: int = 0
+) -> Tuple[List[MotoStatRecord], List[str]]:
+    """Returns records parsed from batch of lines and messages about skipped rows.
+
+    ### Arguments:
+    - lines [List[str]] - motostat csv lines.
+    - miles [bool] - convert distances to miles.
+    - row [int] - number of lines before the batch.
+    """
+    records: List[MotoStatRecord] = []
+    errors: List[str] = []
+    for line in lines:
+        row += 1
+        try:
+            record: Optional[MotoStatRecord] = parse_record(line.strip(), miles, row)
+        except ValueError as ex:
+            errors.append(f"{ex}")
+            continue
+        if record:
+            records.append(record)
+    return records, errors
+
+
+class Conversion(BMiles):
+    """Conversion of motostat lines to spritmonitor records."""
+
+    def __init__(self, miles: bool = False) -> None:
+        """Constructor.
+
+        ### Arguments:
+        - miles [bool] - mileage in miles flag.
+        """
+        self.miles = miles
+        self._set_data(key=_Keys.COUNT, value=0, set_default_type=int)
+        self._set_data(key=_Keys.DATA, value=[], set_default_type=List)
+        self._set_data(key=_Keys.ERRORS, value=[], set_default_type=List)
+        self._set_data(key=_Keys.SKIPPED, value=0, set_default_type=int)
+        self._set_data(key=_Keys.SORTED, value=True, set_default_type=bool)
+
+    @property
+    def count(self) -> int:
+        """Returns number of received lines."""
+        return self._get_data(key=_Keys.COUNT)  # type: ignore
+
+    @property
+    def records(self) -> int:
+        """Returns number of found motostat records."""
+        return len(self._get_data(key=_Keys.DATA))  # type: ignore
+
+    def add_line(self, line: str) -> MotoStat:
+        """Parses line and stores not empty record, returns MotoStat view."""
+        self._data[_Keys.COUNT] += 1
+        record: Optional[MotoStatRecord] = None
+        try:
+            record = parse_record(line.strip(), self.miles, self.count)
+        except ValueError as ex:
+            self._data[_Keys.ERRORS].append(f"{ex}")
+        if record:
+            self._data[_Keys.DATA].append(record)
+            self._data[_Keys.SORTED] = False
+        return MotoStat.from_record(record, self.miles)
+
+    def add_batch(self, lines: List[str]) -> None:
+        """Parses batch of lines."""
+        self.add_records(*parse_batch(lines, self.miles, self.count), len(lines))
+
+    def add_records(
+        self, records: List[MotoStatRecord], errors: List[str], lines: int
+    ) -> None:
+        """Stores records parsed from batch of lines.
+
+        ### Arguments:
+        - records [List[MotoStatRecord]] - parsed records.
+        - errors [List[str]] - messages about skipped rows.
+        - lines [int] - number of lines in batch.
+        """
+        self._data[_Keys.DATA].extend(records)
+        self._data[_Keys.ERRORS].extend(errors)
+        self._data[_Keys.COUNT] += lines
+        self._data[_Keys.SORTED] = False
+
+    def pop_errors(self) -> List[str]:
+        """Returns and clears list of messages about skipped rows."""
+        out: List[str] = self._data[_Keys.ERRORS]
+        self._data[_Keys.ERRORS] = []
+        self._data[_Keys.SKIPPED] += len(out)
+        return out
+
+    @property
+    def skipped(self) -> int:
+        """Returns number of rows skipped because of invalid data."""
+        return self._data[_Keys.SKIPPED] + len(self._data[_Keys.ERRORS])
+
+    def sort(self) -> List[MotoStatRecord]:
+        """Sorts stored records in output order, returns list of records."""
+        data: List[MotoStatRecord] = self._data[_Keys.DATA]
+        if not self._data[_Keys.SORTED]:
+            # exports are newest-first, sort finds ordered input in linear time
+            data.sort(key=attrgetter("key"), reverse=True)
+            self._data[_Keys.SORTED] = True
+        return data
+
+    def convert(self) -> Tuple[List[str], List[str]]:
+        """Returns lists of sorted cost and fuel csv lines."""
+        costs: List[str] = []
+        fuels: List[str] = []
+        for record in self.sort():
+            if record.cost_id:
+                costs.append(format_cost(record))
+            if record.fuel_id:
+                fuels.append(format_fuel(record))
+        return costs, fuels
+
+    def write(
+        self,
+        output_dir: str,
+        costs_file: str = COSTS_FILE,
+        fuels_file: str = FUELS_FILE,
+        append: bool = False,
+        fsync: bool = False,
+    ) -> Tuple[int, int]:
+        """Converts and writes csv files, returns number of cost and fuel records.
+
+        ### Arguments:
+        - output_dir [str] - output directory.
+        - costs_file [str] - name of costs csv file.
+        - fuels_file [str] - name of fuels csv file.
+        - append [bool] - append records to existing files.
+        - fsync [bool] - flush files to disk before they replace old ones.
+        """
+        costs, fuels = self.convert()
+        write_csv_files(
+            [
+                (os.path.join(output_dir, costs_file), COST_CSV_HEADER, costs),
+                (os.path.join(output_dir, fuels_file), FUELING_CSV_HEADER, fuels),
+            ],
+            append,
+            fsync,
+        )
+        return len(costs), len(fuels)
+
+
+# #[EOF]#######################################################################
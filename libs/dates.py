@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+  dates.py
+  Author : Jacek 'Szumak' Kotlarski --<szumak@virthost.pl>
+  Created: 16.10.2026, 15:58:12
+
+  Purpose: Memoized codec for motostat dates.
+
+  Motostat dates are calendar days without time zone. Timestamps are
+  generated for midnight UTC, so ordering and formatting do not depend
+  on the local time zone of the machine.
+"""
+
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Tuple
+
+# number of distinct dates kept in cache
+DATE_CACHE_SIZE: int = 4096
+
+# seconds per day
+DAY: int = 86400
+
+# ordinal of 1970-01-01
+EPOCH_ORDINAL: int = date(1970, 1, 1).toordinal()
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def decode_date(value: str) -> Tuple[int, str]:
+    """Returns UTC midnight timestamp and 'DD.MM.YYYY' string for ISO date.
+
+    ### Arguments:
+    - value [str] - date in '%Y-%m-%d' format.
+
+    Raises ValueError for invalid date.
+    """
+    if len(value) == 10 and value[4] == "-" and value[7] == "-":
+        day: date = date.fromisoformat(value)
+    else:
+        # not padded values accepted by strptime
+        day = datetime.strptime(value, "%Y-%m-%d").date()
+    return (
+        (day.toordinal() - EPOCH_ORDINAL) * DAY,
+        f"{day.day:02d}.{day.month:02d}.{day.year}",
+    )
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def _format_day(days: int) -> str:
+    """Returns 'DD.MM.YYYY' string for number of days since epoch."""
+    day: date = date.fromordinal(days + EPOCH_ORDINAL)
+    return f"{day.day:02d}.{day.month:02d}.{day.year}"
+
+
+def format_date(timestamp: float) -> str:
+    """Returns 'DD.MM.YYYY' string for timestamp generated by decode_date."""
+    return _format_day(int(timestamp // DAY))
+
+
+# #[EOF]#######################################################################
@@ -0,0 +1,291 @@
+# -*- coding: utf-8 -*-
+"""
+  formatter.py
+  Author : Jacek 'Szumak' Kotlarski --<szumak@virthost.pl>
+  Created: 16.10.2026, 16:40:27
+
+  Purpose: Precompiled formatters of spritmonitor csv lines.
+"""
+
+from decimal import Decimal
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Mapping, Optional, Tuple
+
+from libs.dates import format_date
+
+if TYPE_CHECKING:
+    from libs.model import MotoStatRecord
+
+# spritmonitor codes for motostat values
+# Fueling type: 0=invalid fueling, 1=full fueling, 2=partial fueling, 3=first fueling
+FUELING_TYPES: Mapping[str, str] = MappingProxyType(
+    {
+        "full": "1",
+        "partial": "2",
+    }
+)
+
+# Tires: 1=summer tires, 2=winter tires, 3=all-year tires
+TIRES: Mapping[str, str] = MappingProxyType(
+    {"full_year": "3", "summer": "1", "winter": "2"}
+)
+
+# Driving style: 1=moderate, 2=normal, 3=fast
+DRIVING_STYLES: Mapping[str, str] = MappingProxyType(
+    {"normal": "2", "speedy": "3", "economical": "1"}
+)
+
+# Fuel sort: 1=Diesel, 2=Biodiesel, 3=Vegetable oil, 4=Premium Diesel,
+# 6=Normal gasoline, 7=Super gasoline, 8=SuperPlus gasoline,
+# 9=Premium Gasoline 100, 12=LPG, 13=CNG H, 14=CNG L, 15=Bio-alcohol,
+# 16=Two-stroke, 18=Premium Gasoline 95, 19=Electricity, 20=E10, 21=AdBlue,
+# 22=Premium Gasoline 100+, 23=Hydrogen, 24=Green electricity, 25=GTL Diesel, 26=HVO100
+FUEL_CODES: Mapping[str, str] = MappingProxyType(
+    {
+        "95 miles": "6",
+        "98 miles plus": "8",
+        "BP Ultimate Diesel": "4",
+        "CNG": "14",
+        "Diesel miles plus": "4",
+        "Diesel miles": "4",
+        "Diesel": "1",
+        "Dwusuw (mieszanka)": "16",
+        "Ecto Diesel": "4",
+        "Ecto Plus": "7",
+        "EkoDiesel": "2",
+        "Etanol E85": "15",
+        "Eurosuper 95": "6",
+        "Fuel Save 95": "18",
+        "Fuel Save Diesel": "4",
+        "LPG": "12",
+        "Lotos Dynamic 98": "8",
+        "Lotos Dynamic Diesel": "4",
+        "Orlen Bioester": "2",
+        "Orlen Verva 98": "8",
+        "Orlen Verva ON": "4",
+        "Shell Diesel Extra": "4",
+        "Shell V-Power Diesel": "4",
+        "Shell V-Power Nitro+ Diesel": "4",
+        "Shell V-Power Nitro+ Racing": "22",
+        "Shell V-Power Nitro+": "9",
+        "Shell V-Power Racing": "9",
+        "Shell V-Power": "18",
+        "Statoil Diesel": "1",
+        "Statoil DieselGold": "4",
+        "Statoil SupraGaz": "18",
+        "Statoil Truckdiesel": "1",
+        "Super Plus 98": "8",
+        "Total Excellium": "8",
+        "inna benzyna": "6",
+        "inny gaz CNG": "12",
+        "inny gaz LPG": "12",
+        "inny olej napędowy": "1",
+    }
+)
+
+# Cost type: 1=Maintenance, 2=Repair, 3=Change tires, 4=Change oil,
+# 5=Insurance, 6=Tax, 7=Supervisory board, 8=Tuning, 9=Accessories,
+# 10=Purchase price, 11=Miscellaneous, 12=Care, 13=Payment, 14=Registration,
+# 15=Financing, 16=Refund, 17=Fine, 18=Parking tax, 19=Toll, 20=Spare parts,
+# 21=Basic charging fee
+COST_TYPES: Mapping[str, str] = MappingProxyType(
+    {
+        "maintenance": "1",
+        "repair": "2",
+        "tires_change": "3",
+        "oil_change": "4",
+        "insurance": "5",
+        "tax": "6",
+        "tuning": "8",
+        "accessories": "9",
+        "purchase_price": "10",
+        "miscellaneous": "11",
+        "tech_inspection": "11",
+        "car_audio": "9",
+        "inspection": "11",
+        "care": "12",
+        "registration": "14",
+        "fine": "17",
+        "parking_tax": "18",
+        "toll": "19",
+        "spare_parts": "20",
+    }
+)
+
+# columns of spritmonitor fuels csv
+FUELING_HEADER: Tuple[str, ...] = (
+    "Date",
+    "Odometer",
+    "Trip",
+    "Quantity",
+    "Total price",
+    "Currency",
+    "Type",
+    "Tires",
+    "Roads",
+    "Driving style",
+    "Fuel",
+    "Note",
+    "Consumption",
+    "BC-Consumption",
+    "BC-Quantity",
+    "BC-Speed",
+    "Company",
+    "Country",
+    "Area",
+    "Location",
+)
+
+# columns of spritmonitor costs csv
+COST_HEADER: Tuple[str, ...] = (
+    "Date",
+    "Odometer",
+    "Cost type",
+    "Total price",
+    "Currency",
+    "Note",
+)
+
+# spritmonitor roads codes for (city, motorway, country) flags
+ROADS: Mapping[Tuple[bool, bool, bool], str] = MappingProxyType(
+    {
+        (city, motorway, country): f"{city * 4 + motorway * 2 + country * 8}"
+        for city in (False, True)
+        for motorway in (False, True)
+        for country in (False, True)
+    }
+)
+
+# spritmonitor country for currency
+COUNTRIES: Mapping[str, str] = MappingProxyType({"PLN": '"PL"'})
+
+# csv header lines
+FUELING_CSV_HEADER: str = ";".join(FUELING_HEADER)
+COST_CSV_HEADER: str = ";".join(COST_HEADER)
+
+
+def _odometer(value: str) -> str:
+    """Returns odometer in spritmonitor format."""
+    if value == "0":
+        return "0,00"
+    return f"{value},00"
+
+
+def _number(value: Optional[Decimal]) -> str:
+    """Returns number as string, empty for None."""
+    if value is None:
+        return ""
+    return str(value)
+
+
+def fuel_line(
+    date: str,
+    odometer: str,
+    trip: float,
+    quantity: str,
+    cost: str,
+    currency: str,
+    fueling_type: str,
+    tires: str,
+    roads: str,
+    driving_style: str,
+    fuel_name: str,
+    notes: str,
+    consumption: str,
+    station: str,
+) -> str:
+    """Returns spritmonitor fuels csv line from motostat values.
+
+    Numbers are given with dot as decimal separator, 'roads' is already
+    a spritmonitor code, shared by row and columnar engines.
+    """
+    return ";".join(
+        (
+            date,
+            _odometer(odometer),
+            f"{trip:.2f}".replace(".", ","),
+            quantity.replace(".", ","),
+            cost.replace(".", ","),
+            currency,
+            # Type: 1=full fueling, 2=partial fueling, 3=first fueling
+            "3" if trip == 0 else FUELING_TYPES[fueling_type],
+            TIRES.get(tires, ""),
+            roads,
+            DRIVING_STYLES[driving_style],
+            FUEL_CODES.get(fuel_name.strip('"'), ""),
+            f'"{notes}"',
+            consumption.replace(".", ","),
+            "",
+            "",
+            "",
+            f'"{station}"',
+            COUNTRIES.get(currency, ""),
+            '""',
+            '""',
+        )
+    )
+
+
+def cost_line(
+    date: str, odometer: str, cost_type: str, cost: str, currency: str, notes: str
+) -> str:
+    """Returns spritmonitor costs csv line from motostat values.
+
+    Numbers are given with dot as decimal separator.
+    """
+    return ";".join(
+        (
+            date,
+            _odometer(odometer),
+            COST_TYPES.get(cost_type, "11"),
+            "0,00" if cost == "0" else cost.replace(".", ","),
+            f'"{currency}"',
+            notes or '""',
+        )
+    )
+
+
+def format_fuel(record: "MotoStatRecord") -> str:
+    """Returns spritmonitor fuels csv line for fueling record."""
+    trip: float = record.trip_odometer  # type: ignore
+    consumption: str = ""
+    if trip > 0:
+        consumption = f"{float(record.quantity) * 100 / trip:.2f}"  # type: ignore
+    return fuel_line(
+        format_date(record.date),
+        _number(record.odometer),
+        trip,
+        _number(record.quantity),
+        _number(record.cost),
+        record.currency,
+        record.fueling_type,
+        record.tires,
+        # Roads: Sum of 2=motor-way, 4=city, 8=country roads
+        ROADS[
+            (
+                record.route_city > 0,  # type: ignore
+                record.route_motorway > 0,  # type: ignore
+                record.route_country > 0,  # type: ignore
+            )
+        ],
+        record.driving_style,
+        record.fuel_name,
+        record.notes,
+        consumption,
+        record.gas_station_name,
+    )
+
+
+def format_cost(record: "MotoStatRecord") -> str:
+    """Returns spritmonitor costs csv line for cost record."""
+    return cost_line(
+        format_date(record.date),
+        _number(record.odometer),
+        record.cost_type,
+        _number(record.cost),
+        record.currency,
+        record.notes,
+    )
+
+
+# #[EOF]#######################################################################
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""
+  incremental.py
+  Author : Jacek 'Szumak' Kotlarski --<szumak@virthost.pl>
+  Created: 16.10.2026, 21:42:16
+
+  Purpose: Watermark of converted records for incremental conversion.
+"""
+
+import json, os, re, time
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from jsktoolbox.attribtool import ReadOnlyClass
+from jsktoolbox.basetool.data import BData
+
+from libs.model import MOTOSTAT_HEADER
+from libs.tokenizer import split_line
+
+# row number of message about skipped row
+_ROW = re.compile(r"row (\d+):")
+
+# numbers of fields of lines accepted by parser
+_FIELDS: Tuple[int, int] = (len(MOTOSTAT_HEADER), len(MOTOSTAT_HEADER) - 2)
+
+
+class _Keys(object, metaclass=ReadOnlyClass):
+    """Internal Keys container class."""
+
+    COST_ID: str = "cost_id"
+    FUELING_ID: str = "fueling_id"
+    NEW: str = "__new__"
+    PATH: str = "__path__"
+    ROW: str = "__row__"
+    STATE: str = "__state__"
+
+
+def delta_names(day: Optional[str] = None) -> Tuple[str, str]:
+    """Returns costs and fuels delta file names for given day.
+
+    ### Arguments:
+    - day [Optional[str]] - day in YYYYMMDD format, today if not given.
+    """
+    if day is None:
+        day = time.strftime("%Y%m%d")
+    return f"spritmonitor_costs_{day}.csv", f"spritmonitor_fuels_{day}.csv"
+
+
+class Watermark(BData):
+    """Watermark of records converted in previous runs.
+
+    The state file keeps the highest converted 'cost_id' and 'fueling_id'.
+    Rows with ids not above the stored ones are skipped before parsing,
+    the watermark is moved only over records accepted by the parser:
+    rows with valid number of fields, not reported as skipped.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Constructor.
+
+        ### Arguments:
+        - path [str] - path to the state file, missing file means the first run.
+        """
+        self._set_data(key=_Keys.PATH, value=path, set_default_type=str)
+        state: Dict[str, Any] = {_Keys.COST_ID: 0, _Keys.FUELING_ID: 0}
+        if os.path.exists(path):
+            with open(path, "r") as file:
+                data: Dict[str, Any] = json.load(file)
+            for key in state:
+                state[key] = int(data.get(key, state[key]))
+        self._set_data(key=_Keys.STATE, value=state, set_default_type=Dict)
+        # new values, stored by save()
+        self._set_data(key=_Keys.COST_ID, value=state[_Keys.COST_ID])
+        self._set_data(key=_Keys.FUELING_ID, value=state[_Keys.FUELING_ID])
+        # ids of passed rows by row number, until advance()
+        self._set_data(key=_Keys.NEW, value={}, set_default_type=Dict)
+        self._set_data(key=_Keys.ROW, value=0, set_default_type=int)
+
+    @property
+    def cost_id(self) -> int:
+        """Returns the highest converted cost id."""
+        return self._get_data(key=_Keys.COST_ID)  # type: ignore
+
+    @property
+    def fueling_id(self) -> int:
+        """Returns the highest converted fueling id."""
+        return self._get_data(key=_Keys.FUELING_ID)  # type: ignore
+
+    def filter(self, lines: List[str]) -> List[str]:
+        """Returns lines with rows converted in previous runs emptied.
+
+        Lines keep their positions, so the parser reports skipped rows with
+        their numbers in the input. Lines without numeric ids are passed
+        to the parser to report them.
+        """
+        state: Dict[str, Any] = self._get_data(key=_Keys.STATE)  # type: ignore
+        last_cost: int = state[_Keys.COST_ID]
+        last_fueling: int = state[_Keys.FUELING_ID]
+        new: Dict[int, Tuple[str, int]] = self._data[_Keys.NEW]
+        row: int = self._data[_Keys.ROW]
+        out: List[str] = []
+        for line in lines:
+            row += 1
+            # ids are not quoted, no need to tokenize the whole line
+            data: List[str] = line.lstrip().split(";", 2)
+            if len(data) > 2 and data[0].isdigit():
+                item_id: int = int(data[0])
+                if item_id <= last_cost:
+                    line = ""
+                elif len(split_line(line.strip())) in _FIELDS:
+                    new[row] = (_Keys.COST_ID, item_id)
+            elif len(data) > 2 and data[1].isdigit():
+                item_id = int(data[1])
+                if item_id <= last_fueling:
+                    line = ""
+                elif len(split_line(line.strip())) in _FIELDS:
+                    new[row] = (_Keys.FUELING_ID, item_id)
+            out.append(line)
+        self._data[_Keys.ROW] = row
+        return out
+
+    def advance(self, errors: List[str]) -> None:
+        """Moves watermark over passed rows, except rows reported in errors.
+
+        ### Arguments:
+        - errors [List[str]] - messages about skipped rows, 'row N: ...'.
+        """
+        new: Dict[int, Tuple[str, int]] = self._data[_Keys.NEW]
+        for message in errors:
+            match = _ROW.match(message)
+            if match:
+                new.pop(int(match.group(1)), None)
+        for key, item_id in new.values():
+            if item_id > self._data[key]:
+                self._data[key] = item_id
+        new.clear()
+
+    def save(self) -> None:
+        """Writes new watermark to the state file."""
+        path: str = self._get_data(key=_Keys.PATH)  # type: ignore
+        state: Dict[str, Any] = {
+            _Keys.COST_ID: self.cost_id,
+            _Keys.FUELING_ID: self.fueling_id,
+        }
+        tmp: str = f"{path}.tmp"
+        with open(tmp, "w") as file:
+            json.dump(state, file, indent=2)
+        os.replace(tmp, path)
+        self._set_data(key=_Keys.STATE, value=state)
+
+
+# #[EOF]#######################################################################
@@ -7,29 +7,77 @@
   Purpose: The main project class.
 """
 
-from queue import Queue
-import os, sys, time, signal
+import os, sys, signal
 
-from typing import Optional
+from threading import Thread
+from typing import BinaryIO, List, Optional
 
 
 from jsktoolbox.libs.system import CommandLineParser
 from jsktoolbox.logstool.logs import (
     LoggerEngine,
     LoggerClient,
+    LoggerEngineStderr,
     LoggerEngineStdout,
     LoggerEngineFile,
     LoggerQueue,
     LogsLevelKeys,
-    ThLoggerProcessor,
 )
 from jsktoolbox.logstool.formatters import LogFormatterNull, LogFormatterDateTime
 
-from libs.base import BDir, BMiles, BaseApp, BDebug, BVerbose
+from libs.base import (
+    BBatch,
+    BCache,
+    BColumnar,
+    BCompression,
+    BDir,
+    BFsync,
+    BInput,
+    BJobs,
+    BMemory,
+    BMiles,
+    BOutput,
+    BQueue,
+    BServer,
+    BState,
+    BStats,
+    BaseApp,
+    BDebug,
+    BVerbose,
+    ThLogsProcessor,
+)
+from libs.batch import BatchProcessor, available_cores
+from libs.cache import ResultCache, hash_files, input_hash
+from libs.comms import CommsQueue
+from libs.compression import formats, open_compressed, open_input
+from libs.output import STDOUT, check_target
 from libs.processor import CsvProcessor
-
-
-class Converter(BaseApp, BMiles, BDebug, BVerbose, BDir):
+from libs.profiling import StageProfiler
+from libs.reader import ChunkReader, MmapReader
+from libs.server import ConversionServer, ConversionService, parse_address
+from libs.stats import RunStats
+
+
+class Converter(
+    BaseApp,
+    BMiles,
+    BDebug,
+    BVerbose,
+    BDir,
+    BInput,
+    BBatch,
+    BColumnar,
+    BMemory,
+    BState,
+    BCache,
+    BJobs,
+    BQueue,
+    BFsync,
+    BOutput,
+    BCompression,
+    BStats,
+    BServer,
+):
     """Main class."""
 
     def __init__(self) -> None:
@@ -39,6 +87,9 @@ class Converter(BaseApp, BMiles, BDebug, BVerbose, BDir):
         log_engine = LoggerEngine()
         log_queue: Optional[LoggerQueue] = log_engine.logs_queue
 
+        # check command line, logger levels depend on output targets
+        self.__init_command_line()
+
         # logger levels
         self.__init_log_levels(log_engine)
 
@@ -46,15 +97,12 @@ class Converter(BaseApp, BMiles, BDebug, BVerbose, BDir):
         self.logs = LoggerClient()
 
         # logger processor
-        thl = ThLoggerProcessor()
+        thl = ThLogsProcessor()
         thl.sleep_period = 0.2
         thl.logger_engine = log_engine
         thl.logger_client = self.logs
         self.logs_processor = thl
 
-        # check command line
-        self.__init_command_line()
-
         # update debug
         self.logs_processor._debug = self.debug
 
@@ -71,8 +119,37 @@ class Converter(BaseApp, BMiles, BDebug, BVerbose, BDir):
         # logger processor
         self.logs_processor.start()
 
+        # main procedure
+        if self.serve:
+            self.__run_server()
+        elif self.batch:
+            self.__run_batch()
+        else:
+            self.__run_pipeline()
+
+        # logger processor, final flush of logs is made before thread ends
+        self.logs_processor.stop()
+        self.logs_processor.join()
+
+        sys.exit(0)
+
+    def __run_pipeline(self) -> None:
+        """Convert input with CsvProcessor thread."""
         # init variables
-        comms_queue: Queue = Queue()
+        comms_queue = CommsQueue(self.queue_depth)
+        stats = RunStats(self.__profiler())
+
+        # result cache, not used in incremental mode and for stream output
+        cache: Optional[ResultCache] = None
+        if (
+            self.cache_dir
+            and not self.state_file
+            and not (self.costs_out or self.fuels_out)
+        ):
+            try:
+                cache = ResultCache(self.cache_dir, self.cache_size * 1024 * 1024)
+            except OSError as ex:
+                self.logs.message_error = f"Cache disabled: {ex}"
 
         # CsvProcessor
         csv_proc = CsvProcessor(
@@ -85,6 +162,17 @@ class Converter(BaseApp, BMiles, BDebug, BVerbose, BDir):
             debug=self.debug,
             verbose=self.verbose,
             miles=self.miles,
+            columnar=self.columnar,
+            memory_limit=self.memory_limit,
+            state_file=self.state_file,
+            cache=cache,
+            jobs=self.jobs,
+            fsync=self.fsync,
+            costs_out=self.costs_out,
+            fuels_out=self.fuels_out,
+            presorted=self.presorted,
+            compression=self.compression,
+            stats=stats,
         )
 
         # set output dir
@@ -93,38 +181,169 @@ class Converter(BaseApp, BMiles, BDebug, BVerbose, BDir):
         # starting CsvProcessor
         csv_proc.start()
 
-        # main procedure
-        if not os.isatty(sys.stdin.fileno()):
-            line: str = ""
-            while not self.stop:
-                line += sys.stdin.readline()
-                if line == "":
-                    break
-                # print(line)
-                if not line.endswith("\r\n"):
-                    comms_queue.put(line)
-                    line = ""
-        else:
-            self.logs.message_info = "Application can read only from STDIN pipe"
-            self.logs.message_info = "Example of usage:"
-            self.logs.message_info = f"$ cat file.csv|{sys.argv[0]}"
-
-        # exit
-        time.sleep(1)
+        # reading input
+        with stats.stage("read"):
+            self.__read_input(comms_queue, csv_proc, cache, stats)
+        stats.checkpoint("read")
 
-        # stop CsvProcessor
+        # stop CsvProcessor and wait for processing the rest of data
         csv_proc.stop()
-        while csv_proc.is_alive():
-            time.sleep(0.1)
         csv_proc.join()
 
-        # logger processor
-        self.logs_processor.stop()
-        while not self.logs_processor.is_stopped:
-            self.logs_processor.join()
-            time.sleep(0.1)
-
-        sys.exit(0)
+        queue = comms_queue.stats()
+        stats.set("queue", queue)
+        if self.verbose:
+            self.logs.message_info = (
+                f"Queue: {queue['batches']} batches, {queue['lines']} lines, "
+                f"batch size avg {queue['avg_batch_size']} "
+                f"max {queue['max_batch_size']}, "
+                f"depth max {queue['max_queue_depth']}/{queue['queue_depth']}, "
+                f"stall producer {queue['producer_stall']:.3f}s "
+                f"consumer {queue['consumer_stall']:.3f}s."
+            )
+        self.__write_stats(stats)
+        if stats.profiler is not None:
+            try:
+                stats.profiler.write()
+                self.logs.message_info = (
+                    f"Profiling reports written to '{stats.profiler.directory}'."
+                )
+            except OSError as ex:
+                self.logs.message_error = f"Cannot write profiling reports: {ex}"
+
+    def __profiler(self) -> Optional[StageProfiler]:
+        """Returns profiler of stages if profiling is requested."""
+        if not self.profile_dir:
+            return None
+        try:
+            return StageProfiler(self.profile_dir)
+        except OSError as ex:
+            self.logs.message_error = f"Profiling disabled: {ex}"
+        return None
+
+    def __read_input(
+        self,
+        comms_queue: CommsQueue,
+        csv_proc: CsvProcessor,
+        cache: Optional[ResultCache],
+        stats: RunStats,
+    ) -> None:
+        """Send batches of records from files or STDIN to CsvProcessor."""
+        if self.input_files:
+            files: List[str] = []
+            for path in self.input_files:
+                if os.path.isfile(path):
+                    files.append(path)
+                else:
+                    self.logs.message_error = f"Input file not found: '{path}'"
+            if cache is not None and files == self.input_files:
+                csv_proc.cache_key = hash_files(files, self.miles, self.compression)
+                # the entry may be evicted at any time, so it is restored now
+                restored = cache.restore(csv_proc.cache_key, self.output_dir)
+                if restored is not None:
+                    # the same input was converted before, nothing to read
+                    csv_proc.restored = restored
+                    files = []
+            # memory mapped files, records are sent to CsvProcessor in batches
+            for path in files:
+                stats.add("bytes_in", os.path.getsize(path))
+                # compressed files are decompressed in thread while parsing
+                stream: Optional[BinaryIO] = open_compressed(path)
+                try:
+                    reader = MmapReader(path) if stream is None else ChunkReader(stream)
+                    for batch in reader.batches():
+                        comms_queue.put(batch)
+                        if self.stop:
+                            break
+                finally:
+                    if stream is not None:
+                        stream.close()
+                if self.stop:
+                    break
+        elif not sys.stdin.isatty():
+            # bulk reading, records are sent to CsvProcessor in batches
+            hasher = (
+                input_hash(self.miles, self.compression) if cache is not None else None
+            )
+            reader = ChunkReader(open_input(sys.stdin.buffer))
+            for batch in reader.batches(hasher):
+                comms_queue.put(batch)
+                if self.stop:
+                    break
+            stats.add("bytes_in", reader.size)
+            if hasher is not None and not self.stop:
+                csv_proc.cache_key = hasher.hexdigest()
+        else:
+            self.logs.message_info = (
+                "Application reads from STDIN pipe or from files given as arguments"
+            )
+            self.logs.message_info = "Example of usage:"
+            self.logs.message_info = f"$ cat file.csv|{sys.argv[0]}"
+            self.logs.message_info = f"$ {sys.argv[0]} file1.csv [file2.csv ...]"
+
+    def __write_stats(self, stats: RunStats) -> None:
+        """Write statistics of the run to requested files."""
+        if not (self.stats_file or self.metrics_file or self.verbose):
+            return
+        report = stats.to_dict()
+        if self.verbose:
+            self.logs.message_info = (
+                f"Stats: {report['counters']['records_parsed']} records in "
+                f"{report['wall_time']:.3f}s, "
+                f"{report['records_per_second']} records/s, "
+                f"cpu {report['cpu_time']:.3f}s, "
+                f"peak rss {report['peak_rss'] // (1024 * 1024)} MiB."
+            )
+        try:
+            if self.stats_file:
+                stats.write_json(self.stats_file, report)
+            if self.metrics_file:
+                stats.write_prometheus(self.metrics_file, report)
+        except OSError as ex:
+            self.logs.message_error = f"Cannot write statistics: {ex}"
+
+    def __run_batch(self) -> None:
+        """Convert every input file separately on process pool."""
+        if not self.input_files:
+            self.logs.message_error = "Batch mode requires files or directories."
+            return
+        batch = BatchProcessor(
+            logger_client=self.logs,
+            miles=self.miles,
+            debug=self.debug,
+            fsync=self.fsync,
+        )
+        batch.output_dir = self.output_dir
+        batch.run(self.input_files)
+
+    def __run_server(self) -> None:
+        """Serve conversions over HTTP until TERM|INT signal."""
+        service = ConversionService(
+            jobs=self.jobs,
+            max_requests=self.max_requests,
+            miles=self.miles,
+            logger_client=self.logs,
+            debug=self.debug,
+        )
+        try:
+            server = ConversionServer(parse_address(self.serve), service)
+        except (OSError, ValueError) as ex:
+            service.close()
+            self.logs.message_error = f"Cannot start server on '{self.serve}': {ex}"
+            return
+        host, port = server.server_address[:2]
+        self.logs.message_info = (
+            f"Serving conversions on http://{host}:{port}/convert "
+            f"with {self.jobs} workers."
+        )
+        thread = Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        # signal handler sets stop flag in the main thread
+        while not self.stop and thread.is_alive():
+            thread.join(0.2)
+        server.shutdown()
+        server.server_close()
+        self.logs.message_info = "Server stopped."
 
     def __sig_exit(self, signum: int, frame) -> None:
         """Received TERM|INT signal."""
@@ -138,9 +357,69 @@ class Converter(BaseApp, BMiles, BDebug, BVerbose, BDir):
 
         # configuration for arguments
         parser.configure_argument("h", "help", "this information.")
+        parser.configure_argument(
+            "b",
+            "batch",
+            "convert every file separately, directories are searched for motostat*.csv.",
+        )
+        parser.configure_argument(
+            "c", "columnar", "columnar conversion engine, vectorized with NumPy."
+        )
         parser.configure_argument("d", "debug", "debug flag for debugging.")
+        parser.configure_argument(
+            "f", "fsync", "flush output files to disk before they replace old ones."
+        )
+        parser.configure_argument(
+            "i",
+            "incremental",
+            "convert only records newer than saved in state file, append to daily delta files.",
+            has_value=True,
+            example_value="/tmp/spritmonitor_state.json",
+        )
         parser.configure_argument("v", "verbose", "verbose flag.")
+        parser.configure_argument(
+            "z",
+            "compress",
+            f"compress output files with one of: {', '.join(formats())}.",
+            has_value=True,
+            example_value="gzip",
+        )
+        parser.configure_argument(
+            "j",
+            "jobs",
+            "number of processes parsing records, 0 for all cores.",
+            has_value=True,
+            example_value="4",
+        )
+        parser.configure_argument(
+            "l",
+            "memory_limit",
+            "streaming conversion with memory budget in MiB for sorted runs.",
+            has_value=True,
+            example_value="64",
+        )
         parser.configure_argument("m", "miles", "mileage in miles.")
+        parser.configure_argument(
+            "q",
+            "queue_depth",
+            "maximum number of record batches waiting for processing, default 16.",
+            has_value=True,
+            example_value="16",
+        )
+        parser.configure_argument(
+            "r",
+            "cache_dir",
+            "cache of conversion results, unchanged input is restored without parsing.",
+            has_value=True,
+            example_value="~/.cache/motostat",
+        )
+        parser.configure_argument(
+            "s",
+            "cache_size",
+            "size limit of cache in MiB, default 256.",
+            has_value=True,
+            example_value="256",
+        )
         parser.configure_argument(
             "o",
             "output_dir",
@@ -148,6 +427,60 @@ class Converter(BaseApp, BMiles, BDebug, BVerbose, BDir):
             has_value=True,
             example_value="/tmp",
         )
+        parser.configure_argument(
+            None,
+            "costs_out",
+            "write cost records to '-' for STDOUT, 'fd:N' for file descriptor or path.",
+            has_value=True,
+            example_value="-",
+        )
+        parser.configure_argument(
+            None,
+            "fuels_out",
+            "write fuel records to '-' for STDOUT, 'fd:N' for file descriptor or path.",
+            has_value=True,
+            example_value="fd:3",
+        )
+        parser.configure_argument(
+            None,
+            "stats",
+            "write statistics of the run to JSON file.",
+            has_value=True,
+            example_value="/tmp/motostat_stats.json",
+        )
+        parser.configure_argument(
+            None,
+            "metrics",
+            "write statistics of the run to Prometheus textfile collector file.",
+            has_value=True,
+            example_value="/var/lib/node_exporter/motostat.prom",
+        )
+        parser.configure_argument(
+            None,
+            "profile",
+            "write cProfile and tracemalloc reports of every stage to directory.",
+            has_value=True,
+            example_value="/tmp/motostat_profile",
+        )
+        parser.configure_argument(
+            None,
+            "serve",
+            "serve conversions over HTTP on local port, '-j' sets number of workers.",
+            has_value=True,
+            example_value="127.0.0.1:8080",
+        )
+        parser.configure_argument(
+            None,
+            "max_requests",
+            "maximum number of conversions at once in server mode, default 2 * jobs.",
+            has_value=True,
+            example_value="8",
+        )
+        parser.configure_argument(
+            None,
+            "presorted",
+            "input is newest first like motostat export, records are written while reading.",
+        )
 
         # command line parsing
         parser.parse_arguments()
@@ -161,17 +494,103 @@ class Converter(BaseApp, BMiles, BDebug, BVerbose, BDir):
         if parser.get_option("verbose") is not None:
             # set verbose flag
             self.verbose = True
+        if parser.get_option("fsync") is not None:
+            self.fsync = True
         if parser.get_option("miles") is not None:
             self.miles = True
+        if parser.get_option("batch") is not None:
+            self.batch = True
+        if parser.get_option("columnar") is not None:
+            self.columnar = True
+        if parser.get_option("jobs") is not None:
+            jobs: str = parser.get_option("jobs")  # type: ignore
+            if not jobs.isdigit():
+                print(f"Invalid number of jobs: '{jobs}'.")
+                self._help(parser.dump())
+            self.jobs = int(jobs) or available_cores()
+        if parser.get_option("memory_limit") is not None:
+            limit: str = parser.get_option("memory_limit")  # type: ignore
+            if not limit.isdigit() or int(limit) < 1:
+                print(f"Invalid memory limit: '{limit}', expected MiB number.")
+                self._help(parser.dump())
+            self.memory_limit = int(limit)
+        if parser.get_option("queue_depth") is not None:
+            depth: str = parser.get_option("queue_depth")  # type: ignore
+            if not depth.isdigit() or int(depth) < 1:
+                print(f"Invalid queue depth: '{depth}', expected number of batches.")
+                self._help(parser.dump())
+            self.queue_depth = int(depth)
+        if parser.get_option("cache_dir") is not None:
+            self.cache_dir = os.path.expanduser(
+                parser.get_option("cache_dir")  # type: ignore
+            )
+        if parser.get_option("cache_size") is not None:
+            size: str = parser.get_option("cache_size")  # type: ignore
+            if not size.isdigit() or int(size) < 1:
+                print(f"Invalid cache size: '{size}', expected MiB number.")
+                self._help(parser.dump())
+            self.cache_size = int(size)
+        if parser.get_option("compress") is not None:
+            compression: str = parser.get_option("compress")  # type: ignore
+            if compression not in formats():
+                print(f"Unsupported compression format: '{compression}'.")
+                self._help(parser.dump())
+            self.compression = compression
+        if parser.get_option("incremental") is not None:
+            self.state_file = parser.get_option("incremental")  # type: ignore
         if parser.get_option("output_dir") is not None:
             self.output_dir = parser.get_option("output_dir")  # type: ignore
+        if parser.get_option("costs_out") is not None:
+            self.costs_out = parser.get_option("costs_out")  # type: ignore
+        if parser.get_option("fuels_out") is not None:
+            self.fuels_out = parser.get_option("fuels_out")  # type: ignore
+        for target in (self.costs_out, self.fuels_out):
+            error: Optional[str] = check_target(target)
+            if error:
+                print(error)
+                self._help(parser.dump())
+        if self.costs_out and self.costs_out == self.fuels_out:
+            print("Cost and fuel records cannot be written to the same target.")
+            self._help(parser.dump())
+        if parser.get_option("stats") is not None:
+            self.stats_file = parser.get_option("stats")  # type: ignore
+        if parser.get_option("metrics") is not None:
+            self.metrics_file = parser.get_option("metrics")  # type: ignore
+        if parser.get_option("profile") is not None:
+            self.profile_dir = parser.get_option("profile")  # type: ignore
+        if parser.get_option("presorted") is not None:
+            if not (self.costs_out or self.fuels_out):
+                print("The '--presorted' flag requires '--costs_out' or '--fuels_out'.")
+                self._help(parser.dump())
+            self.presorted = True
+        if parser.get_option("serve") is not None:
+            self.serve = parser.get_option("serve")  # type: ignore
+            try:
+                parse_address(self.serve)
+            except ValueError:
+                print(f"Invalid server address: '{self.serve}', expected [HOST:]PORT.")
+                self._help(parser.dump())
+        if parser.get_option("max_requests") is not None:
+            limit = parser.get_option("max_requests")  # type: ignore
+            if not limit.isdigit() or int(limit) < 1:
+                print(f"Invalid number of requests: '{limit}'.")
+                self._help(parser.dump())
+            self.max_requests = int(limit)
+        # input files
+        self.input_files = self._arguments(parser.dump())
 
     def __init_log_levels(self, engine: LoggerEngine) -> None:
         """Set logging levels configuration for LoggerEngine."""
+        # STDOUT is reserved for records if it is an output target
+        console = (
+            LoggerEngineStderr
+            if STDOUT in (self.costs_out, self.fuels_out)
+            else LoggerEngineStdout
+        )
         # ALERT
         engine.add_engine(
             LogsLevelKeys.ALERT,
-            LoggerEngineStdout(
+            console(
                 name=f"{self._c_name}->ALERT",
                 # formatter=LogFormatterDateTime(),
                 formatter=LogFormatterNull(),
@@ -180,7 +599,7 @@ class Converter(BaseApp, BMiles, BDebug, BVerbose, BDir):
         # DEBUG
         engine.add_engine(
             LogsLevelKeys.DEBUG,
-            LoggerEngineStdout(
+            console(
                 name=f"{self._c_name}->DEBUG",
                 # formatter=LogFormatterDateTime(),
                 formatter=LogFormatterNull(),
@@ -189,7 +608,7 @@ class Converter(BaseApp, BMiles, BDebug, BVerbose, BDir):
         # ERROR
         engine.add_engine(
             LogsLevelKeys.ERROR,
-            LoggerEngineStdout(
+            console(
                 name=f"{self._c_name}->ERROR",
                 # formatter=LogFormatterDateTime(),
                 formatter=LogFormatterNull(),
@@ -198,7 +617,7 @@ class Converter(BaseApp, BMiles, BDebug, BVerbose, BDir):
         # NOTICE
         engine.add_engine(
             LogsLevelKeys.NOTICE,
-            LoggerEngineStdout(
+            console(
                 name=f"{self._c_name}->NOTICE",
                 # formatter=LogFormatterDateTime(),
                 formatter=LogFormatterNull(),
@@ -217,7 +636,7 @@ class Converter(BaseApp, BMiles, BDebug, BVerbose, BDir):
         # CRITICAL
         engine.add_engine(
             LogsLevelKeys.CRITICAL,
-            LoggerEngineStdout(
+            console(
                 name=f"{self._c_name}->CRITICAL",
                 # formatter=LogFormatterDateTime(),
                 formatter=LogFormatterNull(),
@@ -235,7 +654,7 @@ class Converter(BaseApp, BMiles, BDebug, BVerbose, BDir):
         # EMERGENCY
         engine.add_engine(
             LogsLevelKeys.EMERGENCY,
-            LoggerEngineStdout(
+            console(
                 name=f"{self._c_name}->EMERGENCY",
                 # formatter=LogFormatterDateTime(),
                 formatter=LogFormatterNull(),
@@ -244,7 +663,7 @@ class Converter(BaseApp, BMiles, BDebug, BVerbose, BDir):
         # INFO
         engine.add_engine(
             LogsLevelKeys.INFO,
-            LoggerEngineStdout(
+            console(
                 name=self._c_name,
                 # formatter=LogFormatterDateTime(),
                 formatter=LogFormatterNull(),
@@ -253,7 +672,7 @@ class Converter(BaseApp, BMiles, BDebug, BVerbose, BDir):
         # WARNING
         engine.add_engine(
             LogsLevelKeys.WARNING,
-            LoggerEngineStdout(
+            console(
                 name=f"{self._c_name}->WARNING",
                 # formatter=LogFormatterDateTime(),
                 formatter=LogFormatterNull(),
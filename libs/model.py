@@ -7,105 +7,269 @@
   Purpose: Data models for motostat and spritmonitor dataset.
 """
 
-import re
+import math
 
-from typing import Any, List, Dict, TypeVar
-from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from typing import Any, List, Optional, Tuple, TypeVar
 
 
 from jsktoolbox.attribtool import ReadOnlyClass
-from jsktoolbox.datetool import Timestamp
 
 from libs.base import BDebug, BMiles, BVerbose
+from libs.dates import decode_date
+from libs.formatter import (
+    COST_CSV_HEADER,
+    COST_HEADER,
+    DRIVING_STYLES,
+    FUELING_CSV_HEADER,
+    FUELING_HEADER,
+    FUELING_TYPES,
+    format_cost,
+    format_fuel,
+)
+from libs.tokenizer import split_line
 
 TMotoStat = TypeVar("TMotoStat", bound="MotoStat")
 
+# km to miles ratio
+MILE: float = 0.621371192
+
+# ids per second in sort key, the same ratio as in 'date' timestamp
+KEY_SCALE: int = 10000
+
 
 class _Keys(object, metaclass=ReadOnlyClass):
     """Internal keys class."""
 
-    CSV_COST: str = "__cost__"
-    CSV_FUEL: str = "__fuel__"
     DATA: str = "__data__"
     FUELING: str = "__fueling__"
 
 
+# columns of motostat csv export
+MOTOSTAT_HEADER: Tuple[str, ...] = (
+    "cost_id",
+    "fueling_id",
+    "cost_type",
+    "date",
+    "fuel_id",
+    "gas_station_id",
+    "odometer",
+    "trip_odometer",
+    "quantity",
+    "cost",
+    "notes",
+    "fueling_type",
+    "tires",
+    "driving_style",
+    "route_motorway",
+    "route_country",
+    "route_city",
+    "bc_consumption",
+    "bc_avg_speed",
+    "ac",
+    "currency",
+    "fuel_name",
+    "gas_station_name",
+)
+
+
+class MotoStatRecord(object):
+    """Compact record of parsed motostat row.
+
+    The fields are filled once at parse time, the 'date' field holds
+    the timestamp generated from date and id, the 'key' field holds
+    the same value as integer for sorting. Numeric fields are typed,
+    distances are stored in output units, empty values are None.
+    """
+
+    __slots__ = MOTOSTAT_HEADER + ("key",)
+
+    cost_id: str
+    fueling_id: str
+    cost_type: str
+    date: float
+    fuel_id: str
+    gas_station_id: str
+    odometer: Optional[Decimal]
+    trip_odometer: Optional[float]
+    quantity: Optional[Decimal]
+    cost: Optional[Decimal]
+    notes: str
+    fueling_type: str
+    tires: str
+    driving_style: str
+    route_motorway: Optional[float]
+    route_country: Optional[float]
+    route_city: Optional[float]
+    bc_consumption: str
+    bc_avg_speed: str
+    ac: str
+    currency: str
+    fuel_name: str
+    gas_station_name: str
+    key: int
+
+    def __init__(self, data: List[Any], key: int = 0) -> None:
+        """Constructor.
+
+        ### Arguments:
+        - data [List[Any]] - list of values in MOTOSTAT_HEADER order.
+        - key [int] - sort key.
+        """
+        for name, value in zip(MOTOSTAT_HEADER, data):
+            setattr(self, name, value)
+        self.key = key
+
+    def __repr__(self) -> str:
+        tmp: str = ""
+        for key in MOTOSTAT_HEADER:
+            tmp += f"'{key}':{getattr(self, key)},"
+        return f"{self.__class__.__name__}({tmp})"
+
+
+def _decimal(value: str, key: str, row: int) -> Optional[Decimal]:
+    """Returns Decimal from string, None for empty value."""
+    if not value:
+        return None
+    try:
+        out = Decimal(value)
+    except InvalidOperation:
+        out = None
+    if out is None or not out.is_finite():
+        raise ValueError(f"row {row}: invalid number in '{key}': '{value}'")
+    return out
+
+
+def _float(value: str, key: str, row: int) -> Optional[float]:
+    """Returns float from string, None for empty value."""
+    if not value:
+        return None
+    try:
+        out: float = float(value)
+    except ValueError:
+        out = math.nan
+    if not math.isfinite(out):
+        raise ValueError(f"row {row}: invalid number in '{key}': '{value}'")
+    return out
+
+
+def _required(value: Optional[Any], key: str, row: int) -> Any:
+    """Returns value, raises ValueError if it is None."""
+    if value is None:
+        raise ValueError(f"row {row}: missing number in '{key}'")
+    return value
+
+
+def parse_record(
+    csv_line: str, miles: bool = False, row: int = 0
+) -> Optional[MotoStatRecord]:
+    """Returns MotoStatRecord from csv line, None for header or invalid line.
+
+    ### Arguments:
+    - csv_line [str] - motostat csv line.
+    - miles [bool] - convert distances to miles.
+    - row [int] - row number for error messages.
+
+    Raises ValueError for invalid numbers, dates and fueling codes.
+    """
+    data: List[Any] = split_line(csv_line)
+    if len(data) == len(MOTOSTAT_HEADER) - 2:
+        data.append("")
+        data.append("")
+    if len(data) != len(MOTOSTAT_HEADER) or data[0] == MOTOSTAT_HEADER[0]:
+        return None
+    # generate timestamp from date and id
+    try:
+        ts: int = decode_date(data[3])[0]
+    except ValueError:
+        raise ValueError(f"row {row}: invalid date: '{data[3]}'") from None
+    key: str = "cost_id" if data[0] else "fueling_id"
+    item_id: float = _required(_float(data[0] or data[1], key, row), key, row)
+    data[3] = ts + item_id / KEY_SCALE
+    # odometer
+    odometer: Optional[Decimal] = _decimal(data[6], "odometer", row)
+    if odometer is not None and miles:
+        odometer = Decimal(f"{float(odometer) * MILE:.0f}")
+    data[6] = odometer
+    # trip, rounded as presented in output
+    trip: Optional[float] = _float(data[7], "trip_odometer", row)
+    if trip is not None:
+        if miles:
+            trip = round(trip * MILE, 0)
+        trip = float(f"{trip:.2f}")
+    data[7] = trip
+    # quantity, cost
+    data[8] = _decimal(data[8], "quantity", row)
+    data[9] = _decimal(data[9], "cost", row)
+    # routes
+    data[14] = _float(data[14], "route_motorway", row)
+    data[15] = _float(data[15], "route_country", row)
+    data[16] = _float(data[16], "route_city", row)
+    if data[4]:
+        # fueling requires trip and routes
+        for i in (7, 14, 15, 16):
+            _required(data[i], MOTOSTAT_HEADER[i], row)
+        if data[7] > 0:
+            _required(data[8], "quantity", row)
+        # codes required by spritmonitor fuels csv
+        if data[7] != 0 and data[11] not in FUELING_TYPES:
+            raise ValueError(f"row {row}: unknown fueling type: '{data[11]}'")
+        if data[13] not in DRIVING_STYLES:
+            raise ValueError(f"row {row}: unknown driving style: '{data[13]}'")
+    return MotoStatRecord(data, round(ts * KEY_SCALE + item_id))
+
+
 class MotoStat(BDebug, BVerbose, BMiles):
-    """MotoStat data class."""
+    """MotoStat data class.
 
-    def __init__(self, csv_line: str, miles: bool = False) -> None:
-        """Constructor."""
+    A view over MotoStatRecord.
+    """
+
+    def __init__(self, csv_line: str, miles: bool = False, row: int = 0) -> None:
+        """Constructor.
+
+        ### Arguments:
+        - csv_line [str] - motostat csv line.
+        - miles [bool] - mileage in miles flag.
+        - row [int] - row number for error messages.
+        """
         self.miles = miles
-        data_dict: Dict[str, Any] = {}
-        csv_header: List[str] = [
-            "cost_id",
-            "fueling_id",
-            "cost_type",
-            "date",
-            "fuel_id",
-            "gas_station_id",
-            "odometer",
-            "trip_odometer",
-            "quantity",
-            "cost",
-            "notes",
-            "fueling_type",
-            "tires",
-            "driving_style",
-            "route_motorway",
-            "route_country",
-            "route_city",
-            "bc_consumption",
-            "bc_avg_speed",
-            "ac",
-            "currency",
-            "fuel_name",
-            "gas_station_name",
-        ]
-        data = re.split(""";(?=(?:[^"]|'[^']*'|"[^"]*")*$)""", csv_line)
-        # print(csv_line)
-        if len(data) == len(csv_header) - 2:
-            data.append("")
-            data.append("")
-        if len(data) == len(csv_header):
-            if data[0] != csv_header[0]:
-                for i in range(0, len(data)):
-                    data_dict[csv_header[i]] = data[i]
-        self._set_data(key=_Keys.DATA, value=data_dict, set_default_type=Dict)
-        self.__time_update()
+        self._set_data(key=_Keys.DATA, value=parse_record(csv_line, miles, row))
+
+    @classmethod
+    def from_record(
+        cls, record: Optional[MotoStatRecord], miles: bool = False
+    ) -> "MotoStat":
+        """Returns MotoStat view over parsed record."""
+        item: MotoStat = cls.__new__(cls)
+        item.miles = miles
+        item._set_data(key=_Keys.DATA, value=record)
+        return item
 
     def __repr__(self) -> str:
         tmp: str = ""
-        for i, v in self._get_data(key=_Keys.DATA).items():  # type: ignore
-            tmp += f"'{i}':{v},"
+        record: Optional[MotoStatRecord] = self.record
+        if record:
+            for key in MOTOSTAT_HEADER:
+                tmp += f"'{key}':{getattr(record, key)},"
         return f"{self._c_name}({tmp})"
 
-    def __time_update(self) -> None:
-        """Generate timestamp from date and id."""
-        if not self.is_empty:
-            data = self._get_data(key=_Keys.DATA)
-            cost_id: str = data["cost_id"]  # type: ignore
-            fueling_id: str = data["fueling_id"]  # type: ignore
-            date: str = data["date"]  # type: ignore
-            ts: int = Timestamp.from_string(date, "%Y-%m-%d")
-            ms: float = 0.0
-            if len(cost_id) > 0:
-                ms = ts + float(f"{cost_id}") / 10000
-            else:
-                ms = ts + float(f"{fueling_id}") / 10000
-            data["date"] = ms  # type: ignore
-            # print(f"{cost_id}::{fueling_id}::{date}:::{ts}:::{ms}")
+    @property
+    def record(self) -> Optional[MotoStatRecord]:
+        """Returns parsed record, None if data is empty."""
+        return self._get_data(key=_Keys.DATA)  # type: ignore
 
     @property
     def is_empty(self) -> bool:
         """Returns True if data is empty."""
-        return len(self._get_data(key=_Keys.DATA, default_value={})) == 0  # type: ignore
+        return self._get_data(key=_Keys.DATA) is None
 
     # "cost_id",
     @property
     def cost_id(self) -> str:
-        if self._get_data(key=_Keys.DATA, default_value={}):
-            out: str = self._get_data(key=_Keys.DATA)["cost_id"]  # type: ignore
+        record: Optional[MotoStatRecord] = self._get_data(key=_Keys.DATA)
+        if record:
+            out: str = record.cost_id
             return out
         else:
             return ""
@@ -113,8 +277,9 @@ class MotoStat(BDebug, BVerbose, BMiles):
     # "fueling_id",
     @property
     def fueling_id(self) -> str:
-        if self._get_data(key=_Keys.DATA, default_value={}):
-            out: str = self._get_data(key=_Keys.DATA)["fueling_id"]  # type: ignore
+        record: Optional[MotoStatRecord] = self._get_data(key=_Keys.DATA)
+        if record:
+            out: str = record.fueling_id
             return out
         else:
             return ""
@@ -122,17 +287,27 @@ class MotoStat(BDebug, BVerbose, BMiles):
     # "cost_type",
     @property
     def cost_type(self) -> str:
-        if self._get_data(key=_Keys.DATA, default_value={}):
-            out: str = self._get_data(key=_Keys.DATA)["cost_type"]  # type: ignore
+        record: Optional[MotoStatRecord] = self._get_data(key=_Keys.DATA)
+        if record:
+            out: str = record.cost_type
             return out
         else:
             return ""
 
+    @property
+    def sort_key(self) -> int:
+        """Returns integer sort key, 0 if data is empty."""
+        record: Optional[MotoStatRecord] = self._get_data(key=_Keys.DATA)
+        if record:
+            return record.key
+        return 0
+
     # "date",
     @property
     def date(self) -> float:
-        if self._get_data(key=_Keys.DATA, default_value={}):
-            date: float = self._get_data(key=_Keys.DATA)["date"]  # type: ignore
+        record: Optional[MotoStatRecord] = self._get_data(key=_Keys.DATA)
+        if record:
+            date: float = record.date
             return date
         else:
             return 0.0
@@ -140,8 +315,9 @@ class MotoStat(BDebug, BVerbose, BMiles):
     # "fuel_id",
     @property
     def fuel_id(self) -> str:
-        if self._get_data(key=_Keys.DATA, default_value={}):
-            out: str = self._get_data(key=_Keys.DATA)["fuel_id"]  # type: ignore
+        record: Optional[MotoStatRecord] = self._get_data(key=_Keys.DATA)
+        if record:
+            out: str = record.fuel_id
             return out
         else:
             return ""
@@ -149,8 +325,9 @@ class MotoStat(BDebug, BVerbose, BMiles):
     # "gas_station_id",
     @property
     def gas_station_id(self) -> str:
-        if self._get_data(key=_Keys.DATA, default_value={}):
-            out: str = self._get_data(key=_Keys.DATA)["gas_station_id"]  # type: ignore
+        record: Optional[MotoStatRecord] = self._get_data(key=_Keys.DATA)
+        if record:
+            out: str = record.gas_station_id
             return out
         else:
             return ""
@@ -158,56 +335,41 @@ class MotoStat(BDebug, BVerbose, BMiles):
     # "odometer",
     @property
     def odometer(self) -> str:
-        if self._get_data(key=_Keys.DATA, default_value={}):
-            out: str = self._get_data(key=_Keys.DATA)["odometer"]  # type: ignore
-            if out:
-                if self.miles:
-                    x: float = float(out) * 0.621371192
-                    return f"{x:.0f}"
-                else:
-                    return out
-            return out
-        else:
-            return ""
+        record: Optional[MotoStatRecord] = self._get_data(key=_Keys.DATA)
+        if record and record.odometer is not None:
+            return str(record.odometer)
+        return ""
 
     # "trip_odometer",
     @property
     def trip_odometer(self) -> str:
-        if self._get_data(key=_Keys.DATA, default_value={}):
-            out: str = self._get_data(key=_Keys.DATA)["trip_odometer"]  # type: ignore
-            if out:
-                if self.miles:
-                    x: float = float(out) * 0.621371192
-                    return f"{round(x,0):.2f}"
-                else:
-                    return f"{float(out):.2f}"
-            return out
-        else:
-            return ""
+        record: Optional[MotoStatRecord] = self._get_data(key=_Keys.DATA)
+        if record and record.trip_odometer is not None:
+            return f"{record.trip_odometer:.2f}"
+        return ""
 
     # "quantity",
     @property
     def quantity(self) -> str:
-        if self._get_data(key=_Keys.DATA, default_value={}):
-            out: str = self._get_data(key=_Keys.DATA)["quantity"]  # type: ignore
-            return out
-        else:
-            return ""
+        record: Optional[MotoStatRecord] = self._get_data(key=_Keys.DATA)
+        if record and record.quantity is not None:
+            return str(record.quantity)
+        return ""
 
     # "cost",
     @property
     def cost(self) -> str:
-        if self._get_data(key=_Keys.DATA, default_value={}):
-            out: str = self._get_data(key=_Keys.DATA)["cost"]  # type: ignore
-            return out
-        else:
-            return ""
+        record: Optional[MotoStatRecord] = self._get_data(key=_Keys.DATA)
+        if record and record.cost is not None:
+            return str(record.cost)
+        return ""
 
     # "notes",
     @property
     def notes(self) -> str:
-        if self._get_data(key=_Keys.DATA, default_value={}):
-            out: str = self._get_data(key=_Keys.DATA)["notes"]  # type: ignore
+        record: Optional[MotoStatRecord] = self._get_data(key=_Keys.DATA)
+        if record:
+            out: str = record.notes
             return out
         else:
             return ""
@@ -215,8 +377,9 @@ class MotoStat(BDebug, BVerbose, BMiles):
     # "fueling_type",
     @property
     def fueling_type(self) -> str:
-        if self._get_data(key=_Keys.DATA, default_value={}):
-            out: str = self._get_data(key=_Keys.DATA)["fueling_type"]  # type: ignore
+        record: Optional[MotoStatRecord] = self._get_data(key=_Keys.DATA)
+        if record:
+            out: str = record.fueling_type
             return out
         else:
             return ""
@@ -224,8 +387,9 @@ class MotoStat(BDebug, BVerbose, BMiles):
     # "tires",
     @property
     def tires(self) -> str:
-        if self._get_data(key=_Keys.DATA, default_value={}):
-            out: str = self._get_data(key=_Keys.DATA)["tires"]  # type: ignore
+        record: Optional[MotoStatRecord] = self._get_data(key=_Keys.DATA)
+        if record:
+            out: str = record.tires
             return out
         else:
             return ""
@@ -233,8 +397,9 @@ class MotoStat(BDebug, BVerbose, BMiles):
     # "driving_style",
     @property
     def driving_style(self) -> str:
-        if self._get_data(key=_Keys.DATA, default_value={}):
-            out: str = self._get_data(key=_Keys.DATA)["driving_style"]  # type: ignore
+        record: Optional[MotoStatRecord] = self._get_data(key=_Keys.DATA)
+        if record:
+            out: str = record.driving_style
             return out
         else:
             return ""
@@ -242,35 +407,33 @@ class MotoStat(BDebug, BVerbose, BMiles):
     # "route_motorway",
     @property
     def route_motorway(self) -> str:
-        if self._get_data(key=_Keys.DATA, default_value={}):
-            out: str = self._get_data(key=_Keys.DATA)["route_motorway"]  # type: ignore
-            return out
-        else:
-            return ""
+        record: Optional[MotoStatRecord] = self._get_data(key=_Keys.DATA)
+        if record and record.route_motorway is not None:
+            return f"{record.route_motorway:g}"
+        return ""
 
     # "route_country",
     @property
     def route_country(self) -> str:
-        if self._get_data(key=_Keys.DATA, default_value={}):
-            out: str = self._get_data(key=_Keys.DATA)["route_country"]  # type: ignore
-            return out
-        else:
-            return ""
+        record: Optional[MotoStatRecord] = self._get_data(key=_Keys.DATA)
+        if record and record.route_country is not None:
+            return f"{record.route_country:g}"
+        return ""
 
     # "route_city",
     @property
     def route_city(self) -> str:
-        if self._get_data(key=_Keys.DATA, default_value={}):
-            out: str = self._get_data(key=_Keys.DATA)["route_city"]  # type: ignore
-            return out
-        else:
-            return ""
+        record: Optional[MotoStatRecord] = self._get_data(key=_Keys.DATA)
+        if record and record.route_city is not None:
+            return f"{record.route_city:g}"
+        return ""
 
     # "bc_consumption",
     @property
     def bc_consumption(self) -> str:
-        if self._get_data(key=_Keys.DATA, default_value={}):
-            out: str = self._get_data(key=_Keys.DATA)["bc_consumption"]  # type: ignore
+        record: Optional[MotoStatRecord] = self._get_data(key=_Keys.DATA)
+        if record:
+            out: str = record.bc_consumption
             return out
         else:
             return ""
@@ -278,8 +441,9 @@ class MotoStat(BDebug, BVerbose, BMiles):
     # "bc_avg_speed",
     @property
     def bc_avg_speed(self) -> str:
-        if self._get_data(key=_Keys.DATA, default_value={}):
-            out: str = self._get_data(key=_Keys.DATA)["bc_avg_speed"]  # type: ignore
+        record: Optional[MotoStatRecord] = self._get_data(key=_Keys.DATA)
+        if record:
+            out: str = record.bc_avg_speed
             return out
         else:
             return ""
@@ -287,8 +451,9 @@ class MotoStat(BDebug, BVerbose, BMiles):
     # "ac",
     @property
     def ac(self) -> str:
-        if self._get_data(key=_Keys.DATA, default_value={}):
-            out: str = self._get_data(key=_Keys.DATA)["ac"]  # type: ignore
+        record: Optional[MotoStatRecord] = self._get_data(key=_Keys.DATA)
+        if record:
+            out: str = record.ac
             return out
         else:
             return ""
@@ -296,8 +461,9 @@ class MotoStat(BDebug, BVerbose, BMiles):
     # "currency",
     @property
     def currency(self) -> str:
-        if self._get_data(key=_Keys.DATA, default_value={}):
-            out: str = self._get_data(key=_Keys.DATA)["currency"]  # type: ignore
+        record: Optional[MotoStatRecord] = self._get_data(key=_Keys.DATA)
+        if record:
+            out: str = record.currency
             return out
         else:
             return ""
@@ -305,8 +471,9 @@ class MotoStat(BDebug, BVerbose, BMiles):
     # "fuel_name",
     @property
     def fuel_name(self) -> str:
-        if self._get_data(key=_Keys.DATA, default_value={}):
-            out: str = self._get_data(key=_Keys.DATA)["fuel_name"]  # type: ignore
+        record: Optional[MotoStatRecord] = self._get_data(key=_Keys.DATA)
+        if record:
+            out: str = record.fuel_name
             return out.strip('"')
         else:
             return ""
@@ -314,8 +481,9 @@ class MotoStat(BDebug, BVerbose, BMiles):
     # "gas_station_name",
     @property
     def gas_station_name(self) -> str:
-        if self._get_data(key=_Keys.DATA, default_value={}):
-            out: str = self._get_data(key=_Keys.DATA)["gas_station_name"]  # type: ignore
+        record: Optional[MotoStatRecord] = self._get_data(key=_Keys.DATA)
+        if record:
+            out: str = record.gas_station_name
             return out
         else:
             return ""
@@ -330,27 +498,27 @@ class MotoStat(BDebug, BVerbose, BMiles):
 
     def __eq__(self, arg: TMotoStat) -> bool:
         """Equal."""
-        return self.date == arg.date
+        return self.sort_key == arg.sort_key
 
     def __ge__(self, arg: TMotoStat) -> bool:
         """Greater or equal."""
-        return self.date >= arg.date
+        return self.sort_key >= arg.sort_key
 
     def __gt__(self, arg: TMotoStat) -> bool:
         """Greater."""
-        return self.date > arg.date
+        return self.sort_key > arg.sort_key
 
     def __le__(self, arg: TMotoStat) -> bool:
         """Less or equal."""
-        return self.date <= arg.date
+        return self.sort_key <= arg.sort_key
 
     def __lt__(self, arg: TMotoStat) -> bool:
         """Less."""
-        return self.date < arg.date
+        return self.sort_key < arg.sort_key
 
     def __ne__(self, arg: TMotoStat) -> bool:
         """Negative."""
-        return self.date != arg.date
+        return self.sort_key != arg.sort_key
 
 
 class SpritMonitor(BDebug, BVerbose):
@@ -379,266 +547,11 @@ class SpritMonitor(BDebug, BVerbose):
 
     def __init__(self, item: MotoStat) -> None:
         """Constructor."""
-        fueling_header: List[str] = [
-            "Date",
-            "Odometer",
-            "Trip",
-            "Quantity",
-            "Total price",
-            "Currency",
-            "Type",
-            "Tires",
-            "Roads",
-            "Driving style",
-            "Fuel",
-            "Note",
-            "Consumption",
-            "BC-Consumption",
-            "BC-Quantity",
-            "BC-Speed",
-            "Company",
-            "Country",
-            "Area",
-            "Location",
-        ]
-        self._set_data(key=_Keys.CSV_FUEL, set_default_type=List, value=fueling_header)
-
-        cost_header: List[str] = [
-            "Date",
-            "Odometer",
-            "Cost type",
-            "Total price",
-            "Currency",
-            "Note",
-        ]
-        self._set_data(key=_Keys.CSV_COST, set_default_type=List, value=cost_header)
-
-        if item.cost_id:
-            # new cost
-            self.fueling = False
-            data: Dict[str, str] = {}
-            for key in cost_header:
-                data[key] = ""
-            self._set_data(key=_Keys.DATA, set_default_type=Dict, value=data)
-            self.__add_cost(item)
-        if item.fuel_id:
-            self.fueling = True
-            data: Dict[str, str] = {}
-            for key in fueling_header:
-                data[key] = ""
-            self._set_data(key=_Keys.DATA, set_default_type=Dict, value=data)
-            self.__add_fueling(item)
+        self._set_data(key=_Keys.DATA, value=item.record)
+        self.fueling = bool(item.fuel_id)
 
     def __repr__(self) -> str:
-        tmp: str = ""
-        for i, v in self._get_data(key=_Keys.DATA).items():  # type: ignore
-            tmp += f"'{i}':{v},"
-        return f"{self._c_name}({tmp})"
-
-    def __add_fueling(self, item: MotoStat) -> None:
-        """Add data to dict."""
-        data: Dict[str, str] = self._get_data(
-            key=_Keys.DATA,
-        )  # type: ignore
-        # "Date",
-        date_tmp: datetime = datetime.fromtimestamp(item.date)
-        data["Date"] = f"{date_tmp.day:02d}.{date_tmp.month:02d}.{date_tmp.year}"
-        # "Odometer",
-        tmp: str = item.odometer
-        if tmp == "0":
-            tmp = "0,00"
-        else:
-            tmp += ",00"
-        data["Odometer"] = tmp
-        # "Trip",
-        data["Trip"] = item.trip_odometer.replace(".", ",")
-        # "Quantity",
-        data["Quantity"] = item.quantity.replace(".", ",")
-        # "Total price",
-        data["Total price"] = item.cost.replace(".", ",")
-        # "Currency",
-        data["Currency"] = item.currency
-
-        # "Type",
-        # Fueling type: 0=invalid fueling, 1=full fueling, 2=partial fueling, 3=first fueling
-        fueling_dict: Dict[str, str] = {
-            "full": "1",
-            "partial": "2",
-        }
-        if float(item.trip_odometer) == 0:
-            data["Type"] = "3"
-        else:
-            data["Type"] = fueling_dict[item.fueling_type]
-        # "Tires",
-        # Tires: 1=summer tires, 2=winter tires, 3=all-year tires
-        tires_dict: Dict[str, str] = {"full_year": "3", "summer": "1", "winter": "2"}
-        if item.tires in tires_dict.keys():
-            data["Tires"] = tires_dict[item.tires]
-
-        # "Roads",
-        # Roads: Sum of 2=motor-way, 4=city, 8=country roads (e.g., motor-way and country roads: 10)
-        count: int = 0
-        if float(item.route_city) > 0:
-            count += 4
-        if float(item.route_motorway) > 0:
-            count += 2
-        if float(item.route_country) > 0:
-            count += 8
-        data["Roads"] = f"{count}"
-
-        # "Driving style",
-        # Driving style: 1=moderate, 2=normal, 3=fast
-        driving_dict: Dict[str, str] = {"normal": "2", "speedy": "3", "economical": "1"}
-        data["Driving style"] = driving_dict[item.driving_style]
-
-        # "Fuel",
-        # Fuel sort: 1=Diesel, 2=Biodiesel, 3=Vegetable oil, 4=Premium Diesel,
-        # 6=Normal gasoline, 7=Super gasoline, 8=SuperPlus gasoline,
-        # 9=Premium Gasoline 100, 12=LPG, 13=CNG H, 14=CNG L, 15=Bio-alcohol,
-        # 16=Two-stroke, 18=Premium Gasoline 95, 19=Electricity, 20=E10, 21=AdBlue,
-        # 22=Premium Gasoline 100+, 23=Hydrogen, 24=Green electricity, 25=GTL Diesel, 26=HVO100
-        fuel_dict: Dict[str, str] = {
-            "95 miles": "6",
-            "98 miles plus": "8",
-            "BP Ultimate Diesel": "4",
-            "CNG": "14",
-            "Diesel miles plus": "4",
-            "Diesel miles": "4",
-            "Diesel": "1",
-            "Dwusuw (mieszanka)": "16",
-            "Ecto Diesel": "4",
-            "Ecto Plus": "7",
-            "EkoDiesel": "2",
-            "Etanol E85": "15",
-            "Eurosuper 95": "6",
-            "Fuel Save 95": "18",
-            "Fuel Save Diesel": "4",
-            "LPG": "12",
-            "Lotos Dynamic 98": "8",
-            "Lotos Dynamic Diesel": "4",
-            "Orlen Bioester": "2",
-            "Orlen Verva 98": "8",
-            "Orlen Verva ON": "4",
-            "Shell Diesel Extra": "4",
-            "Shell V-Power Diesel": "4",
-            "Shell V-Power Nitro+ Diesel": "4",
-            "Shell V-Power Nitro+ Racing": "22",
-            "Shell V-Power Nitro+": "9",
-            "Shell V-Power Racing": "9",
-            "Shell V-Power": "18",
-            "Statoil Diesel": "1",
-            "Statoil DieselGold": "4",
-            "Statoil SupraGaz": "18",
-            "Statoil Truckdiesel": "1",
-            "Super Plus 98": "8",
-            "Total Excellium": "8",
-            "inna benzyna": "6",
-            "inny gaz CNG": "12",
-            "inny gaz LPG": "12",
-            "inny olej napędowy": "1",
-        }
-        if item.fuel_name in fuel_dict.keys():
-            data["Fuel"] = fuel_dict[item.fuel_name]
-        # "Note",
-        data["Note"] = f'"{item.notes}"'
-        # "Consumption",
-        if float(item.trip_odometer) > 0:
-            tmp2: float = float(item.quantity) * 100 / float(item.trip_odometer)
-            data["Consumption"] = f"{tmp2:.2f}".replace(".", ",")
-
-        # "BC-Consumption",
-        # "BC-Quantity",
-        # "BC-Speed",
-        # "Company",
-        data["Company"] = f'"{item.gas_station_name}"'
-        # "Country",
-        if item.currency == "PLN":
-            data["Country"] = '"PL"'
-        # "Area",
-        data["Area"] = '""'
-        # "Location",
-        data["Location"] = '""'
-        self._set_data(key=_Keys.DATA, value=data)
-        # print(self._get_data(key=_Keys.DATA))
-
-    def __add_cost(self, item: MotoStat) -> None:
-        """Add data to dict."""
-        cost_type: Dict[str, str] = {
-            "maintenance": "1",
-            "repair": "2",
-            "tires_change": "3",
-            "oil_change": "4",
-            "insurance": "5",
-            "tax": "6",
-            "tuning": "8",
-            "accessories": "9",
-            "purchase_price": "10",
-            "miscellaneous": "11",
-            "tech_inspection": "11",
-            "car_audio": "9",
-            "inspection": "11",
-            "care": "12",
-            "registration": "14",
-            "fine": "17",
-            "parking_tax": "18",
-            "toll": "19",
-            "spare_parts": "20",
-        }
-        data: Dict[str, str] = self._get_data(
-            key=_Keys.DATA,
-        )  # type: ignore
-        # "Date",
-        date_tmp: datetime = datetime.fromtimestamp(item.date)
-        data["Date"] = f"{date_tmp.day:02d}.{date_tmp.month:02d}.{date_tmp.year}"
-        # "Odometer",
-        tmp: str = item.odometer
-        if tmp == "0":
-            tmp = "0,00"
-        else:
-            tmp += ",00"
-        data["Odometer"] = tmp
-        # "Cost type",
-        # Type:: 1=Maintenance,
-        # 2=Repair,
-        # 3=Change tires,
-        # 4=Change oil,
-        # 5=Insurance,
-        # 6=Tax,
-        # 7=Supervisory board,
-        # 8=Tuning,
-        # 9=Accessories,
-        # 10=Purchase price,
-        # 11=Miscellaneous,
-        # 12=Care,
-        # 13=Payment,
-        # 14=Registration,
-        # 15=Financing,
-        # 16=Refund,
-        # 17=Fine,
-        # 18=Parking tax,
-        # 19=Toll,
-        # 20=Spare parts,
-        # 21=Basic charging fee
-        if item.cost_type in cost_type.keys():
-            data["Cost type"] = cost_type[item.cost_type]
-        else:
-            data["Cost type"] = "11"
-        # "Total price",
-        tmp = item.cost
-        if tmp == "0":
-            tmp = "0,00"
-        else:
-            tmp = tmp.replace(".", ",")
-        data["Total price"] = tmp
-        # "Currency",
-        data["Currency"] = f'"{item.currency}"'
-        # "Note",
-        if item.notes:
-            data["Note"] = item.notes
-        else:
-            data["Note"] = '""'
-        self._set_data(key=_Keys.DATA, value=data)
-        # print(self._get_data(key=_Keys.DATA))
+        return f"{self._c_name}({self.csv_data})"
 
     @property
     def fueling(self) -> bool:
@@ -654,34 +567,24 @@ class SpritMonitor(BDebug, BVerbose):
 
     @property
     def header(self) -> List[str]:
-        """Returns csv header string."""
-        length: int = len(self._get_data(key=_Keys.DATA).keys())  # type: ignore
-        if len(self._get_data(key=_Keys.CSV_COST)) == length:  # type: ignore
-            return self._get_data(key=_Keys.CSV_COST)  # type: ignore
-        else:
-            return self._get_data(key=_Keys.CSV_FUEL)  # type: ignore
+        """Returns csv header list."""
+        if self.fueling:
+            return list(FUELING_HEADER)
+        return list(COST_HEADER)
 
     @property
     def csv_header(self) -> str:
         """Returns csv header"""
-        tmp: str = ""
-        for item in self.header:
-            if tmp == "":
-                tmp += item
-            else:
-                tmp += f";{item}"
-        return tmp
+        if self.fueling:
+            return FUELING_CSV_HEADER
+        return COST_CSV_HEADER
 
     @property
     def csv_data(self) -> str:
-        """Returns csv header"""
-        tmp: str = ""
-        for item in self.header:
-            if tmp == "":
-                tmp += self._get_data(key=_Keys.DATA)[item]  # type: ignore
-            else:
-                tmp += f";{self._get_data(key=_Keys.DATA)[item]}"  # type: ignore
-        return tmp
+        """Returns csv line"""
+        if self.fueling:
+            return format_fuel(self._get_data(key=_Keys.DATA))  # type: ignore
+        return format_cost(self._get_data(key=_Keys.DATA))  # type: ignore
 
 
 # #[EOF]#######################################################################
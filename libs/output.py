@@ -0,0 +1,440 @@
+# -*- coding: utf-8 -*-
+"""
+  output.py
+  Author : Jacek 'Szumak' Kotlarski --<szumak@virthost.pl>
+  Created: 17.10.2026, 01:04:19
+
+  Purpose: Streaming output to STDOUT, file descriptors and named pipes.
+"""
+
+import heapq, os, sys
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import IO, Callable, Dict, List, Optional, Tuple, Union
+
+from jsktoolbox.attribtool import ReadOnlyClass
+from jsktoolbox.basetool.data import BData
+
+from libs.base import BMiles
+from libs.columnar import ColumnarConversion
+from libs.conversion import Conversion, parse_batch
+from libs.formatter import (
+    COST_CSV_HEADER,
+    FUELING_CSV_HEADER,
+    format_cost,
+    format_fuel,
+)
+from libs.model import MotoStatRecord
+from libs.stats import RunStats
+from libs.streaming import COST, FUEL, StreamingConversion
+from libs.writer import BUFFER_SIZE, AtomicCsvWriter
+
+# STDOUT output target
+STDOUT: str = "-"
+
+# prefix of file descriptor output target
+FD_PREFIX: str = "fd:"
+
+# default number of records kept for reordering of presorted input
+WINDOW: int = 1024
+
+# type of output writer and factory of writers for kind of output
+TWriter = Union["StreamWriter", AtomicCsvWriter]
+TWriterFactory = Callable[[str], TWriter]
+
+
+class _Keys(object, metaclass=ReadOnlyClass):
+    """Internal Keys container class."""
+
+    BUFFER: str = "__buffer__"
+    BUFFERED: str = "__buffered__"
+    COUNT: str = "__count__"
+    EMITTER: str = "__emitter__"
+    ERRORS: str = "__errors__"
+    FACTORY: str = "__factory__"
+    FILE: str = "__file__"
+    HEAP: str = "__heap__"
+    LAST: str = "__last__"
+    LATE: str = "__late__"
+    OWNED: str = "__owned__"
+    RECORDS: str = "__records__"
+    SEQ: str = "__seq__"
+    SIZE: str = "__size__"
+    SKIPPED: str = "__skipped__"
+    WINDOW: str = "__window__"
+    WRITERS: str = "__writers__"
+
+
+def check_target(target: str) -> Optional[str]:
+    """Returns error message if output target is invalid."""
+    if target.startswith(FD_PREFIX):
+        fd: str = target[len(FD_PREFIX) :]
+        if not fd.isdigit():
+            return f"Invalid file descriptor in output target: '{target}'"
+        try:
+            os.fstat(int(fd))
+        except OSError:
+            return f"File descriptor {fd} is not open."
+    return None
+
+
+def writer_factory(
+    targets: Dict[str, str],
+    paths: Dict[str, str],
+    append: bool = False,
+    fsync: bool = False,
+    compression: str = "",
+) -> TWriterFactory:
+    """Returns factory of writers for kinds of output.
+
+    ### Arguments:
+    - targets [Dict[str, str]] - stream targets for kinds of output.
+    - paths [Dict[str, str]] - paths of files for kinds without stream target.
+    - append [bool] - append lines to existing files.
+    - fsync [bool] - flush files to disk before they replace old ones.
+    - compression [str] - compression format of files, empty for plain files.
+    """
+    headers: Dict[str, str] = {COST: COST_CSV_HEADER, FUEL: FUELING_CSV_HEADER}
+
+    def factory(kind: str) -> TWriter:
+        if targets.get(kind):
+            return StreamWriter(targets[kind], headers[kind])
+        return AtomicCsvWriter(paths[kind], headers[kind], append, fsync, compression)
+
+    return factory
+
+
+class StreamWriter(BData):
+    """Writer of csv lines to STDOUT, file descriptor or path.
+
+    The header is written before the first line. Lines are buffered and
+    written out on every flush, so the reader receives them while the
+    conversion is still running.
+    """
+
+    def __init__(self, target: str, header: str) -> None:
+        """Constructor.
+
+        ### Arguments:
+        - target [str] - '-' for STDOUT, 'fd:N' for file descriptor or path.
+        - header [str] - csv header line.
+        """
+        file: IO[str]
+        owned: bool = True
+        if target == STDOUT:
+            file = sys.stdout
+            owned = False
+        elif target.startswith(FD_PREFIX):
+            file = os.fdopen(int(target[len(FD_PREFIX) :]), "w", closefd=False)
+        else:
+            file = open(target, "w")
+        self._set_data(key=_Keys.FILE, value=file)
+        self._set_data(key=_Keys.OWNED, value=owned, set_default_type=bool)
+        self._set_data(key=_Keys.BUFFER, value=[header], set_default_type=List)
+        self._set_data(key=_Keys.BUFFERED, value=0, set_default_type=int)
+        self._set_data(key=_Keys.COUNT, value=0, set_default_type=int)
+        self._set_data(key=_Keys.SIZE, value=0, set_default_type=int)
+
+    @property
+    def count(self) -> int:
+        """Returns number of written lines."""
+        return self._get_data(key=_Keys.COUNT)  # type: ignore
+
+    @property
+    def size(self) -> int:
+        """Returns number of written characters."""
+        return self._get_data(key=_Keys.SIZE)  # type: ignore
+
+    def write(self, line: str) -> None:
+        """Adds csv line to buffer."""
+        self._data[_Keys.BUFFER].append(line)
+        self._data[_Keys.COUNT] += 1
+        self._data[_Keys.BUFFERED] += len(line) + 1
+        if self._data[_Keys.BUFFERED] >= BUFFER_SIZE:
+            self.flush()
+
+    def write_lines(self, lines: List[str]) -> None:
+        """Writes list of csv lines."""
+        for line in lines:
+            self.write(line)
+
+    def flush(self) -> None:
+        """Writes buffered lines out."""
+        buffer: List[str] = self._data[_Keys.BUFFER]
+        if buffer:
+            buffer.append("")
+            file: IO[str] = self._data[_Keys.FILE]
+            text: str = "\n".join(buffer)
+            file.write(text)
+            file.flush()
+            self._data[_Keys.SIZE] += len(text)
+            self._data[_Keys.BUFFER] = []
+            self._data[_Keys.BUFFERED] = 0
+
+    def commit(self) -> None:
+        """Writes the rest of lines and closes output."""
+        self.flush()
+        if self._data[_Keys.OWNED]:
+            self._data[_Keys.FILE].close()
+
+    def abort(self) -> None:
+        """Closes output, lines already written cannot be withdrawn."""
+        self._data[_Keys.BUFFER] = []
+        if self._data[_Keys.OWNED]:
+            self._data[_Keys.FILE].close()
+
+
+class OrderedEmitter(BData):
+    """Emitter of csv lines for input in output order.
+
+    Records are kept in a window of limited size and the newest one is
+    written out when the window is full. Input in newest-first order,
+    like motostat exports, is emitted while it is read. Records newer
+    than already emitted ones are written late and counted.
+    """
+
+    def __init__(self, factory: TWriterFactory, window: int = WINDOW) -> None:
+        """Constructor.
+
+        ### Arguments:
+        - factory [TWriterFactory] - returns writer for kind of output.
+        - window [int] - number of records kept for reordering.
+        """
+        self._set_data(key=_Keys.FACTORY, value=factory)
+        self._set_data(key=_Keys.WINDOW, value=window, set_default_type=int)
+        self._set_data(key=_Keys.HEAP, value=[], set_default_type=List)
+        self._set_data(key=_Keys.SEQ, value=0, set_default_type=int)
+        self._set_data(key=_Keys.LAST, value=None)
+        self._set_data(key=_Keys.LATE, value=0, set_default_type=int)
+        self._set_data(key=_Keys.WRITERS, value={}, set_default_type=Dict)
+
+    @property
+    def late(self) -> int:
+        """Returns number of records emitted out of order."""
+        return self._get_data(key=_Keys.LATE)  # type: ignore
+
+    @property
+    def counts(self) -> Tuple[int, int]:
+        """Returns number of emitted cost and fuel lines."""
+        writers: Dict[str, TWriter] = self._data[_Keys.WRITERS]
+        costs: int = writers[COST].count if COST in writers else 0
+        fuels: int = writers[FUEL].count if FUEL in writers else 0
+        return costs, fuels
+
+    @property
+    def size(self) -> int:
+        """Returns size of written output."""
+        return sum(writer.size for writer in self._data[_Keys.WRITERS].values())
+
+    def add_records(self, records: List[MotoStatRecord]) -> None:
+        """Adds records, emits the newest ones over window size."""
+        heap: List[Tuple[int, int, MotoStatRecord]] = self._data[_Keys.HEAP]
+        seq: int = self._data[_Keys.SEQ]
+        window: int = self._data[_Keys.WINDOW]
+        for record in records:
+            # equal keys are emitted in input order
+            heapq.heappush(heap, (-record.key, seq, record))
+            seq += 1
+            if len(heap) > window:
+                self.__emit(heapq.heappop(heap)[2])
+        self._data[_Keys.SEQ] = seq
+        for writer in self._data[_Keys.WRITERS].values():
+            writer.flush()
+
+    def finish(self) -> Tuple[int, int]:
+        """Emits the rest of records, returns number of cost and fuel lines."""
+        heap: List[Tuple[int, int, MotoStatRecord]] = self._data[_Keys.HEAP]
+        while heap:
+            self.__emit(heapq.heappop(heap)[2])
+        for writer in self._data[_Keys.WRITERS].values():
+            writer.commit()
+        return self.counts
+
+    def abort(self) -> None:
+        """Aborts all writers."""
+        for writer in self._data[_Keys.WRITERS].values():
+            writer.abort()
+
+    def __emit(self, record: MotoStatRecord) -> None:
+        """Writes record to output writers."""
+        last: Optional[int] = self._data[_Keys.LAST]
+        if last is not None and record.key > last:
+            self._data[_Keys.LATE] += 1
+        else:
+            self._data[_Keys.LAST] = record.key
+        if record.cost_id:
+            self.__writer(COST).write(format_cost(record))
+        if record.fuel_id:
+            self.__writer(FUEL).write(format_fuel(record))
+
+    def __writer(self, kind: str) -> TWriter:
+        """Returns writer for kind of output, created on first use."""
+        writers: Dict[str, TWriter] = self._data[_Keys.WRITERS]
+        if kind not in writers:
+            writers[kind] = self._data[_Keys.FACTORY](kind)
+        return writers[kind]
+
+
+class PresortedConversion(BMiles):
+    """Conversion of input in output order with lines written while reading.
+
+    Parsed records are passed to OrderedEmitter, so the first lines are
+    available before the whole input is read.
+    """
+
+    def __init__(
+        self, factory: TWriterFactory, miles: bool = False, window: int = WINDOW
+    ) -> None:
+        """Constructor.
+
+        ### Arguments:
+        - factory [TWriterFactory] - returns writer for kind of output.
+        - miles [bool] - mileage in miles flag.
+        - window [int] - number of records kept for reordering.
+        """
+        self.miles = miles
+        self._set_data(key=_Keys.EMITTER, value=OrderedEmitter(factory, window))
+        self._set_data(key=_Keys.COUNT, value=0, set_default_type=int)
+        self._set_data(key=_Keys.RECORDS, value=0, set_default_type=int)
+        self._set_data(key=_Keys.SKIPPED, value=0, set_default_type=int)
+        self._set_data(key=_Keys.ERRORS, value=[], set_default_type=List)
+
+    @property
+    def count(self) -> int:
+        """Returns number of received lines."""
+        return self._get_data(key=_Keys.COUNT)  # type: ignore
+
+    @property
+    def records(self) -> int:
+        """Returns number of found motostat records."""
+        return self._get_data(key=_Keys.RECORDS)  # type: ignore
+
+    @property
+    def late(self) -> int:
+        """Returns number of records emitted out of order."""
+        return self._data[_Keys.EMITTER].late
+
+    @property
+    def skipped(self) -> int:
+        """Returns number of rows skipped because of invalid data."""
+        return self._data[_Keys.SKIPPED] + len(self._data[_Keys.ERRORS])
+
+    def pop_errors(self) -> List[str]:
+        """Returns and clears list of messages about skipped rows."""
+        out: List[str] = self._data[_Keys.ERRORS]
+        self._data[_Keys.ERRORS] = []
+        self._data[_Keys.SKIPPED] += len(out)
+        return out
+
+    def add_batch(self, lines: List[str]) -> None:
+        """Parses batch of lines and emits records."""
+        self.add_records(*parse_batch(lines, self.miles, self.count), len(lines))
+
+    def add_records(
+        self, records: List[MotoStatRecord], errors: List[str], lines: int
+    ) -> None:
+        """Emits records parsed from batch of lines.
+
+        ### Arguments:
+        - records [List[MotoStatRecord]] - parsed records.
+        - errors [List[str]] - messages about skipped rows.
+        - lines [int] - number of lines in batch.
+        """
+        self._data[_Keys.EMITTER].add_records(records)
+        self._data[_Keys.ERRORS].extend(errors)
+        self._data[_Keys.COUNT] += lines
+        self._data[_Keys.RECORDS] += len(records)
+
+    @property
+    def size(self) -> int:
+        """Returns size of written output."""
+        return self._data[_Keys.EMITTER].size
+
+    def finish(self) -> Tuple[int, int]:
+        """Emits the rest of records, returns number of cost and fuel lines."""
+        return self._data[_Keys.EMITTER].finish()
+
+    def abort(self) -> None:
+        """Aborts writers of already emitted records."""
+        self._data[_Keys.EMITTER].abort()
+
+
+def write_outputs(
+    conversion: Union[
+        Conversion, ColumnarConversion, StreamingConversion, PresortedConversion
+    ],
+    factory: TWriterFactory,
+    stats: Optional[RunStats] = None,
+) -> Tuple[int, int]:
+    """Writes converted lines with writers, returns number of cost and fuel lines.
+
+    ### Arguments:
+    - conversion [Union[...]] - conversion engine with parsed records.
+    - factory [TWriterFactory] - returns writer for kind of output.
+    - stats [Optional[RunStats]] - statistics updated with stage times and sizes.
+    """
+    if stats is None:
+        stats = RunStats()
+    writers: Dict[str, TWriter] = {}
+    try:
+        if isinstance(conversion, PresortedConversion):
+            # records were written while reading, the rest is in the window
+            with stats.stage("write"):
+                counts: Tuple[int, int] = conversion.finish()
+            stats.checkpoint("write")
+            stats.add("bytes_out", conversion.size)
+            return counts
+        if isinstance(conversion, StreamingConversion):
+            # sorted runs are merged straight into writers
+            with stats.stage("write"):
+                for kind, line in conversion.lines():
+                    if kind not in writers:
+                        writers[kind] = factory(kind)
+                    writers[kind].write(line)
+                for writer in writers.values():
+                    writer.commit()
+            stats.checkpoint("write")
+        else:
+            if isinstance(conversion, Conversion):
+                with stats.stage("sort"):
+                    conversion.sort()
+                stats.checkpoint("sort")
+            with stats.stage("convert"):
+                costs, fuels = conversion.convert()
+            stats.checkpoint("convert")
+            with stats.stage("write"):
+                for kind, lines in ((COST, costs), (FUEL, fuels)):
+                    if lines:
+                        writers[kind] = factory(kind)
+                # files are written concurrently
+                with ThreadPoolExecutor(max_workers=len(writers) or 1) as executor:
+                    list(
+                        executor.map(
+                            _write_all,
+                            writers.values(),
+                            [costs if kind == COST else fuels for kind in writers],
+                            [stats] * len(writers),
+                        )
+                    )
+            stats.checkpoint("write")
+    except BaseException:
+        if isinstance(conversion, PresortedConversion):
+            conversion.abort()
+        for writer in writers.values():
+            writer.abort()
+        raise
+    stats.add("bytes_out", sum(writer.size for writer in writers.values()))
+    return (
+        writers[COST].count if COST in writers else 0,
+        writers[FUEL].count if FUEL in writers else 0,
+    )
+
+
+def _write_all(writer: TWriter, lines: List[str], stats: RunStats) -> None:
+    """Writes list of lines and commits writer."""
+    with stats.profiled("write"):
+        writer.write_lines(lines)
+        writer.commit()
+
+
+# #[EOF]#######################################################################
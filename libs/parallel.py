@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+  parallel.py
+  Author : Jacek 'Szumak' Kotlarski --<szumak@virthost.pl>
+  Created: 16.10.2026, 23:14:27
+
+  Purpose: Parallel parsing of record batches on a process pool.
+"""
+
+import multiprocessing
+
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Deque, Iterator, List, Tuple
+
+from jsktoolbox.attribtool import ReadOnlyClass
+
+from libs.base import BMiles
+from libs.conversion import parse_batch
+from libs.model import MotoStatRecord
+
+# type of parsed batch: records, messages about skipped rows, number of lines
+TParsed = Tuple[List[MotoStatRecord], List[str], int]
+
+# start method of worker processes, pools are created while reader and
+# logger threads hold locks, which a forked child would inherit locked
+START_METHOD: str = (
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+
+class _Keys(object, metaclass=ReadOnlyClass):
+    """Internal Keys container class."""
+
+    DEPTH: str = "__depth__"
+    EXECUTOR: str = "__executor__"
+    PENDING: str = "__pending__"
+    ROW: str = "__row__"
+
+
+def process_pool(jobs: int) -> ProcessPoolExecutor:
+    """Returns pool of 'jobs' worker processes not forked from threads."""
+    return ProcessPoolExecutor(
+        max_workers=jobs, mp_context=multiprocessing.get_context(START_METHOD)
+    )
+
+
+class ParallelParser(BMiles):
+    """Parser of record batches in worker processes.
+
+    Batches are parsed concurrently and returned in submission order,
+    so the result is the same as for parsing in a single thread.
+    """
+
+    def __init__(self, jobs: int, miles: bool = False, depth: int = 0) -> None:
+        """Constructor.
+
+        ### Arguments:
+        - jobs [int] - number of worker processes.
+        - miles [bool] - mileage in miles flag.
+        - depth [int] - maximum number of batches in progress, 2 * jobs if 0.
+        """
+        self.miles = miles
+        self._set_data(
+            key=_Keys.EXECUTOR,
+            value=process_pool(jobs),
+            set_default_type=ProcessPoolExecutor,
+        )
+        self._set_data(key=_Keys.DEPTH, value=depth or 2 * jobs, set_default_type=int)
+        self._set_data(key=_Keys.PENDING, value=deque(), set_default_type=Deque)
+        self._set_data(key=_Keys.ROW, value=0, set_default_type=int)
+
+    def submit(self, lines: List[str]) -> Iterator[TParsed]:
+        """Sends batch to workers, yields parsed batches that are ready.
+
+        Waits for the oldest batch if too many batches are in progress.
+        """
+        pending: Deque[Tuple[Future, int]] = self._data[_Keys.PENDING]
+        pending.append(
+            (
+                self._data[_Keys.EXECUTOR].submit(
+                    parse_batch, lines, self.miles, self._data[_Keys.ROW]
+                ),
+                len(lines),
+            )
+        )
+        self._data[_Keys.ROW] += len(lines)
+        while pending and (
+            len(pending) > self._data[_Keys.DEPTH] or pending[0][0].done()
+        ):
+            future, count = pending.popleft()
+            yield *future.result(), count
+
+    def finish(self) -> Iterator[TParsed]:
+        """Yields the rest of parsed batches and stops workers."""
+        pending: Deque[Tuple[Future, int]] = self._data[_Keys.PENDING]
+        try:
+            while pending:
+                future, count = pending.popleft()
+                yield *future.result(), count
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        """Stops workers, batches in progress are cancelled."""
+        self._data[_Keys.PENDING].clear()
+        self._data[_Keys.EXECUTOR].shutdown(wait=True, cancel_futures=True)
+
+
+# #[EOF]#######################################################################
@@ -7,28 +7,75 @@
   Purpose: Processor class.
 """
 
-import time, os
+import os
 
-from typing import Optional, List
+from typing import Optional, List, Tuple, Union
 from threading import Event, Thread
-from queue import Queue, Empty
+from queue import Empty, Queue
 
 from jsktoolbox.attribtool import ReadOnlyClass
 from jsktoolbox.logstool.logs import LoggerClient, LoggerQueue
 from jsktoolbox.basetool.threads import ThBaseObject
-from jsktoolbox.systemtool import PathChecker
 
-from libs.base import BDebug, BDir, BMiles, BVerbose, BLogs, BStop
-from libs.model import MotoStat, SpritMonitor
+from libs.base import (
+    BColumnar,
+    BCompression,
+    BDebug,
+    BDir,
+    BFsync,
+    BJobs,
+    BMemory,
+    BMiles,
+    BOutput,
+    BVerbose,
+    BLogs,
+    BState,
+    BStop,
+)
+from libs.cache import ResultCache
+from libs.columnar import ColumnarConversion
+from libs.comms import CommsQueue
+from libs.compression import SUFFIXES
+from libs.conversion import COSTS_FILE, FUELS_FILE, Conversion, check_output_dir
+from libs.incremental import Watermark, delta_names
+from libs.model import MotoStat
+from libs.output import PresortedConversion, write_outputs, writer_factory
+from libs.parallel import ParallelParser
+from libs.stats import RunStats
+from libs.streaming import COST, FUEL, StreamingConversion
+
+
+# end of input marker for communication queue
+END_OF_INPUT = None
 
 
 class _Keys(object, metaclass=ReadOnlyClass):
     """Internal Keys container class."""
 
+    CACHE: str = "__cache__"
+    CACHE_KEY: str = "__cache_key__"
+    RESTORED: str = "__restored__"
+    STATS: str = "__stats__"
     QUEUE: str = "__comms_queue__"
 
 
-class CsvProcessor(Thread, ThBaseObject, BLogs, BStop, BMiles, BVerbose, BDebug, BDir):
+class CsvProcessor(
+    Thread,
+    ThBaseObject,
+    BLogs,
+    BStop,
+    BMiles,
+    BVerbose,
+    BDebug,
+    BDir,
+    BColumnar,
+    BMemory,
+    BState,
+    BJobs,
+    BFsync,
+    BOutput,
+    BCompression,
+):
     """Csv data processor class."""
 
     def __init__(
@@ -38,15 +85,37 @@ class CsvProcessor(Thread, ThBaseObject, BLogs, BStop, BMiles, BVerbose, BDebug,
         miles: bool = False,
         verbose: bool = False,
         debug: bool = False,
+        columnar: bool = False,
+        memory_limit: int = 0,
+        state_file: str = "",
+        cache: Optional[ResultCache] = None,
+        jobs: int = 1,
+        fsync: bool = False,
+        costs_out: str = "",
+        fuels_out: str = "",
+        presorted: bool = False,
+        compression: str = "",
+        stats: Optional[RunStats] = None,
     ) -> None:
         """Constructor.
 
         ### Arguments:
         - logger_queue [LoggerQueue] - logger queue for communication.
-        - comms_queue [Queue] - communication queue.
+        - comms_queue [Queue] - communication queue for lines or batches of lines.
         - miles [bool] - mileage in miles flag.
         - debug [bool] - debug flag.
         - verbose [bool] - verbose flag.
+        - columnar [bool] - columnar engine flag.
+        - memory_limit [int] - memory limit in MiB for streaming engine, 0 to disable.
+        - state_file [str] - state file for incremental conversion, empty to disable.
+        - cache [Optional[ResultCache]] - cache of conversion results.
+        - jobs [int] - number of parsing processes, columnar engine parses in thread.
+        - fsync [bool] - flush output files to disk before they replace old ones.
+        - costs_out [str] - stream target of cost lines, empty for file in output dir.
+        - fuels_out [str] - stream target of fuel lines, empty for file in output dir.
+        - presorted [bool] - input in output order, lines written while reading.
+        - compression [str] - compression format of output files, empty for plain.
+        - stats [Optional[RunStats]] - statistics of the run, updated by processor.
         """
         # init thread
         Thread.__init__(self, name=f"{self._c_name}")
@@ -58,6 +127,23 @@ class CsvProcessor(Thread, ThBaseObject, BLogs, BStop, BMiles, BVerbose, BDebug,
         self.verbose = verbose
         # miles
         self.miles = miles
+        # conversion engine
+        self.columnar = columnar
+        self.memory_limit = memory_limit
+        self.state_file = state_file
+        self.jobs = jobs
+        self.fsync = fsync
+        # stream output
+        self.costs_out = costs_out
+        self.fuels_out = fuels_out
+        self.presorted = presorted
+        self.compression = compression
+        # result cache, used only if the key of input is set
+        self._set_data(key=_Keys.CACHE, value=cache)
+        self._set_data(key=_Keys.CACHE_KEY, value="", set_default_type=str)
+        self._set_data(key=_Keys.RESTORED, value=None)
+        # statistics
+        self._set_data(key=_Keys.STATS, value=stats or RunStats())
         # logger
         self.logs = LoggerClient(logger_queue, f"{self._c_name}")
         # communication queue
@@ -65,6 +151,15 @@ class CsvProcessor(Thread, ThBaseObject, BLogs, BStop, BMiles, BVerbose, BDebug,
 
     def run(self) -> None:
         """Start processor."""
+        try:
+            self.__process()
+        finally:
+            # reader must not wait for the full queue after processor exit
+            if isinstance(self.__comms_queue, CommsQueue):
+                self.__comms_queue.close()
+
+    def __process(self) -> None:
+        """Receive and convert records."""
         if not self._stop_event:
             return None
         if not self.__comms_queue:
@@ -72,90 +167,205 @@ class CsvProcessor(Thread, ThBaseObject, BLogs, BStop, BMiles, BVerbose, BDebug,
             return None
 
         # check output dir
-        out_dir = PathChecker(f"{self.output_dir}/")
-        if out_dir.exists and out_dir.is_dir:
-            pass
-        else:
-            if not out_dir.exists:
-                if not out_dir.create():
-                    self.logs.message_error = (
-                        f"Cannot create output directory: '{self.output_dir}', exiting."
-                    )
-                    return
-            if out_dir.is_file:
-                self.logs.message_error = (
-                    f"Output dir: '{self.output_dir}' existing and is a file, exiting."
-                )
+        error: Optional[str] = check_output_dir(self.output_dir)
+        if error:
+            self.logs.message_error = error
+            return
+
+        # incremental mode, records converted in previous runs are skipped
+        watermark: Optional[Watermark] = None
+        if self.state_file:
+            try:
+                watermark = Watermark(self.state_file)
+            except (OSError, ValueError) as ex:
+                self.logs.message_error = f"Cannot read state file: {ex}, exiting."
                 return
 
+        # stream output, kinds without target are written to output dir
+        names: Tuple[str, ...] = (
+            delta_names() if watermark is not None else (COSTS_FILE, FUELS_FILE)
+        )
+        if self.compression:
+            names = tuple(name + SUFFIXES[self.compression] for name in names)
+        factory = writer_factory(
+            {COST: self.costs_out, FUEL: self.fuels_out},
+            {
+                kind: os.path.join(self.output_dir, name)
+                for kind, name in zip((COST, FUEL), names)
+            },
+            append=watermark is not None,
+            fsync=self.fsync,
+            compression=self.compression,
+        )
+        streams: bool = bool(self.costs_out or self.fuels_out)
+
         # data
-        data: List[MotoStat] = []
-        sprit_fuels: List[SpritMonitor] = []
-        sprit_costs: List[SpritMonitor] = []
+        conversion: Union[
+            Conversion, ColumnarConversion, StreamingConversion, PresortedConversion
+        ]
+        if streams and self.presorted:
+            conversion = PresortedConversion(factory, miles=self.miles)
+        elif self.memory_limit:
+            conversion = StreamingConversion(
+                miles=self.miles,
+                memory_limit=self.memory_limit * 1024 * 1024,
+                tmp_dir=self.output_dir,
+            )
+        elif self.columnar:
+            conversion = ColumnarConversion(miles=self.miles)
+        else:
+            conversion = Conversion(miles=self.miles)
+
+        # statistics of the run
+        stats: RunStats = self._get_data(key=_Keys.STATS)
+
+        # parsing in worker processes, batches are added in input order
+        parser: Optional[ParallelParser] = None
+        if self.jobs > 1 and not isinstance(conversion, ColumnarConversion):
+            parser = ParallelParser(self.jobs, self.miles)
+
+        # messages about skipped rows
+        skipped: List[str] = []
 
-        # main loop
-        count: int = 0
+        # main loop, blocking until the end of input marker is received
         while True:
-            if self.__comms_queue.empty() and self._stop_event.is_set():
-                break
+            # getting data from queue
             try:
-                # getting data from queue
-                line: str = self.__comms_queue.get(block=False)
-                item = MotoStat(csv_line=line.strip(), miles=self.miles)
-                count += 1
-                if self.debug:
-                    self.logs.message_debug = f"Item {count:03d}: {item}"
-                if not item.is_empty:
-                    data.append(item)
+                batch: Optional[Union[str, List[str]]] = self.__comms_queue.get(
+                    timeout=self.sleep_period
+                )
             except Empty:
-                time.sleep(0.1)
+                continue
+            if batch is END_OF_INPUT:
+                break
+            if isinstance(batch, str):
+                batch = [batch]
+            stats.add("lines_read", len(batch))
+            if watermark is not None:
+                batch = watermark.filter(batch)
+            with stats.stage("parse"):
+                if parser is not None:
+                    for parsed in parser.submit(batch):
+                        conversion.add_records(*parsed)  # type: ignore
+                elif not self.debug or not isinstance(conversion, Conversion):
+                    conversion.add_batch(batch)
+                else:
+                    for line in batch:
+                        item: MotoStat = conversion.add_line(line)  # type: ignore
+                        self.logs.message_debug = f"Item {conversion.count:03d}: {item}"
+            for message in conversion.pop_errors():
+                skipped.append(message)
+                self.logs.message_error = f"Skipped {message}"
+        if parser is not None:
+            with stats.stage("parse"):
+                for parsed in parser.finish():
+                    conversion.add_records(*parsed)  # type: ignore
+            for message in conversion.pop_errors():
+                skipped.append(message)
+                self.logs.message_error = f"Skipped {message}"
+        stats.checkpoint("parse")
 
-        # processing data
-        if data:
-            self.logs.message_info = f"Found {len(data)} records from motostat."
-            for item in sorted(data, reverse=True):
-                if item.cost_id:
-                    sprit_costs.append(SpritMonitor(item))
-                if item.fuel_id:
-                    sprit_fuels.append(SpritMonitor(item))
-            self.__write_costs(sprit_costs)
-            self.__write_fuels(sprit_fuels)
-            if sprit_costs:
+        # cached result of the same input
+        cache: Optional[ResultCache] = self._get_data(key=_Keys.CACHE)
+        key: str = self.cache_key if watermark is None and not streams else ""
+        if cache is not None and key:
+            restored: Optional[Tuple[int, int, List[str]]] = self.restored
+            if restored is None:
+                with stats.stage("write"):
+                    restored = cache.restore(key, self.output_dir)
+            if restored:
+                costs, fuels, messages = restored
+                stats.add("cache_hits")
+                stats.add("records_parsed", conversion.records)
+                stats.add("records_skipped", len(messages))
+                stats.add("costs_emitted", costs)
+                stats.add("fuels_emitted", fuels)
+                # input read from pipe was already parsed and reported
+                if not conversion.count:
+                    for message in messages:
+                        self.logs.message_error = f"Skipped {message}"
                 self.logs.message_info = (
-                    f"{len(sprit_costs)} cost records saved for spritmonitor."
+                    f"{costs} cost and {fuels} fuels records restored from cache."
+                )
+                return
+
+        # processing data
+        if conversion.records:
+            self.logs.message_info = (
+                f"Found {conversion.records} records from motostat."
+            )
+            # in incremental mode new records are appended to delta files
+            costs, fuels = write_outputs(conversion, factory, stats)
+            stats.add("costs_emitted", costs)
+            stats.add("fuels_emitted", fuels)
+            # columnar engine validates rows during conversion
+            for message in conversion.pop_errors():
+                skipped.append(message)
+                self.logs.message_error = f"Skipped {message}"
+            if isinstance(conversion, PresortedConversion) and conversion.late:
+                self.logs.message_warning = (
+                    f"{conversion.late} records were written out of order, "
+                    "input is not sorted newest first."
                 )
-            if sprit_fuels:
+            if costs:
+                self.logs.message_info = f"{costs} cost records saved for spritmonitor."
+            if fuels:
                 self.logs.message_info = (
-                    f"{len(sprit_fuels)} fuels records saved for spritmonitor."
+                    f"{fuels} fuels records saved for spritmonitor."
+                )
+            if cache is not None and key:
+                # files of kinds without records may be left from old runs
+                cache.store(
+                    key,
+                    self.output_dir,
+                    [name for name, count in zip(names, (costs, fuels)) if count],
+                    costs,
+                    fuels,
+                    skipped,
+                )
+        stats.add("records_parsed", conversion.records)
+        stats.add("records_skipped", len(skipped))
+        if watermark is not None:
+            watermark.advance(skipped)
+            watermark.save()
+            if self.debug:
+                self.logs.message_debug = (
+                    f"Watermark: cost_id={watermark.cost_id}, "
+                    f"fueling_id={watermark.fueling_id}"
                 )
         # exit
         if self.debug:
             self.logs.message_debug = "stopped."
 
-    def __write_costs(self, data: List[SpritMonitor]) -> None:
-        """Write csv."""
-        csv_path: str = os.path.join(self.output_dir, "spritmonitor_costs.csv")
-        if data:
-            with open(csv_path, "w") as file:
-                file.write(f"{data[0].csv_header}\n")
-                for item in data:
-                    file.write(f"{item.csv_data}\n")
-
-    def __write_fuels(self, data: List[SpritMonitor]) -> None:
-        """Write csv."""
-        csv_path: str = os.path.join(self.output_dir, "spritmonitor_fuels.csv")
-        if data:
-            with open(csv_path, "w") as file:
-                file.write(f"{data[0].csv_header}\n")
-                for item in data:
-                    file.write(f"{item.csv_data}\n")
-
     def stop(self) -> None:
-        """Sets stop event."""
+        """Sets stop event and sends the end of input marker."""
         if self._stop_event:
             if self.debug:
                 self.logs.message_debug = "stopping..."
-            self._stop_event.set()
+            if not self._stop_event.is_set():
+                self._stop_event.set()
+                if self.__comms_queue:
+                    self.__comms_queue.put(END_OF_INPUT)
+
+    @property
+    def cache_key(self) -> str:
+        """Returns cache key of input, empty if not known."""
+        return self._get_data(key=_Keys.CACHE_KEY)  # type: ignore
+
+    @cache_key.setter
+    def cache_key(self, value: str) -> None:
+        """Sets cache key of input, must be set before stop()."""
+        self._set_data(key=_Keys.CACHE_KEY, value=value)
+
+    @property
+    def restored(self) -> Optional[Tuple[int, int, List[str]]]:
+        """Returns result restored from cache before input was read."""
+        return self._get_data(key=_Keys.RESTORED)  # type: ignore
+
+    @restored.setter
+    def restored(self, value: Optional[Tuple[int, int, List[str]]]) -> None:
+        """Sets result restored from cache, must be set before stop()."""
+        self._set_data(key=_Keys.RESTORED, value=value)
 
     @property
     def __comms_queue(self) -> Optional[Queue]:
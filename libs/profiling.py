@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+"""
+  profiling.py
+  Author : Jacek 'Szumak' Kotlarski --<szumak@virthost.pl>
+  Created: 17.10.2026, 04:31:09
+
+  Purpose: Per-stage cProfile and tracemalloc profiling of conversion.
+"""
+
+import cProfile, os, pstats, tracemalloc
+
+from threading import Lock, get_ident
+from typing import Any, Dict, List, Optional
+
+from jsktoolbox.attribtool import ReadOnlyClass
+from jsktoolbox.basetool.data import BData
+
+# number of frames stored for traced memory blocks
+TRACE_DEPTH: int = 1
+
+# number of allocation sites in memory report
+TOP_ALLOCATIONS: int = 25
+
+
+class _Keys(object, metaclass=ReadOnlyClass):
+    """Internal Keys container class."""
+
+    ACTIVE: str = "__active__"
+    DIR: str = "__dir__"
+    LOCK: str = "__lock__"
+    STAGES: str = "__stages__"
+    STARTED: str = "__started__"
+
+
+class _Stage(object):
+    """Profiling data of a single stage."""
+
+    def __init__(self) -> None:
+        self.profiles: Dict[int, cProfile.Profile] = {}
+        self.segments: int = 0
+        self.skipped: int = 0
+        self.peak: int = 0
+        self.current: int = 0
+        self.snapshot: Optional[tracemalloc.Snapshot] = None
+
+
+class StageProfiler(BData):
+    """Profiler of conversion stages.
+
+    Every stage has its own cProfile profiler for every thread running
+    the stage, profiles of threads are merged when reports are written.
+    Memory is traced with tracemalloc, peak of traced memory is recorded
+    for every segment of a stage. The peak is process-wide: it includes
+    memory of stages running at the same time in other threads, and it is
+    reset only when no other segment is in progress, so concurrent stages
+    do not reset peaks of each other. Snapshot of traced memory is taken only
+    at the end of a stage, because taking it costs time proportional to
+    the number of live allocations.
+    """
+
+    def __init__(self, directory: str) -> None:
+        """Constructor.
+
+        ### Arguments:
+        - directory [str] - directory for profiling reports, created if needed.
+        """
+        os.makedirs(directory, exist_ok=True)
+        self._set_data(key=_Keys.DIR, value=directory, set_default_type=str)
+        self._set_data(key=_Keys.LOCK, value=Lock())
+        self._set_data(key=_Keys.ACTIVE, value=0, set_default_type=int)
+        self._set_data(key=_Keys.STAGES, value={}, set_default_type=Dict)
+        self._set_data(
+            key=_Keys.STARTED,
+            value=not tracemalloc.is_tracing(),
+            set_default_type=bool,
+        )
+        if self._data[_Keys.STARTED]:
+            tracemalloc.start(TRACE_DEPTH)
+
+    @property
+    def directory(self) -> str:
+        """Returns directory for profiling reports."""
+        return self._get_data(key=_Keys.DIR)  # type: ignore
+
+    def enter(self, name: str) -> Optional[cProfile.Profile]:
+        """Starts profiling of stage segment in current thread.
+
+        Returns enabled profiler, None if another profiler is active.
+        """
+        with self._data[_Keys.LOCK]:
+            stage: _Stage = self._data[_Keys.STAGES].setdefault(name, _Stage())
+            stage.segments += 1
+            profile: cProfile.Profile = stage.profiles.setdefault(
+                get_ident(), cProfile.Profile()
+            )
+            if not self._data[_Keys.ACTIVE]:
+                tracemalloc.reset_peak()
+            self._data[_Keys.ACTIVE] += 1
+        try:
+            profile.enable()
+        except ValueError:
+            # only one profiler can be active in some Python versions
+            with self._data[_Keys.LOCK]:
+                stage.skipped += 1
+            return None
+        return profile
+
+    def exit(self, name: str, profile: Optional[cProfile.Profile]) -> None:
+        """Stops profiling of stage segment started with enter()."""
+        if profile is not None:
+            profile.disable()
+        with self._data[_Keys.LOCK]:
+            self._data[_Keys.ACTIVE] -= 1
+            stage: _Stage = self._data[_Keys.STAGES][name]
+            stage.peak = max(stage.peak, tracemalloc.get_traced_memory()[1])
+
+    def snapshot(self, name: str) -> None:
+        """Takes snapshot of traced memory at the end of stage."""
+        snapshot: tracemalloc.Snapshot = tracemalloc.take_snapshot()
+        current: int = tracemalloc.get_traced_memory()[0]
+        with self._data[_Keys.LOCK]:
+            stage: _Stage = self._data[_Keys.STAGES].setdefault(name, _Stage())
+            stage.current = current
+            stage.snapshot = snapshot
+
+    def write(self) -> List[str]:
+        """Writes pstats and memory reports of stages, returns written paths.
+
+        Memory tracing started by profiler is stopped.
+        """
+        out: List[str] = []
+        with self._data[_Keys.LOCK]:
+            stages: Dict[str, _Stage] = dict(self._data[_Keys.STAGES])
+        for name, stage in stages.items():
+            path: str = os.path.join(self.directory, f"{name}.pstats")
+            stats: Optional[pstats.Stats] = None
+            for profile in stage.profiles.values():
+                try:
+                    if stats is None:
+                        stats = pstats.Stats(profile)
+                    else:
+                        stats.add(profile)
+                except TypeError:
+                    # profile of thread without profiled segments
+                    continue
+            if stats is not None:
+                stats.dump_stats(path)
+                out.append(path)
+            path = os.path.join(self.directory, f"{name}.memory.txt")
+            with open(path, "w") as file:
+                file.write(self.__memory_report(name, stage))
+            out.append(path)
+        if self._data[_Keys.STARTED] and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        return out
+
+    def __memory_report(self, name: str, stage: _Stage) -> str:
+        """Returns text report of stage memory usage."""
+        lines: List[Any] = [
+            f"stage: {name}",
+            f"segments: {stage.segments}",
+            f"threads: {len(stage.profiles)}",
+            f"segments without cProfile: {stage.skipped}",
+            f"peak traced memory of process during stage: {stage.peak} B",
+            f"traced memory at the end of stage: {stage.current} B",
+            "",
+            f"top {TOP_ALLOCATIONS} allocations at the end of stage:",
+        ]
+        if stage.snapshot is not None:
+            items: List[tracemalloc.Statistic] = [
+                item
+                for item in stage.snapshot.statistics("lineno")
+                if item.traceback[0].filename != tracemalloc.__file__
+            ]
+            for item in items[:TOP_ALLOCATIONS]:
+                lines.append(f"{item}")
+        return "\n".join(lines) + "\n"
+
+
+# #[EOF]#######################################################################
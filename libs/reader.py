@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+"""
+  reader.py
+  Author : Jacek 'Szumak' Kotlarski --<szumak@virthost.pl>
+  Created: 16.10.2026, 09:12:40
+
+  Purpose: Bulk readers for motostat csv input.
+"""
+
+import mmap, os
+
+from typing import Any, BinaryIO, Iterator, List, Optional, Tuple, Union
+
+from jsktoolbox.attribtool import ReadOnlyClass
+from jsktoolbox.basetool.data import BData
+
+# default size of a single read from input stream
+CHUNK_SIZE: int = 1024 * 1024
+# default number of records in a batch from memory mapped file
+BATCH_SIZE: int = 4096
+
+
+class _Keys(object, metaclass=ReadOnlyClass):
+    """Internal Keys container class."""
+
+    BATCH_SIZE: str = "__batch_size__"
+    CHUNK_SIZE: str = "__chunk_size__"
+    ENCODING: str = "__encoding__"
+    PATH: str = "__path__"
+    PENDING: str = "__pending__"
+    SIZE: str = "__size__"
+    STREAM: str = "__stream__"
+    TAIL: str = "__tail__"
+
+
+class RecordSplitter(BData):
+    """Splitter of raw bytes chunks into motostat records.
+
+    Every record is terminated by '\\n'. The '\\r\\n' sequence is a part of
+    multi-line notes and does not terminate the record.
+    """
+
+    def __init__(self, encoding: str = "utf-8") -> None:
+        """Constructor.
+
+        ### Arguments:
+        - encoding [str] - encoding of input data.
+        """
+        self._set_data(key=_Keys.ENCODING, value=encoding, set_default_type=str)
+        self._set_data(key=_Keys.TAIL, value=b"", set_default_type=bytes)
+        self._set_data(key=_Keys.PENDING, value="", set_default_type=str)
+
+    @property
+    def buffered(self) -> int:
+        """Returns number of bytes and characters of the incomplete record."""
+        return len(self._get_data(key=_Keys.TAIL)) + len(  # type: ignore
+            self._get_data(key=_Keys.PENDING)  # type: ignore
+        )
+
+    def feed(self, chunk: bytes) -> List[str]:
+        """Returns list of complete records found in received chunk."""
+        buf: bytes = self._get_data(key=_Keys.TAIL) + chunk  # type: ignore
+        pos: int = buf.rfind(b"\n")
+        if pos == -1:
+            self._set_data(key=_Keys.TAIL, value=buf)
+            return []
+        self._set_data(key=_Keys.TAIL, value=buf[pos + 1 :])
+        return self.__split(buf[:pos])
+
+    def flush(self) -> List[str]:
+        """Returns the rest of data, if the input did not end with '\\n'."""
+        buf: bytes = self._get_data(key=_Keys.TAIL)  # type: ignore
+        self._set_data(key=_Keys.TAIL, value=b"")
+        out: List[str] = self.__split(buf) if buf else []
+        pending: str = self._get_data(key=_Keys.PENDING)  # type: ignore
+        self._set_data(key=_Keys.PENDING, value="")
+        if pending:
+            out.append(pending.rstrip("\n"))
+        return out
+
+    def __split(self, buf: bytes) -> List[str]:
+        """Decode and split buffer of complete lines into records."""
+        text: str = self._get_data(key=_Keys.PENDING) + buf.decode(  # type: ignore
+            self._get_data(key=_Keys.ENCODING), errors="replace"  # type: ignore
+        )
+        self._set_data(key=_Keys.PENDING, value="")
+        lines: List[str] = text.split("\n")
+        if "\r" not in text:
+            return lines
+        out: List[str] = []
+        record: str = ""
+        for line in lines:
+            record += line
+            if line.endswith("\r"):
+                record += "\n"
+            else:
+                out.append(record)
+                record = ""
+        if record:
+            # multi-line note continues in the next chunk
+            self._set_data(key=_Keys.PENDING, value=record)
+        return out
+
+
+class ChunkReader(BData):
+    """Bulk reader of binary stream.
+
+    Reads input in large chunks and returns batches of complete records.
+    """
+
+    def __init__(
+        self, stream: BinaryIO, chunk_size: int = CHUNK_SIZE, encoding: str = "utf-8"
+    ) -> None:
+        """Constructor.
+
+        ### Arguments:
+        - stream [BinaryIO] - binary input stream, for example sys.stdin.buffer.
+        - chunk_size [int] - size of a single read in bytes.
+        - encoding [str] - encoding of input data.
+        """
+        self._set_data(key=_Keys.STREAM, value=stream)
+        self._set_data(key=_Keys.CHUNK_SIZE, value=chunk_size, set_default_type=int)
+        self._set_data(key=_Keys.ENCODING, value=encoding, set_default_type=str)
+        self._set_data(key=_Keys.SIZE, value=0, set_default_type=int)
+
+    @property
+    def size(self) -> int:
+        """Returns number of bytes read from stream."""
+        return self._get_data(key=_Keys.SIZE)  # type: ignore
+
+    def batches(self, hasher: Optional[Any] = None) -> Iterator[List[str]]:
+        """Yields batches of records until the end of stream.
+
+        ### Arguments:
+        - hasher [Optional[Any]] - hashlib object updated with every chunk read.
+        """
+        stream: BinaryIO = self._get_data(key=_Keys.STREAM)  # type: ignore
+        size: int = self._get_data(key=_Keys.CHUNK_SIZE)  # type: ignore
+        splitter = RecordSplitter(self._get_data(key=_Keys.ENCODING))  # type: ignore
+        while True:
+            chunk: bytes = stream.read(size)
+            if not chunk:
+                break
+            self._data[_Keys.SIZE] += len(chunk)
+            if hasher is not None:
+                hasher.update(chunk)
+            batch: List[str] = splitter.feed(chunk)
+            if batch:
+                yield batch
+        batch = splitter.flush()
+        if batch:
+            yield batch
+
+
+def record_bounds(
+    buf: Union[bytes, mmap.mmap], start: int = 0, end: int = -1
+) -> Iterator[Tuple[int, int]]:
+    """Yields (start, end) offsets of records found in raw bytes buffer.
+
+    ### Arguments:
+    - buf [Union[bytes, mmap.mmap]] - buffer with motostat csv data.
+    - start [int] - offset of the first record.
+    - end [int] - end of scanned region, -1 for the end of buffer.
+
+    The end offset points to the '\n' terminating the record or to the end of
+    scanned region. Empty lines are omitted.
+    """
+    if end < 0:
+        end = len(buf)
+    find = buf.find
+    pos: int = start
+    while pos < end:
+        stop: int = find(b"\n", pos, end)
+        # '\r\n' inside multi-line notes does not terminate the record
+        while stop > pos and buf[stop - 1] == 13:
+            stop = find(b"\n", stop + 1, end)
+        if stop == -1:
+            stop = end
+        if stop > pos:
+            yield pos, stop
+        pos = stop + 1
+
+
+class MmapReader(BData):
+    """Reader of motostat csv file with memory mapped zero-copy scanning.
+
+    Record boundaries are searched over raw bytes of mapped file, only slices
+    with complete records are decoded.
+    """
+
+    def __init__(
+        self, path: str, batch_size: int = BATCH_SIZE, encoding: str = "utf-8"
+    ) -> None:
+        """Constructor.
+
+        ### Arguments:
+        - path [str] - path to the motostat csv file.
+        - batch_size [int] - number of records in a single batch.
+        - encoding [str] - encoding of input data.
+        """
+        self._set_data(key=_Keys.PATH, value=path, set_default_type=str)
+        self._set_data(key=_Keys.BATCH_SIZE, value=batch_size, set_default_type=int)
+        self._set_data(key=_Keys.ENCODING, value=encoding, set_default_type=str)
+
+    def batches(self) -> Iterator[List[str]]:
+        """Yields batches of records until the end of file."""
+        size: int = self._get_data(key=_Keys.BATCH_SIZE)  # type: ignore
+        encoding: str = self._get_data(key=_Keys.ENCODING)  # type: ignore
+        with open(self._get_data(key=_Keys.PATH), "rb") as file:  # type: ignore
+            if os.fstat(file.fileno()).st_size == 0:
+                return
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                view = memoryview(buf)
+                try:
+                    batch: List[str] = []
+                    for start, stop in record_bounds(buf):
+                        batch.append(str(view[start:stop], encoding, "replace"))
+                        if len(batch) == size:
+                            yield batch
+                            batch = []
+                    if batch:
+                        yield batch
+                finally:
+                    view.release()
+
+
+# #[EOF]#######################################################################
@@ -0,0 +1,385 @@
+# -*- coding: utf-8 -*-
+"""
+  server.py
+  Author : Jacek 'Szumak' Kotlarski --<szumak@virthost.pl>
+  Created: 17.10.2026, 08:36:52
+
+  Purpose: Local HTTP conversion service with a warm worker pool.
+
+  Endpoints:
+  - POST /convert - body is motostat export, plain or compressed, response
+    is a zip with both spritmonitor files, or a single csv file selected
+    with '?file=costs' or '?file=fuels'; '?miles=1' converts distances,
+  - GET /metrics - service metrics in Prometheus text format,
+  - GET /health - 'ok' when the service is running.
+"""
+
+import os, time, zipfile
+
+from concurrent.futures import Executor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import BoundedSemaphore, Lock
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from jsktoolbox.attribtool import ReadOnlyClass
+from jsktoolbox.logstool.logs import LoggerClient
+
+from libs.api import convert_records
+from libs.base import BDebug, BLogs, BMiles
+from libs.conversion import COSTS_FILE, FUELS_FILE
+from libs.formatter import COST_CSV_HEADER, FUELING_CSV_HEADER
+from libs.parallel import process_pool
+from libs.stats import METRIC_PREFIX
+
+# default address of service
+DEFAULT_HOST: str = "127.0.0.1"
+
+# maximum size of uploaded export in bytes
+MAX_UPLOAD: int = 256 * 1024 * 1024
+
+# size of a single write of response body
+WRITE_SIZE: int = 64 * 1024
+
+# selectable response files
+FILES: Dict[str, str] = {"costs": COSTS_FILE, "fuels": FUELS_FILE}
+
+
+class _Keys(object, metaclass=ReadOnlyClass):
+    """Internal Keys container class."""
+
+    COUNTERS: str = "__counters__"
+    EXECUTOR: str = "__executor__"
+    IN_FLIGHT: str = "__in_flight__"
+    LOCK: str = "__lock__"
+    MAX_REQUESTS: str = "__max_requests__"
+    MAX_UPLOAD: str = "__max_upload__"
+    OWN_EXECUTOR: str = "__own_executor__"
+    SEMAPHORE: str = "__semaphore__"
+
+
+def parse_address(value: str) -> Tuple[str, int]:
+    """Returns host and port from '[HOST:]PORT' string.
+
+    Raises ValueError for invalid port.
+    """
+    host, _, port = value.rpartition(":")
+    number: int = int(port)
+    if not 0 <= number <= 65535:
+        raise ValueError(f"Invalid port: '{port}'")
+    return host or DEFAULT_HOST, number
+
+
+def convert_upload(
+    data: bytes, miles: bool
+) -> Tuple[List[str], List[str], List[str], int]:
+    """Converts uploaded export in worker process.
+
+    Returns cost lines, fuel lines, messages about skipped rows and number
+    of records.
+    """
+    errors: List[str] = []
+    conversion = convert_records(data, miles, errors)
+    costs, fuels = conversion.convert()
+    return costs, fuels, errors, conversion.records
+
+
+def _warm() -> int:
+    """Starts worker process, returns its pid."""
+    return os.getpid()
+
+
+class ConversionService(BLogs, BMiles, BDebug):
+    """Conversions on a pool of workers with concurrency limit and metrics.
+
+    Worker processes are started with the service, so a conversion pays
+    only for the conversion itself. Conversions over the limit are
+    rejected instead of waiting.
+    """
+
+    def __init__(
+        self,
+        jobs: int = 1,
+        max_requests: int = 0,
+        miles: bool = False,
+        max_upload: int = MAX_UPLOAD,
+        executor: Optional[Executor] = None,
+        logger_client: Optional[LoggerClient] = None,
+        debug: bool = False,
+    ) -> None:
+        """Constructor.
+
+        ### Arguments:
+        - jobs [int] - number of worker processes.
+        - max_requests [int] - maximum number of conversions at once, 2 * jobs if 0.
+        - miles [bool] - default of 'miles' query parameter.
+        - max_upload [int] - maximum size of uploaded export in bytes.
+        - executor [Optional[Executor]] - executor of conversions, process
+          pool of 'jobs' workers if None.
+        - logger_client [Optional[LoggerClient]] - client for request logs.
+        - debug [bool] - log every request.
+        """
+        if logger_client is not None:
+            self.logs = logger_client
+        self.miles = miles
+        self.debug = debug
+        self._set_data(key=_Keys.OWN_EXECUTOR, value=executor is None)
+        if executor is None:
+            executor = process_pool(jobs)
+            # workers are started before the first request
+            for future in [executor.submit(_warm) for _ in range(jobs)]:
+                future.result()
+        limit: int = max_requests or 2 * jobs
+        self._set_data(key=_Keys.EXECUTOR, value=executor)
+        self._set_data(key=_Keys.MAX_REQUESTS, value=limit, set_default_type=int)
+        self._set_data(key=_Keys.MAX_UPLOAD, value=max_upload, set_default_type=int)
+        self._set_data(key=_Keys.SEMAPHORE, value=BoundedSemaphore(limit))
+        self._set_data(key=_Keys.LOCK, value=Lock())
+        self._set_data(key=_Keys.IN_FLIGHT, value=0, set_default_type=int)
+        self._set_data(
+            key=_Keys.COUNTERS,
+            value={
+                "conversions": 0,
+                "rejected": 0,
+                "failed": 0,
+                "records": 0,
+                "skipped": 0,
+                "bytes_in": 0,
+                "seconds": 0.0,
+            },
+            set_default_type=Dict,
+        )
+
+    @property
+    def max_upload(self) -> int:
+        """Returns maximum size of uploaded export in bytes."""
+        return self._get_data(key=_Keys.MAX_UPLOAD)  # type: ignore
+
+    def close(self) -> None:
+        """Stops worker pool created by service."""
+        if self._data[_Keys.OWN_EXECUTOR]:
+            self._data[_Keys.EXECUTOR].shutdown()
+
+    def acquire(self) -> bool:
+        """Takes a conversion slot, returns False over the concurrency limit."""
+        if not self._data[_Keys.SEMAPHORE].acquire(blocking=False):
+            self.__count("rejected")
+            return False
+        with self._data[_Keys.LOCK]:
+            self._data[_Keys.IN_FLIGHT] += 1
+        return True
+
+    def release(self) -> None:
+        """Returns conversion slot taken with acquire()."""
+        with self._data[_Keys.LOCK]:
+            self._data[_Keys.IN_FLIGHT] -= 1
+        self._data[_Keys.SEMAPHORE].release()
+
+    def convert(
+        self, data: bytes, miles: bool
+    ) -> Tuple[List[str], List[str], List[str], int]:
+        """Converts export on workers, the caller holds a slot from acquire()."""
+        start: float = time.perf_counter()
+        try:
+            out = (
+                self._data[_Keys.EXECUTOR].submit(convert_upload, data, miles).result()
+            )
+        except Exception:
+            self.__count("failed")
+            raise
+        with self._data[_Keys.LOCK]:
+            counters = self._data[_Keys.COUNTERS]
+            counters["conversions"] += 1
+            counters["records"] += out[3]
+            counters["skipped"] += len(out[2])
+            counters["bytes_in"] += len(data)
+            counters["seconds"] += time.perf_counter() - start
+        return out
+
+    def metrics(self) -> str:
+        """Returns service metrics in Prometheus text exposition format."""
+        with self._data[_Keys.LOCK]:
+            counters = dict(self._data[_Keys.COUNTERS])
+            in_flight: int = self._data[_Keys.IN_FLIGHT]
+        lines: List[str] = []
+        for name, kind, doc, value in (
+            ("conversions", "counter", "Finished conversions.", None),
+            ("rejected", "counter", "Requests over concurrency limit.", None),
+            ("failed", "counter", "Failed conversions.", None),
+            ("records", "counter", "Converted motostat records.", None),
+            ("skipped", "counter", "Rows skipped because of invalid data.", None),
+            ("bytes_in", "counter", "Size of uploaded exports in bytes.", None),
+            ("seconds", "counter", "Time of conversions in seconds.", None),
+            ("in_flight", "gauge", "Conversions in progress.", in_flight),
+            (
+                "max_requests",
+                "gauge",
+                "Maximum number of conversions at once.",
+                self._data[_Keys.MAX_REQUESTS],
+            ),
+        ):
+            metric: str = f"{METRIC_PREFIX}_server_{name}"
+            if kind == "counter":
+                metric += "_total"
+                value = round(counters[name], 6)
+            lines.append(f"# HELP {metric} {doc}")
+            lines.append(f"# TYPE {metric} {kind}")
+            lines.append(f"{metric} {value}")
+        return "\n".join(lines) + "\n"
+
+    def __count(self, name: str) -> None:
+        """Increments counter."""
+        with self._data[_Keys.LOCK]:
+            self._data[_Keys.COUNTERS][name] += 1
+
+
+class ConversionServer(ThreadingHTTPServer):
+    """HTTP server of conversion service, requests are handled in threads."""
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], service: ConversionService) -> None:
+        """Constructor.
+
+        ### Arguments:
+        - address [Tuple[str, int]] - host and port, port 0 for any free port.
+        - service [ConversionService] - service converting uploaded exports.
+        """
+        # server_close() is called by failed bind in constructor
+        self.service: ConversionService = service
+        ThreadingHTTPServer.__init__(self, address, _Handler)
+
+    def server_close(self) -> None:
+        """Closes socket and stops conversion service."""
+        ThreadingHTTPServer.server_close(self)
+        self.service.close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Handler of conversion service requests.
+
+    HTTP/1.0 responses end with closed connection, so zip files are
+    streamed without knowing their size.
+    """
+
+    server: ConversionServer
+
+    def do_GET(self) -> None:
+        """Returns metrics or health status."""
+        path: str = urlsplit(self.path).path
+        if path == "/metrics":
+            self.__send_text(
+                200, self.server.service.metrics(), "text/plain; version=0.0.4"
+            )
+        elif path == "/health":
+            self.__send_text(200, "ok\n")
+        else:
+            self.__send_text(404, "Not found.\n")
+
+    def do_POST(self) -> None:
+        """Converts uploaded export."""
+        url = urlsplit(self.path)
+        if url.path != "/convert":
+            self.__send_text(404, "Not found.\n")
+            return
+        query: Dict[str, List[str]] = parse_qs(url.query)
+        selected: str = query.get("file", ["zip"])[0]
+        if selected != "zip" and selected not in FILES:
+            self.__send_text(400, f"Unknown file: '{selected}'.\n")
+            return
+        miles: bool = self.server.service.miles
+        if "miles" in query:
+            miles = query["miles"][0] not in ("", "0", "false")
+        length: str = self.headers.get("Content-Length", "")
+        if not length.isdigit():
+            self.__send_text(411, "Content-Length required.\n")
+            return
+        if int(length) > self.server.service.max_upload:
+            self.__send_text(413, "Export too large.\n")
+            return
+        # the slot is taken before the body is read, so rejected uploads
+        # are not held in memory
+        if not self.server.service.acquire():
+            self.__discard(int(length))
+            self.send_response(503)
+            self.send_header("Retry-After", "1")
+            self.send_header("Content-Type", "text/plain; charset=utf-8")
+            self.end_headers()
+            self.wfile.write(b"Too many conversions, try again later.\n")
+            return
+        try:
+            out = self.server.service.convert(self.rfile.read(int(length)), miles)
+        except Exception as ex:
+            self.__send_text(500, f"Conversion failed: {ex}\n")
+            return
+        finally:
+            self.server.service.release()
+        costs, fuels, errors, _ = out
+        self.send_response(200)
+        self.send_header("X-Skipped-Rows", f"{len(errors)}")
+        if selected == "zip":
+            self.send_header("Content-Type", "application/zip")
+            self.send_header(
+                "Content-Disposition", 'attachment; filename="spritmonitor.zip"'
+            )
+            self.end_headers()
+            with zipfile.ZipFile(self.wfile, "w", zipfile.ZIP_DEFLATED) as archive:
+                for name, header, lines in (
+                    (COSTS_FILE, COST_CSV_HEADER, costs),
+                    (FUELS_FILE, FUELING_CSV_HEADER, fuels),
+                ):
+                    with archive.open(name, "w") as file:
+                        self.__write_csv(file, header, lines)
+            return
+        self.send_header("Content-Type", "text/csv; charset=utf-8")
+        self.send_header(
+            "Content-Disposition", f'attachment; filename="{FILES[selected]}"'
+        )
+        self.end_headers()
+        if selected == "costs":
+            self.__write_csv(self.wfile, COST_CSV_HEADER, costs)
+        else:
+            self.__write_csv(self.wfile, FUELING_CSV_HEADER, fuels)
+
+    def log_message(self, format: str, *args) -> None:
+        """Sends request log to logger client in debug mode instead of STDERR."""
+        if self.server.service.debug:
+            self.server.service.logs.message_debug = (
+                f"{self.address_string()} {format % args}"
+            )
+
+    def __discard(self, length: int) -> None:
+        """Reads and drops request body in parts of WRITE_SIZE bytes."""
+        while length > 0:
+            part: bytes = self.rfile.read(min(length, WRITE_SIZE))
+            if not part:
+                break
+            length -= len(part)
+
+    def __write_csv(self, stream, header: str, lines: List[str]) -> None:
+        """Writes csv file in parts of WRITE_SIZE bytes."""
+        part: List[str] = [header]
+        size: int = len(header)
+        for line in lines:
+            part.append(line)
+            size += len(line) + 1
+            if size >= WRITE_SIZE:
+                stream.write(("\n".join(part) + "\n").encode())
+                part = []
+                size = 0
+        if part:
+            stream.write(("\n".join(part) + "\n").encode())
+
+    def __send_text(
+        self, code: int, text: str, content_type: str = "text/plain"
+    ) -> None:
+        """Sends short text response."""
+        body: bytes = text.encode()
+        self.send_response(code)
+        self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+        self.send_header("Content-Length", f"{len(body)}")
+        self.end_headers()
+        self.wfile.write(body)
+
+
+# #[EOF]#######################################################################
@@ -0,0 +1,277 @@
+# -*- coding: utf-8 -*-
+"""
+  stats.py
+  Author : Jacek 'Szumak' Kotlarski --<szumak@virthost.pl>
+  Created: 17.10.2026, 03:20:47
+
+  Purpose: Run statistics with JSON and Prometheus textfile export.
+"""
+
+import json, os, sys, tempfile, time
+
+from contextlib import contextmanager
+from threading import Lock
+from typing import Any, Dict, Iterator, List, Optional
+
+from jsktoolbox.attribtool import ReadOnlyClass
+from jsktoolbox.basetool.data import BData
+
+from libs.profiling import StageProfiler
+from libs.writer import file_mode
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# stages of conversion in pipeline order
+STAGES: List[str] = ["read", "parse", "sort", "convert", "write"]
+
+# counters of conversion in report order
+COUNTERS: List[str] = [
+    "lines_read",
+    "records_parsed",
+    "records_skipped",
+    "costs_emitted",
+    "fuels_emitted",
+    "bytes_in",
+    "bytes_out",
+    "cache_hits",
+]
+
+# prefix of Prometheus metric names
+METRIC_PREFIX: str = "motostat"
+
+
+class _Keys(object, metaclass=ReadOnlyClass):
+    """Internal Keys container class."""
+
+    COUNTERS: str = "__counters__"
+    EXTRA: str = "__extra__"
+    LOCK: str = "__lock__"
+    PROFILER: str = "__profiler__"
+    STAGES: str = "__stages__"
+    START: str = "__start__"
+    TIMESTAMP: str = "__timestamp__"
+
+
+def peak_rss() -> int:
+    """Returns peak resident set size of process in bytes, 0 if not known."""
+    if resource is None:
+        return 0
+    rss: int = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def cpu_time() -> float:
+    """Returns CPU time of process and finished child processes in seconds."""
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+
+def _write_atomic(path: str, text: str) -> None:
+    """Writes text file atomically, collectors never read a partial file."""
+    fd, tmp = tempfile.mkstemp(
+        prefix=f".{os.path.basename(path)}.", dir=os.path.dirname(path) or "."
+    )
+    try:
+        with os.fdopen(fd, "w") as file:
+            file.write(text)
+        os.chmod(tmp, file_mode(os.path.dirname(tmp) or "."))
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+class RunStats(BData):
+    """Statistics of a single conversion run.
+
+    Counters and stage timers are updated from reader and processor
+    threads. Wall time of a stage is measured with performance counter,
+    CPU time with the clock of the thread running the stage, so CPU time
+    of worker processes is only included in the total CPU time.
+    """
+
+    def __init__(self, profiler: Optional[StageProfiler] = None) -> None:
+        """Constructor.
+
+        ### Arguments:
+        - profiler [Optional[StageProfiler]] - profiler of stages, None to disable.
+        """
+        self._set_data(key=_Keys.LOCK, value=Lock())
+        self._set_data(key=_Keys.PROFILER, value=profiler)
+        self._set_data(
+            key=_Keys.START, value=time.perf_counter(), set_default_type=float
+        )
+        self._set_data(key=_Keys.TIMESTAMP, value=time.time(), set_default_type=float)
+        self._set_data(
+            key=_Keys.COUNTERS,
+            value={name: 0 for name in COUNTERS},
+            set_default_type=Dict,
+        )
+        self._set_data(
+            key=_Keys.STAGES,
+            value={name: [0.0, 0.0] for name in STAGES},
+            set_default_type=Dict,
+        )
+        self._set_data(key=_Keys.EXTRA, value={}, set_default_type=Dict)
+
+    def add(self, name: str, value: int = 1) -> None:
+        """Adds value to counter."""
+        with self._data[_Keys.LOCK]:
+            self._data[_Keys.COUNTERS][name] += value
+
+    def set(self, name: str, value: Any) -> None:
+        """Sets additional section of report, for example queue statistics."""
+        with self._data[_Keys.LOCK]:
+            self._data[_Keys.EXTRA][name] = value
+
+    @property
+    def profiler(self) -> Optional[StageProfiler]:
+        """Returns profiler of stages, None if profiling is disabled."""
+        return self._data[_Keys.PROFILER]
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Measures wall and CPU time of code block as a part of stage."""
+        profiler: Optional[StageProfiler] = self._data[_Keys.PROFILER]
+        profile = profiler.enter(name) if profiler is not None else None
+        wall: float = time.perf_counter()
+        cpu: float = time.thread_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall
+            cpu = time.thread_time() - cpu
+            if profiler is not None:
+                profiler.exit(name, profile)
+            with self._data[_Keys.LOCK]:
+                item: List[float] = self._data[_Keys.STAGES][name]
+                item[0] += wall
+                item[1] += cpu
+
+    @contextmanager
+    def profiled(self, name: str) -> Iterator[None]:
+        """Profiles code block running in helper thread of stage, not timed."""
+        profiler: Optional[StageProfiler] = self._data[_Keys.PROFILER]
+        if profiler is None:
+            yield
+            return
+        profile = profiler.enter(name)
+        try:
+            yield
+        finally:
+            profiler.exit(name, profile)
+
+    def checkpoint(self, name: str) -> None:
+        """Marks the end of stage for memory profiling."""
+        profiler: Optional[StageProfiler] = self._data[_Keys.PROFILER]
+        if profiler is not None:
+            profiler.snapshot(name)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Returns report of statistics."""
+        wall: float = time.perf_counter() - self._data[_Keys.START]
+        with self._data[_Keys.LOCK]:
+            counters: Dict[str, int] = dict(self._data[_Keys.COUNTERS])
+            stages: Dict[str, Dict[str, float]] = {
+                name: {"wall": round(item[0], 6), "cpu": round(item[1], 6)}
+                for name, item in self._data[_Keys.STAGES].items()
+            }
+            extra: Dict[str, Any] = dict(self._data[_Keys.EXTRA])
+        out: Dict[str, Any] = {
+            "timestamp": round(self._data[_Keys.TIMESTAMP], 3),
+            "counters": counters,
+            "stages": stages,
+            "wall_time": round(wall, 6),
+            "cpu_time": round(cpu_time(), 6),
+            "records_per_second": (
+                round(counters["records_parsed"] / wall, 1) if wall > 0 else 0.0
+            ),
+            "peak_rss": peak_rss(),
+        }
+        out.update(extra)
+        return out
+
+    def write_json(self, path: str, report: Optional[Dict[str, Any]] = None) -> None:
+        """Writes report as JSON file."""
+        _write_atomic(path, json.dumps(report or self.to_dict(), indent=2) + "\n")
+
+    def write_prometheus(
+        self, path: str, report: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """Writes report as Prometheus textfile collector file."""
+        _write_atomic(path, prometheus_text(report or self.to_dict()))
+
+
+def prometheus_text(report: Dict[str, Any]) -> str:
+    """Returns report in Prometheus text exposition format."""
+    lines: List[str] = []
+
+    def metric(name: str, kind: str, doc: str, values: Dict[str, Any]) -> None:
+        name = f"{METRIC_PREFIX}_{name}"
+        lines.append(f"# HELP {name} {doc}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in values.items():
+            lines.append(f"{name}{labels} {value}")
+
+    counters: Dict[str, int] = report["counters"]
+    for key, doc in (
+        ("lines_read", "Number of input lines"),
+        ("records_parsed", "Number of parsed motostat records"),
+        ("records_skipped", "Number of rows skipped because of invalid data"),
+        ("bytes_in", "Size of input in bytes"),
+        ("bytes_out", "Size of output in bytes"),
+        ("cache_hits", "Number of results restored from cache"),
+    ):
+        metric(key, "gauge", f"{doc} in the last run.", {"": counters[key]})
+    metric(
+        "records_emitted",
+        "gauge",
+        "Number of written records in the last run.",
+        {
+            '{type="cost"}': counters["costs_emitted"],
+            '{type="fuel"}': counters["fuels_emitted"],
+        },
+    )
+    for key in ("wall", "cpu"):
+        metric(
+            f"stage_{key}_seconds",
+            "gauge",
+            f"{key.capitalize()} time of conversion stage in the last run.",
+            {
+                f'{{stage="{name}"}}': item[key]
+                for name, item in report["stages"].items()
+            },
+        )
+    metric(
+        "wall_seconds", "gauge", "Wall time of the last run.", {"": report["wall_time"]}
+    )
+    metric(
+        "cpu_seconds", "gauge", "CPU time of the last run.", {"": report["cpu_time"]}
+    )
+    metric(
+        "records_per_second",
+        "gauge",
+        "Parsed records per second of wall time in the last run.",
+        {"": report["records_per_second"]},
+    )
+    metric(
+        "peak_rss_bytes",
+        "gauge",
+        "Peak resident set size of the last run.",
+        {"": report["peak_rss"]},
+    )
+    metric(
+        "last_run_timestamp_seconds",
+        "gauge",
+        "Start time of the last run.",
+        {"": report["timestamp"]},
+    )
+    return "\n".join(lines) + "\n"
+
+
+# #[EOF]#######################################################################
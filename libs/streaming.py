@@ -0,0 +1,326 @@
+# -*- coding: utf-8 -*-
+"""
+  streaming.py
+  Author : Jacek 'Szumak' Kotlarski --<szumak@virthost.pl>
+  Created: 16.10.2026, 17:25:40
+
+  Purpose: Bounded memory conversion with external merge sort.
+"""
+
+import heapq, os, re, tempfile
+
+from operator import itemgetter
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from jsktoolbox.attribtool import ReadOnlyClass
+
+from libs.base import BMiles
+from libs.conversion import COSTS_FILE, FUELS_FILE, parse_batch
+from libs.formatter import (
+    COST_CSV_HEADER,
+    FUELING_CSV_HEADER,
+    format_cost,
+    format_fuel,
+)
+from libs.model import MotoStatRecord
+from libs.writer import AtomicCsvWriter, commit_all
+
+# default memory budget for sorted runs in bytes
+MEMORY_LIMIT: int = 64 * 1024 * 1024
+
+# maximum number of run files opened at once while merging
+FAN_IN: int = 64
+
+# estimated memory used by run item besides the line
+ITEM_OVERHEAD: int = 120
+
+# kinds of output lines
+COST: str = "c"
+FUEL: str = "f"
+
+# escaped characters in spilled runs
+_ESCAPED = re.compile(r"\\(.)")
+_UNESCAPE = {"\\": "\\", "n": "\n"}
+
+# type of run item: sort key, kind, csv line
+TItem = Tuple[int, str, str]
+
+
+class _Keys(object, metaclass=ReadOnlyClass):
+    """Internal Keys container class."""
+
+    COUNT: str = "__count__"
+    ERRORS: str = "__errors__"
+    FAN_IN: str = "__fan_in__"
+    LIMIT: str = "__limit__"
+    RECORDS: str = "__records__"
+    RUN: str = "__run__"
+    RUN_SIZE: str = "__run_size__"
+    RUNS: str = "__runs__"
+    SKIPPED: str = "__skipped__"
+    TMP_DIR: str = "__tmp_dir__"
+
+
+def _escape(line: str) -> str:
+    """Returns line without new line characters."""
+    return line.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _unescape(line: str) -> str:
+    """Reverts _escape."""
+    if "\\" not in line:
+        return line
+    return _ESCAPED.sub(lambda match: _UNESCAPE[match.group(1)], line)
+
+
+def _read_run(file: IO[str]) -> Iterator[TItem]:
+    """Yields items from spilled run file."""
+    for row in file:
+        key, kind, line = row[:-1].split("\t", 2)
+        yield int(key), kind, _unescape(line)
+
+
+def _write_run(file: IO[str], run: Iterable[TItem]) -> None:
+    """Writes items to run file."""
+    file.writelines(f"{key}\t{kind}\t{_escape(line)}\n" for key, kind, line in run)
+
+
+class StreamingConversion(BMiles):
+    """Conversion of motostat lines with bounded memory.
+
+    Formatted lines are collected in runs limited by memory budget. Full
+    runs are sorted and spilled to temporary files, at the end all runs
+    are merged straight into the costs and fuels files. If there are more
+    runs than fan_in, groups of runs are first merged into bigger runs,
+    so the number of open files stays bounded.
+    """
+
+    def __init__(
+        self,
+        miles: bool = False,
+        memory_limit: int = MEMORY_LIMIT,
+        tmp_dir: Optional[str] = None,
+        fan_in: int = FAN_IN,
+    ) -> None:
+        """Constructor.
+
+        ### Arguments:
+        - miles [bool] - mileage in miles flag.
+        - memory_limit [int] - memory budget for a sorted run in bytes.
+        - tmp_dir [Optional[str]] - directory for spilled runs.
+        - fan_in [int] - maximum number of runs merged at once, at least 2.
+        """
+        if fan_in < 2:
+            raise ValueError(f"fan_in must be at least 2, got: {fan_in}")
+        self.miles = miles
+        self._set_data(key=_Keys.LIMIT, value=memory_limit, set_default_type=int)
+        self._set_data(key=_Keys.FAN_IN, value=fan_in, set_default_type=int)
+        self._set_data(key=_Keys.TMP_DIR, value=tmp_dir)
+        self._set_data(key=_Keys.COUNT, value=0, set_default_type=int)
+        self._set_data(key=_Keys.RECORDS, value=0, set_default_type=int)
+        self._set_data(key=_Keys.SKIPPED, value=0, set_default_type=int)
+        self._set_data(key=_Keys.ERRORS, value=[], set_default_type=List)
+        self._set_data(key=_Keys.RUN, value=[], set_default_type=List)
+        self._set_data(key=_Keys.RUN_SIZE, value=0, set_default_type=int)
+        self._set_data(key=_Keys.RUNS, value=[], set_default_type=List)
+
+    @property
+    def count(self) -> int:
+        """Returns number of received lines."""
+        return self._get_data(key=_Keys.COUNT)  # type: ignore
+
+    @property
+    def records(self) -> int:
+        """Returns number of found motostat records."""
+        return self._get_data(key=_Keys.RECORDS)  # type: ignore
+
+    @property
+    def runs(self) -> int:
+        """Returns number of runs spilled to temporary files."""
+        return len(self._get_data(key=_Keys.RUNS))  # type: ignore
+
+    @property
+    def skipped(self) -> int:
+        """Returns number of rows skipped because of invalid data."""
+        return self._data[_Keys.SKIPPED] + len(self._data[_Keys.ERRORS])
+
+    def pop_errors(self) -> List[str]:
+        """Returns and clears list of messages about skipped rows."""
+        out: List[str] = self._data[_Keys.ERRORS]
+        self._data[_Keys.ERRORS] = []
+        self._data[_Keys.SKIPPED] += len(out)
+        return out
+
+    def add_batch(self, lines: List[str]) -> None:
+        """Parses and formats batch of lines, spills full run."""
+        self.add_records(*parse_batch(lines, self.miles, self.count), len(lines))
+
+    def add_records(
+        self, records: List[MotoStatRecord], errors: List[str], lines: int
+    ) -> None:
+        """Formats records parsed from batch of lines, spills full run.
+
+        ### Arguments:
+        - records [List[MotoStatRecord]] - parsed records.
+        - errors [List[str]] - messages about skipped rows.
+        - lines [int] - number of lines in batch.
+        """
+        run: List[TItem] = self._data[_Keys.RUN]
+        size: int = self._data[_Keys.RUN_SIZE]
+        for record in records:
+            if record.cost_id:
+                out: str = format_cost(record)
+                run.append((record.key, COST, out))
+                size += len(out) + ITEM_OVERHEAD
+            if record.fuel_id:
+                out = format_fuel(record)
+                run.append((record.key, FUEL, out))
+                size += len(out) + ITEM_OVERHEAD
+        self._data[_Keys.ERRORS].extend(errors)
+        self._data[_Keys.COUNT] += lines
+        self._data[_Keys.RECORDS] += len(records)
+        self._data[_Keys.RUN_SIZE] = size
+        if size >= self._data[_Keys.LIMIT]:
+            self.__spill()
+
+    def __sorted_run(self) -> List[TItem]:
+        """Returns current run sorted by descending key, clears the run."""
+        run: List[TItem] = self._data[_Keys.RUN]
+        # stable sort, equal keys keep input order like in Conversion
+        run.sort(key=itemgetter(0), reverse=True)
+        self._data[_Keys.RUN] = []
+        self._data[_Keys.RUN_SIZE] = 0
+        return run
+
+    def __new_run(self) -> Tuple[int, str]:
+        """Returns descriptor and path of new temporary run file."""
+        return tempfile.mkstemp(
+            prefix="motostat_run_", suffix=".txt", dir=self._data[_Keys.TMP_DIR]
+        )
+
+    def __spill(self) -> None:
+        """Writes sorted run to temporary file."""
+        run: List[TItem] = self.__sorted_run()
+        if not run:
+            return
+        fd, path = self.__new_run()
+        self._data[_Keys.RUNS].append(path)
+        with os.fdopen(fd, "w", encoding="utf-8", newline="\n") as file:
+            _write_run(file, run)
+
+    def __merge(self, paths: List[str], last: List[TItem]) -> Iterator[TItem]:
+        """Yields items of runs merged in output order.
+
+        ### Arguments:
+        - paths [List[str]] - spilled runs in input order.
+        - last [List[TItem]] - sorted run kept in memory, after spilled runs.
+        """
+        files: List[IO[str]] = []
+        try:
+            for path in paths:
+                files.append(open(path, "r", encoding="utf-8", newline="\n"))
+            # runs are merged in input order, so the merge is stable
+            iterables: List[Iterator[TItem]] = [_read_run(file) for file in files]
+            iterables.append(iter(last))
+            yield from heapq.merge(*iterables, key=itemgetter(0), reverse=True)
+        finally:
+            for file in files:
+                file.close()
+
+    def __reduce(self, paths: List[str]) -> List[str]:
+        """Merges groups of runs until the final merge fits in fan in.
+
+        Returns runs for the final merge, merged groups are replaced in
+        place by their output run, so the input order of runs is kept.
+        Created runs are added to paths, so they can be removed later.
+        """
+        # one file handle is left for the run kept in memory
+        fan_in: int = self._data[_Keys.FAN_IN] - 1
+        runs: List[str] = list(paths)
+        while len(runs) > fan_in:
+            merged: List[str] = []
+            for i in range(0, len(runs), fan_in):
+                group: List[str] = runs[i : i + fan_in]
+                if len(group) == 1:
+                    merged.extend(group)
+                    continue
+                fd, path = self.__new_run()
+                paths.append(path)
+                with os.fdopen(fd, "w", encoding="utf-8", newline="\n") as file:
+                    _write_run(file, self.__merge(group, []))
+                for name in group:
+                    os.remove(name)
+                merged.append(path)
+            runs = merged
+        return runs
+
+    def lines(self) -> Iterator[Tuple[str, str]]:
+        """Yields kind and csv line of all records in output order.
+
+        Spilled runs are removed when merging is finished.
+        """
+        last: List[TItem] = self.__sorted_run()
+        paths: List[str] = self._data[_Keys.RUNS]
+        self._data[_Keys.RUNS] = []
+        try:
+            runs: List[str] = self.__reduce(paths)
+            for _, kind, line in self.__merge(runs, last):
+                yield kind, line
+        finally:
+            for path in paths:
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def convert(self) -> Tuple[List[str], List[str]]:
+        """Returns lists of sorted cost and fuel csv lines."""
+        costs: List[str] = []
+        fuels: List[str] = []
+        for kind, line in self.lines():
+            if kind == COST:
+                costs.append(line)
+            else:
+                fuels.append(line)
+        return costs, fuels
+
+    def write(
+        self,
+        output_dir: str,
+        costs_file: str = COSTS_FILE,
+        fuels_file: str = FUELS_FILE,
+        append: bool = False,
+        fsync: bool = False,
+    ) -> Tuple[int, int]:
+        """Merges runs into csv files, returns number of cost and fuel records.
+
+        ### Arguments:
+        - output_dir [str] - output directory.
+        - costs_file [str] - name of costs csv file.
+        - fuels_file [str] - name of fuels csv file.
+        - append [bool] - append records to existing files.
+        - fsync [bool] - flush files to disk before they replace old ones.
+        """
+        paths = {
+            COST: os.path.join(output_dir, costs_file),
+            FUEL: os.path.join(output_dir, fuels_file),
+        }
+        headers = {COST: COST_CSV_HEADER, FUEL: FUELING_CSV_HEADER}
+        files: Dict[str, AtomicCsvWriter] = {}
+        try:
+            for kind, line in self.lines():
+                writer: Optional[AtomicCsvWriter] = files.get(kind)
+                if writer is None:
+                    # files are created only if there is something to write
+                    writer = AtomicCsvWriter(paths[kind], headers[kind], append, fsync)
+                    files[kind] = writer
+                writer.write(line)
+        except BaseException:
+            for writer in files.values():
+                writer.abort()
+            raise
+        commit_all(list(files.values()))
+        costs: int = files[COST].count if COST in files else 0
+        fuels: int = files[FUEL].count if FUEL in files else 0
+        return costs, fuels
+
+
+# #[EOF]#######################################################################
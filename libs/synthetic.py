@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+  synthetic.py
+  Author : Jacek 'Szumak' Kotlarski --<szumak@virthost.pl>
+  Created: 17.10.2026, 05:48:03
+
+  Purpose: Deterministic generator of synthetic motostat exports.
+
+  Generated exports have all 23 columns, fuel names known to FUEL_CODES,
+  every cost type from COST_TYPES and quoted notes with semicolons.
+  Rows are newest first, as in exports from motostat.
+"""
+
+import random, sys
+
+from datetime import date, timedelta
+from typing import Iterator, List
+
+from libs.formatter import (
+    COST_TYPES,
+    DRIVING_STYLES,
+    FUEL_CODES,
+    FUELING_TYPES,
+    TIRES,
+)
+from libs.model import MOTOSTAT_HEADER
+
+# default seed of random values
+SEED: int = 82522
+
+# date of the oldest record
+START_DATE: date = date(2000, 1, 1)
+
+# records are spread over this number of days after START_DATE
+SPAN_DAYS: int = 9000
+
+# every COST_EVERY row is a cost record
+COST_EVERY: int = 3
+
+# values of text columns
+CURRENCIES: List[str] = ["PLN", "PLN", "PLN", "EUR"]
+STATIONS: List[str] = ["Orlen", "BP", "Shell", "Circle K", "Moya", "Amic"]
+NOTES: List[str] = ["", "trip; Krakow", "service; oil; filters", "wash", "x;y"]
+
+
+def generate(rows: int, seed: int = SEED) -> Iterator[str]:
+    """Returns iterator of export lines without line ends, header first.
+
+    ### Arguments:
+    - rows [int] - number of records.
+    - seed [int] - seed of random values, the same seed gives the same export.
+    """
+    rng = random.Random(seed)
+    fuels: List[str] = sorted(FUEL_CODES)
+    costs: List[str] = sorted(COST_TYPES)
+    fueling_types: List[str] = sorted(FUELING_TYPES)
+    tires: List[str] = sorted(TIRES)
+    styles: List[str] = sorted(DRIVING_STYLES)
+    yield ";".join(MOTOSTAT_HEADER)
+    for num in range(rows, 0, -1):
+        # ids grow with dates
+        day: str = (START_DATE + timedelta(days=num * SPAN_DAYS // rows)).isoformat()
+        odometer: int = 10000 + num * 37
+        note: str = rng.choice(NOTES)
+        currency: str = rng.choice(CURRENCIES)
+        if num % COST_EVERY == 0:
+            line: str = (
+                f"{num};;{costs[num // COST_EVERY % len(costs)]};{day};;;{odometer};;;"
+                f'{rng.uniform(10, 2000):.2f};"{note}";;;;;;;;;;{currency}'
+            )
+            # exports have two columns less in some cost rows
+            yield line if num % 2 else line + ";;"
+            continue
+        trip: float = 0.0 if num % 97 == 0 else rng.uniform(200, 900)
+        quantity: float = rng.uniform(20, 60)
+        yield ";".join(
+            (
+                "",
+                f"{num}",
+                "",
+                day,
+                f"{rng.randint(1, 30)}",
+                f"{rng.randint(1, 500)}",
+                f"{odometer}",
+                f"{trip:.1f}",
+                f"{quantity:.2f}",
+                f"{quantity * rng.uniform(5, 7):.2f}",
+                f'"{note}"',
+                rng.choice(fueling_types),
+                rng.choice(tires),
+                rng.choice(styles),
+                f"{rng.randint(0, 1)}",
+                f"{rng.randint(0, 1)}",
+                f"{rng.randint(0, 1)}",
+                f"{rng.uniform(4, 9):.1f}" if num % 2 else "",
+                f"{rng.randint(30, 110)}" if num % 2 else "",
+                f"{rng.randint(0, 1)}",
+                currency,
+                f'"{fuels[num % len(fuels)]}"',
+                f'"{rng.choice(STATIONS)}"',
+            )
+        )
+
+
+def export_bytes(rows: int, seed: int = SEED) -> bytes:
+    """Returns synthetic export as bytes."""
+    return ("\n".join(generate(rows, seed)) + "\n").encode()
+
+
+def write_export(path: str, rows: int, seed: int = SEED) -> None:
+    """Writes synthetic export to file, '-' for STDOUT."""
+    if path == "-":
+        for line in generate(rows, seed):
+            sys.stdout.write(line + "\n")
+        return
+    with open(path, "w", encoding="utf-8", buffering=1024 * 1024) as file:
+        for line in generate(rows, seed):
+            file.write(line + "\n")
+
+
+if __name__ == "__main__":
+    # python -m libs.synthetic ROWS [PATH] [SEED]
+    write_export(
+        sys.argv[2] if len(sys.argv) > 2 else "-",
+        int(sys.argv[1]),
+        int(sys.argv[3]) if len(sys.argv) > 3 else SEED,
+    )
+
+# #[EOF]#######################################################################
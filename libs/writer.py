@@ -0,0 +1,288 @@
+# -*- coding: utf-8 -*-
+"""
+  writer.py
+  Author : Jacek 'Szumak' Kotlarski --<szumak@virthost.pl>
+  Created: 17.10.2026, 00:21:13
+
+  Purpose: Buffered and atomic writers of output csv files.
+"""
+
+import io, os, shutil, tempfile
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import IO, List, Optional, Tuple
+
+from jsktoolbox.attribtool import ReadOnlyClass
+from jsktoolbox.basetool.data import BData
+
+from libs.compression import compressor
+
+# size of output buffer in characters
+BUFFER_SIZE: int = 1024 * 1024
+
+# number of lines joined in a single write of list
+CHUNK_LINES: int = 8192
+
+# status of the process with its umask, Linux only
+_STATUS: str = "/proc/self/status"
+
+
+class _Keys(object, metaclass=ReadOnlyClass):
+    """Internal Keys container class."""
+
+    BUFFER: str = "__buffer__"
+    BUFFERED: str = "__buffered__"
+    COUNT: str = "__count__"
+    FILE: str = "__file__"
+    FSYNC: str = "__fsync__"
+    PATH: str = "__path__"
+    RAW: str = "__raw__"
+    SIZE: str = "__size__"
+    TMP: str = "__tmp__"
+
+
+def file_mode(directory: str = ".") -> int:
+    """Returns permissions of files created by open() in directory.
+
+    The umask is read from process status, on other systems from a probe
+    file, os.umask() is not called as it changes umask of all threads.
+    """
+    try:
+        with open(_STATUS) as file:
+            for line in file:
+                if line.startswith("Umask:"):
+                    return 0o666 & ~int(line.split()[1], 8)
+    except (OSError, ValueError, IndexError):
+        pass
+    probe: str = os.path.join(directory, f".motostat_mode_{os.urandom(6).hex()}")
+    os.close(os.open(probe, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666))
+    try:
+        return os.stat(probe).st_mode & 0o777
+    finally:
+        os.remove(probe)
+
+
+def _sync_dir(path: str) -> None:
+    """Flushes directory entry of renamed file to disk."""
+    fd: int = os.open(os.path.dirname(path) or ".", os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class AtomicCsvWriter(BData):
+    """Writer of csv file replaced atomically.
+
+    Lines are collected in a large buffer and written to a temporary file
+    in the target directory. The file is renamed to the target path on
+    commit, so readers never see a truncated file. With append flag the
+    temporary file starts with a copy of the existing file. Compressed
+    lines are appended to compressed file as the next stream, readers
+    decompress concatenated streams as a whole.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        header: str,
+        append: bool = False,
+        fsync: bool = False,
+        compression: str = "",
+    ) -> None:
+        """Constructor.
+
+        ### Arguments:
+        - path [str] - path to csv file.
+        - header [str] - csv header line, written if the file is empty.
+        - append [bool] - keep content of existing file.
+        - fsync [bool] - flush file to disk before rename.
+        - compression [str] - compression format, empty for plain file.
+        """
+        fd, tmp = tempfile.mkstemp(
+            prefix=f".{os.path.basename(path)}.", dir=os.path.dirname(path) or "."
+        )
+        raw: Optional[IO[bytes]] = os.fdopen(fd, "wb") if compression else None
+        file: IO[str] = raw if raw is not None else os.fdopen(fd, "w")  # type: ignore
+        self._set_data(key=_Keys.PATH, value=path, set_default_type=str)
+        self._set_data(key=_Keys.TMP, value=tmp, set_default_type=str)
+        self._set_data(key=_Keys.RAW, value=raw)
+        self._set_data(key=_Keys.FILE, value=file)
+        self._set_data(key=_Keys.FSYNC, value=fsync, set_default_type=bool)
+        self._set_data(key=_Keys.BUFFER, value=[], set_default_type=List)
+        self._set_data(key=_Keys.BUFFERED, value=0, set_default_type=int)
+        self._set_data(key=_Keys.COUNT, value=0, set_default_type=int)
+        self._set_data(key=_Keys.SIZE, value=0, set_default_type=int)
+        try:
+            if append and os.path.isfile(path):
+                with open(path, "rb" if raw is not None else "r") as src:
+                    shutil.copyfileobj(src, file)
+            file.flush()
+            # size of copied file is subtracted from size of output
+            self._data[_Keys.SIZE] = -os.fstat(file.fileno()).st_size
+            empty: bool = self._data[_Keys.SIZE] == 0
+            if raw is not None:
+                file = io.TextIOWrapper(compressor(raw, compression), newline="")
+                self._set_data(key=_Keys.FILE, value=file)
+            if empty:
+                file.write(f"{header}\n")
+        except BaseException:
+            self.abort()
+            raise
+
+    def __enter__(self) -> "AtomicCsvWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abort()
+
+    @property
+    def count(self) -> int:
+        """Returns number of written lines."""
+        return self._get_data(key=_Keys.COUNT)  # type: ignore
+
+    @property
+    def size(self) -> int:
+        """Returns number of bytes written to file, known after commit."""
+        if self._data[_Keys.FILE] is not None:
+            return 0
+        return max(self._get_data(key=_Keys.SIZE), 0)  # type: ignore
+
+    def write(self, line: str) -> None:
+        """Adds csv line to buffer."""
+        self._data[_Keys.BUFFER].append(line)
+        self._data[_Keys.COUNT] += 1
+        self._data[_Keys.BUFFERED] += len(line) + 1
+        if self._data[_Keys.BUFFERED] >= BUFFER_SIZE:
+            self.flush()
+
+    def write_lines(self, lines: List[str]) -> None:
+        """Writes list of csv lines in large chunks."""
+        self.flush()
+        file: IO[str] = self._data[_Keys.FILE]
+        for i in range(0, len(lines), CHUNK_LINES):
+            chunk: List[str] = lines[i : i + CHUNK_LINES]
+            chunk.append("")
+            file.write("\n".join(chunk))
+        self._data[_Keys.COUNT] += len(lines)
+
+    def flush(self) -> None:
+        """Writes buffer to temporary file."""
+        buffer: List[str] = self._data[_Keys.BUFFER]
+        if buffer:
+            buffer.append("")
+            self._data[_Keys.FILE].write("\n".join(buffer))
+            self._data[_Keys.BUFFER] = []
+            self._data[_Keys.BUFFERED] = 0
+
+    def commit(self) -> None:
+        """Writes the rest of buffer and renames file to the target path."""
+        file: Optional[IO[str]] = self._data[_Keys.FILE]
+        if file is None:
+            return
+        path: str = self._data[_Keys.PATH]
+        try:
+            self.flush()
+            raw: Optional[IO[bytes]] = self._data[_Keys.RAW]
+            if raw is not None:
+                # closing compressor finishes compressed stream
+                file.close()
+                file = raw
+                self._data[_Keys.FILE] = raw
+                self._data[_Keys.RAW] = None
+            file.flush()
+            self._data[_Keys.SIZE] += os.fstat(file.fileno()).st_size
+            if self._data[_Keys.FSYNC]:
+                os.fsync(file.fileno())
+            file.close()
+            self._data[_Keys.FILE] = None
+            tmp: str = self._data[_Keys.TMP]
+            os.chmod(tmp, file_mode(os.path.dirname(tmp) or "."))
+            os.replace(self._data[_Keys.TMP], path)
+        except BaseException:
+            self.abort()
+            raise
+        if self._data[_Keys.FSYNC]:
+            _sync_dir(path)
+
+    def abort(self) -> None:
+        """Removes temporary file, the target file is not changed."""
+        for key in (_Keys.FILE, _Keys.RAW):
+            file: Optional[IO] = self._data[key]
+            if file is not None:
+                file.close()
+                self._data[key] = None
+        try:
+            os.remove(self._data[_Keys.TMP])
+        except FileNotFoundError:
+            pass
+
+
+def write_csv(
+    path: str,
+    header: str,
+    lines: List[str],
+    append: bool = False,
+    fsync: bool = False,
+) -> int:
+    """Writes csv file atomically, returns number of lines.
+
+    Nothing is written for empty list of lines.
+    """
+    if lines:
+        with AtomicCsvWriter(path, header, append, fsync) as writer:
+            writer.write_lines(lines)
+    return len(lines)
+
+
+def write_csv_files(
+    files: List[Tuple[str, str, List[str]]],
+    append: bool = False,
+    fsync: bool = False,
+) -> List[int]:
+    """Writes csv files concurrently, returns numbers of lines.
+
+    ### Arguments:
+    - files [List[Tuple[str, str, List[str]]]] - path, header and lines of files.
+    - append [bool] - append lines to existing files.
+    - fsync [bool] - flush files to disk before rename.
+    """
+    with ThreadPoolExecutor(max_workers=len(files) or 1) as executor:
+        return list(
+            executor.map(
+                lambda item: write_csv(*item, append=append, fsync=fsync), files
+            )
+        )
+
+
+def commit_all(writers: List[AtomicCsvWriter]) -> None:
+    """Commits writers concurrently."""
+    with ThreadPoolExecutor(max_workers=len(writers) or 1) as executor:
+        list(executor.map(AtomicCsvWriter.commit, writers))
+
+
+def copy_file(src: str, dst: str, fsync: bool = False) -> None:
+    """Copies file atomically."""
+    fd, tmp = tempfile.mkstemp(
+        prefix=f".{os.path.basename(dst)}.", dir=os.path.dirname(dst) or "."
+    )
+    try:
+        with os.fdopen(fd, "wb") as file, open(src, "rb") as source:
+            shutil.copyfileobj(source, file)
+            if fsync:
+                file.flush()
+                os.fsync(file.fileno())
+        os.chmod(tmp, file_mode(os.path.dirname(tmp) or "."))
+        os.replace(tmp, dst)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    if fsync:
+        _sync_dir(dst)
+
+
+# #[EOF]#######################################################################
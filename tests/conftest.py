@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""
+  conftest.py
+  Author : Jacek 'Szumak' Kotlarski --<szumak@virthost.pl>
+  Created: 18.10.2026, 09:12:40
+
+  Purpose: Fixtures and helpers shared by tests.
+"""
+
+import io, signal, sys, time
+
+from typing import List
+
+import pytest
+
+from libs.main import Converter
+
+HEADER: str = (
+    "cost_id;fueling_id;cost_type;date;fuel_id;gas_station_id;odometer;"
+    "trip_odometer;quantity;cost;notes;fueling_type;tires;driving_style;"
+    "route_motorway;route_country;route_city;bc_consumption;bc_avg_speed;ac;"
+    "currency;fuel_name;gas_station_name"
+)
+
+# rows skipped by every engine
+INVALID: List[str] = [
+    ';2001;;2024-02-30;12;5;100;10;1;1;"";full;summer;normal;1;0;1;;;0;PLN;"Diesel";""',
+    ';2002;;2024-02-03;12;5;1x0;10;1;1;"";full;summer;normal;1;0;1;;;0;PLN;"Diesel";""',
+    ';2003;;2024-02-03;12;5;100;10;;1;"";full;summer;normal;1;0;1;;;0;PLN;"Diesel";""',
+    '2004;;repair;2024-02-04;;;100;;;12.0;"";;;;;;;;;;PLN',
+    ';2005;;2024-02-05;12;5;100;10;1;1;"";mixed;summer;normal;1;0;1;;;0;PLN;"Diesel";""',
+    ';2006;;2024-02-06;12;5;100;10;1;1;"";full;summer;;1;0;1;;;0;PLN;"Diesel";""',
+]
+
+# fueling with multi-line note, '\r\n' does not terminate the record
+MULTILINE: bytes = (
+    b';999;;2024-05-03;12;5;10000;400.5;40.12;250.50;"first\r\nsecond; line";'
+    b'full;summer;normal;1;0;1;;;0;PLN;"Diesel";"Orlen"\n'
+)
+
+
+def export(rows: int = 50) -> bytes:
+    """Returns small motostat export with costs and fuelings."""
+    lines = [HEADER]
+    for i in range(rows, 0, -1):
+        date: str = f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}"
+        if i % 3:
+            lines.append(
+                f";{i};;{date};12;5;{10000 + i * 400};{400 + i}.5;40.12;250.50;"
+                f'"note; {i}";full;summer;normal;1;0;1;;;0;PLN;"Diesel";"Orlen"'
+            )
+        else:
+            lines.append(
+                f'{i};;repair;{date};;;{10000 + i * 400};;;120.00;"";;;;;;;;;;PLN'
+            )
+    return ("\n".join(lines) + "\n").encode()
+
+
+@pytest.fixture
+def signals():
+    """Restores signal handlers replaced by Converter."""
+    term = signal.getsignal(signal.SIGTERM)
+    intr = signal.getsignal(signal.SIGINT)
+    yield
+    signal.signal(signal.SIGTERM, term)
+    signal.signal(signal.SIGINT, intr)
+
+
+def run_converter(monkeypatch, data: bytes, *args: str) -> float:
+    """Runs Converter on data as STDIN, returns wall time."""
+    monkeypatch.setattr(sys, "argv", ["motostat-to-spritmonitor", *args])
+    monkeypatch.setattr(sys, "stdin", io.TextIOWrapper(io.BytesIO(data)))
+    start: float = time.perf_counter()
+    with pytest.raises(SystemExit) as ex:
+        Converter().run()
+    assert ex.value.code == 0
+    return time.perf_counter() - start
+
+
+# #[EOF]#######################################################################
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""
+  test_aio.py
+  Author : Jacek 'Szumak' Kotlarski --<szumak@virthost.pl>
+  Created: 17.10.2026, 08:02:37
+
+  Purpose: Tests of asyncio conversion API.
+"""
+
+import asyncio
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import AsyncIterator, Dict, List
+
+import pytest
+
+from libs.aio import AsyncConversion, convert_stream
+from libs.api import convert_to
+from libs.streaming import COST, FUEL
+from libs.synthetic import export_bytes
+from tests.conftest import MULTILINE
+
+
+async def chunked(data: bytes, size: int) -> AsyncIterator[bytes]:
+    """Yields data in chunks of given size."""
+    for i in range(0, len(data), size):
+        yield data[i : i + size]
+        await asyncio.sleep(0)
+
+
+async def collect(items: AsyncIterator) -> Dict[str, str]:
+    """Returns concatenated texts of kinds."""
+    out: Dict[str, str] = {COST: "", FUEL: ""}
+    async for kind, text in items:
+        out[kind] += text
+    return out
+
+
+def expected(data: bytes) -> Dict[str, str]:
+    """Returns output of synchronous API."""
+    import io
+
+    costs, fuels = io.StringIO(), io.StringIO()
+    convert_to(data, costs, fuels)
+    return {COST: costs.getvalue(), FUEL: fuels.getvalue()}
+
+
+def test_convert_stream() -> None:
+    """Hundreds of concurrent conversions give the same output as sync API."""
+    data: bytes = export_bytes(300)
+
+    async def main() -> List[Dict[str, str]]:
+        return await asyncio.gather(
+            *(collect(convert_stream(chunked(data, 97 + i))) for i in range(200))
+        )
+
+    out = asyncio.run(main())
+    assert all(item == expected(data) for item in out)
+
+
+def test_small_batches() -> None:
+    """Sorted batches are merged in output order, errors are reported."""
+    data: bytes = export_bytes(500) + "żółć;1;;2024-13-01\n".encode()
+
+    async def main() -> Dict[str, str]:
+        conversion = AsyncConversion(batch_size=7, depth=3)
+        async for chunk in chunked(data, 5):
+            await conversion.feed(chunk)
+        await conversion.finish()
+        assert conversion.records == 500
+        assert conversion.count == 502
+        assert conversion.pop_errors() == []
+        return await collect(conversion.chunks(chunk_size=33))
+
+    assert asyncio.run(main()) == expected(data)
+
+
+def test_process_executor() -> None:
+    """Batches are parsed and converted in worker processes."""
+    data: bytes = export_bytes(2000)
+    errors: List[str] = []
+
+    async def main() -> Dict[str, str]:
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            return await collect(
+                convert_stream(chunked(data, 4096), executor=executor, errors=errors)
+            )
+
+    assert asyncio.run(main()) == expected(data)
+    assert errors == []
+
+
+def test_multiline_note() -> None:
+    """Multi-line notes split between chunks are kept in one record."""
+    data: bytes = export_bytes(100) + MULTILINE
+
+    async def main() -> Dict[str, str]:
+        conversion = AsyncConversion(batch_size=7)
+        async for chunk in chunked(data, 3):
+            await conversion.feed(chunk)
+        await conversion.finish()
+        assert conversion.records == 101
+        assert conversion.pop_errors() == []
+        return await collect(conversion.chunks())
+
+    out: Dict[str, str] = asyncio.run(main())
+    assert out == expected(data)
+    assert "first\r\nsecond; line" in out[FUEL]
+
+
+def test_record_limit() -> None:
+    """Input without new lines is not buffered over the record limit."""
+
+    async def main() -> None:
+        conversion = AsyncConversion(record_limit=100)
+        await conversion.feed(MULTILINE)
+        with pytest.raises(ValueError, match="row 2: record exceeds 100 bytes"):
+            async for chunk in chunked(b"x" * 1000, 10):
+                await conversion.feed(chunk)
+
+    asyncio.run(main())
+
+
+# #[EOF]#######################################################################
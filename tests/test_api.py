@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+  test_api.py
+  Author : Jacek 'Szumak' Kotlarski --<szumak@virthost.pl>
+  Created: 17.10.2026, 07:10:26
+
+  Purpose: Tests of embeddable conversion API.
+"""
+
+import gzip, io, os, pathlib, threading
+
+from libs.api import convert, convert_to
+from tests.conftest import MULTILINE, export, run_converter
+
+
+def read_lines(path: str):
+    with open(path) as file:
+        return file.read().splitlines()
+
+
+def test_convert(monkeypatch, signals, tmp_path) -> None:
+    """Every kind of source gives the same lines as converter."""
+    run_converter(monkeypatch, export(), "-o", str(tmp_path))
+    costs = read_lines(os.path.join(tmp_path, "spritmonitor_costs.csv"))[1:]
+    fuels = read_lines(os.path.join(tmp_path, "spritmonitor_fuels.csv"))[1:]
+    path = tmp_path / "motostat.csv.gz"
+    path.write_bytes(gzip.compress(export()))
+    threads: int = threading.active_count()
+    for source in (
+        export(),
+        gzip.compress(export()),
+        export().decode(),
+        export().decode().splitlines(),
+        io.BytesIO(export()),
+        io.StringIO(export().decode()),
+        pathlib.Path(path),
+    ):
+        out = convert(source)
+        assert (list(out[0]), list(out[1])) == (costs, fuels)
+    assert threading.active_count() == threads
+
+
+def test_convert_to() -> None:
+    """Lines are written to streams with headers, skipped rows are reported."""
+    data: bytes = export() + (
+        b';999;;2024-13-01;12;5;10000;400.5;40.12;250.50;"";full;summer;normal;'
+        b'1;0;1;;;0;PLN;"Diesel";"Orlen"\n'
+    )
+    costs = io.StringIO()
+    fuels = io.StringIO()
+    errors = []
+    assert convert_to(data, costs, fuels, errors=errors) == (16, 34)
+    assert len(costs.getvalue().splitlines()) == 17
+    assert fuels.getvalue().startswith("Date;Odometer;")
+    assert len(errors) == 1 and "invalid date" in errors[0]
+    costs = io.StringIO()
+    assert convert_to(data, costs, header=False) == (16, 34)
+    assert len(costs.getvalue().splitlines()) == 16
+
+
+def test_multiline_note(tmp_path) -> None:
+    """Records with multi-line notes are not split into fragments."""
+    data: bytes = MULTILINE + export()
+    path = tmp_path / "motostat.csv"
+    path.write_bytes(data)
+    for source in (
+        data,
+        gzip.compress(data),
+        data.decode(),
+        io.BytesIO(data),
+        io.StringIO(data.decode()),
+        pathlib.Path(path),
+    ):
+        errors = []
+        costs, fuels = convert(source, errors=errors)
+        assert errors == []
+        assert len(list(costs)) == 16
+        assert [line for line in fuels if "first\r\nsecond; line" in line]
+
+
+# #[EOF]#######################################################################
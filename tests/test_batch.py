@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""
+  test_batch.py
+  Author : Jacek 'Szumak' Kotlarski --<szumak@virthost.pl>
+  Created: 16.10.2026, 12:20:44
+
+  Purpose: Tests for batch conversion.
+"""
+
+import gzip, json, os
+
+from jsktoolbox.logstool.logs import LoggerClient, LoggerQueue
+
+from libs.batch import SUMMARY_FILE, BatchProcessor, find_exports
+from tests.conftest import export
+
+
+def test_batch_outputs(tmp_path) -> None:
+    """Every export is written to its own output files."""
+    src = os.path.join(tmp_path, "in")
+    out = os.path.join(tmp_path, "out")
+    os.mkdir(src)
+    for name, rows in (("motostat1.csv", 10), ("motostat2.csv", 20)):
+        with open(os.path.join(src, name), "wb") as file:
+            file.write(export(rows))
+    with open(os.path.join(src, "other.csv"), "wb") as file:
+        file.write(export(5))
+    assert len(find_exports([src])) == 2
+
+    batch = BatchProcessor(LoggerClient(LoggerQueue()))
+    batch.output_dir = out
+    summaries = batch.run([src])
+    assert [item["records"] for item in summaries] == [10, 20]
+    assert os.path.exists(os.path.join(out, "spritmonitor_fuels_motostat1.csv"))
+    assert os.path.exists(os.path.join(out, "spritmonitor_costs_motostat2.csv"))
+    with open(os.path.join(out, SUMMARY_FILE)) as file:
+        assert len(json.load(file)["exports"]) == 2
+
+
+def test_batch_collisions(tmp_path) -> None:
+    """Exports with the same name and compressed exports are kept apart."""
+    out = os.path.join(tmp_path, "out")
+    paths = []
+    for name, rows in (("a", 10), ("b", 20)):
+        os.mkdir(os.path.join(tmp_path, name))
+        paths.append(os.path.join(tmp_path, name, "motostat.csv"))
+        with open(paths[-1], "wb") as file:
+            file.write(export(rows))
+    paths.append(os.path.join(tmp_path, "motostat.csv.gz"))
+    with gzip.open(paths[-1], "wb") as file:
+        file.write(export(30))
+
+    batch = BatchProcessor(LoggerClient(LoggerQueue()))
+    batch.output_dir = out
+    summaries = batch.run(paths)
+    assert [item["records"] for item in summaries] == [10, 20, 30]
+    assert [item["fuels_file"] for item in summaries] == [
+        "spritmonitor_fuels_motostat.csv",
+        "spritmonitor_fuels_motostat_2.csv",
+        "spritmonitor_fuels_motostat_3.csv",
+    ]
+    for item in summaries:
+        with open(os.path.join(out, item["fuels_file"])) as file:
+            assert len(file.read().splitlines()) == item["fuels"] + 1
+
+
+def test_batch_summary_error(tmp_path) -> None:
+    """Failed summary write is logged, results are still returned."""
+    path = os.path.join(tmp_path, "motostat.csv")
+    with open(path, "wb") as file:
+        file.write(export(10))
+    out = os.path.join(tmp_path, "out")
+    os.makedirs(os.path.join(out, SUMMARY_FILE))
+    batch = BatchProcessor(LoggerClient(LoggerQueue()))
+    batch.output_dir = out
+    assert [item["records"] for item in batch.run([path])] == [10]
+
+
+# #[EOF]#######################################################################
@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""
+  test_benchmark.py
+  Author : Jacek 'Szumak' Kotlarski --<szumak@virthost.pl>
+  Created: 17.10.2026, 06:15:44
+
+  Purpose: Benchmarks of pipeline stages on synthetic exports.
+
+  Benchmarks run only with MOTOSTAT_BENCHMARK=1 set:
+  - MOTOSTAT_BENCHMARK_ROWS - number of records, default 100000,
+  - MOTOSTAT_BENCHMARK_THRESHOLD - allowed slowdown against baseline,
+  - MOTOSTAT_BENCHMARK_UPDATE=1 - store measured times as new baselines,
+    benchmarks without baseline fail unless it is set.
+
+  Every run of a benchmark is preceded by a run of a calibration loop, the
+  result is the median of BENCHMARK_REPEATS ratios of both times per
+  record, so it does not depend on the speed of the machine or its load
+  changing during the session. Fixed costs are divided per record too,
+  so baselines are kept separately for every number of records.
+"""
+
+import gc, json, os, statistics, time
+
+from typing import Any, Callable, Dict, List
+
+import pytest
+
+from libs.conversion import Conversion
+from libs.formatter import COST_CSV_HEADER, FUELING_CSV_HEADER
+from libs.synthetic import export_bytes
+from libs.writer import write_csv_files
+from tests.conftest import run_converter
+
+BENCHMARK_ROWS: int = int(os.environ.get("MOTOSTAT_BENCHMARK_ROWS", "100000"))
+BENCHMARK_THRESHOLD: float = float(
+    os.environ.get("MOTOSTAT_BENCHMARK_THRESHOLD", "1.5")
+)
+BENCHMARK_REPEATS: int = 5
+CALIBRATION_LOOPS: int = 100000
+BASELINES: str = os.path.join(os.path.dirname(__file__), "benchmarks.json")
+
+pytestmark = pytest.mark.skipif(
+    not os.environ.get("MOTOSTAT_BENCHMARK"),
+    reason="benchmarks run with MOTOSTAT_BENCHMARK=1",
+)
+
+
+def _timed(func: Callable[[Any], Any], arg: Any) -> float:
+    """Returns time of func run in seconds."""
+    # collections of previous runs garbage are not measured, as in timeit
+    gc.collect()
+    gc.disable()
+    try:
+        start: float = time.perf_counter()
+        func(arg)
+        return time.perf_counter() - start
+    finally:
+        gc.enable()
+
+
+def _calibration(_: Any) -> None:
+    """Splits and converts strings like parser, the unit of baselines."""
+    for i in range(CALIBRATION_LOOPS):
+        fields: List[str] = f"{i};;2024-01-01;{i}.5;PLN".split(";")
+        float(fields[3])
+
+
+def relative_time(func: Callable[[Any], Any], setup: Callable[[], Any]) -> float:
+    """Returns median time of func relative to calibration loop run before it."""
+    ratios: List[float] = []
+    for _ in range(BENCHMARK_REPEATS):
+        arg: Any = setup()
+        unit: float = _timed(_calibration, None)
+        ratios.append(_timed(func, arg) / unit)
+    return statistics.median(ratios)
+
+
+@pytest.fixture(scope="module")
+def data() -> bytes:
+    """Returns synthetic export."""
+    return export_bytes(BENCHMARK_ROWS)
+
+
+@pytest.fixture(scope="module")
+def lines(data) -> List[str]:
+    """Returns lines of synthetic export."""
+    return data.decode().splitlines()
+
+
+@pytest.fixture(scope="module")
+def parsed(lines) -> Conversion:
+    """Returns sorted conversion of synthetic export."""
+    conversion = Conversion()
+    conversion.add_batch(lines)
+    conversion.sort()
+    return conversion
+
+
+def measure(name: str, func: Callable[[Any], Any], setup: Callable[[], Any]) -> None:
+    """Measures func and compares time per record with stored baseline.
+
+    ### Arguments:
+    - name [str] - name of benchmark.
+    - func [Callable] - benchmarked code, gets result of setup.
+    - setup [Callable] - prepares argument of func, not measured.
+    """
+    result: float = round(
+        relative_time(func, setup) * CALIBRATION_LOOPS / BENCHMARK_ROWS, 4
+    )
+    baselines: Dict[str, Dict[str, float]] = {}
+    if os.path.exists(BASELINES):
+        with open(BASELINES) as file:
+            baselines = json.load(file)
+    # baselines of the number of records
+    rows: Dict[str, float] = baselines.setdefault(f"{BENCHMARK_ROWS}", {})
+    if os.environ.get("MOTOSTAT_BENCHMARK_UPDATE"):
+        rows[name] = result
+        with open(BASELINES, "w") as file:
+            file.write(json.dumps(baselines, indent=2, sort_keys=True) + "\n")
+        return
+    if name not in rows:
+        pytest.fail(
+            f"{name}: {result} per record, no baseline for {BENCHMARK_ROWS} "
+            "records, run with MOTOSTAT_BENCHMARK_UPDATE=1 to store it"
+        )
+    limit: float = rows[name] * BENCHMARK_THRESHOLD
+    assert result <= limit, (
+        f"{name}: {result} per record, baseline {rows[name]} "
+        f"for {BENCHMARK_ROWS} records, limit {limit:.4f}"
+    )
+
+
+def test_parse(lines) -> None:
+    """Parsing of motostat lines."""
+    measure("parse", lambda conversion: conversion.add_batch(lines), Conversion)
+
+
+def test_sort(parsed) -> None:
+    """Sorting of parsed records, newest first as in exports."""
+    records = parsed.sort()
+
+    def setup() -> Conversion:
+        conversion = Conversion()
+        conversion.add_records(list(records), [], len(records))
+        return conversion
+
+    measure("sort", lambda conversion: conversion.sort(), setup)
+
+
+def test_convert(parsed) -> None:
+    """Conversion of sorted records to spritmonitor lines."""
+    measure("convert", lambda conversion: conversion.convert(), lambda: parsed)
+
+
+def test_serialize(parsed, tmp_path) -> None:
+    """Writing of spritmonitor csv files."""
+    costs, fuels = parsed.convert()
+    measure(
+        "serialize",
+        lambda _: write_csv_files(
+            [
+                (os.path.join(tmp_path, "costs.csv"), COST_CSV_HEADER, costs),
+                (os.path.join(tmp_path, "fuels.csv"), FUELING_CSV_HEADER, fuels),
+            ]
+        ),
+        lambda: None,
+    )
+
+
+def test_cli(monkeypatch, signals, tmp_path, data) -> None:
+    """Conversion of export file with command line interface."""
+    path: str = os.path.join(tmp_path, "motostat.csv")
+    with open(path, "wb") as file:
+        file.write(data)
+    measure(
+        "cli",
+        lambda _: run_converter(monkeypatch, b"", "-o", str(tmp_path), path),
+        lambda: None,
+    )
+
+
+# #[EOF]#######################################################################
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+  test_cache.py
+  Author : Jacek 'Szumak' Kotlarski --<szumak@virthost.pl>
+  Created: 16.10.2026, 22:58:12
+
+  Purpose: Tests of conversion result cache.
+"""
+
+import json, os
+
+from libs.cache import META_FILE, ResultCache, hash_files
+from libs.conversion import COSTS_FILE, FUELS_FILE
+from tests.conftest import export, run_converter
+
+
+def test_restore(monkeypatch, signals, tmp_path) -> None:
+    """Unchanged input is restored from cache without parsing."""
+    cache_dir: str = os.path.join(tmp_path, "cache")
+    out: str = os.path.join(tmp_path, "out")
+    data: bytes = export(30)
+    run_converter(monkeypatch, data, "-o", out, "-r", cache_dir)
+    with open(os.path.join(out, FUELS_FILE), "rb") as file:
+        fuels: bytes = file.read()
+    os.remove(os.path.join(out, FUELS_FILE))
+
+    # the same input from file, the cache key does not depend on the reader
+    path: str = os.path.join(tmp_path, "motostat.csv")
+    with open(path, "wb") as file:
+        file.write(data)
+    assert ResultCache(cache_dir).has(hash_files([path], False))
+    monkeypatch.setattr(
+        "libs.main.MmapReader.batches", lambda self: iter(()), raising=True
+    )
+    run_converter(monkeypatch, b"", "-o", out, "-r", cache_dir, path)
+    with open(os.path.join(out, FUELS_FILE), "rb") as file:
+        assert file.read() == fuels
+    assert os.path.exists(os.path.join(out, COSTS_FILE))
+    assert not ResultCache(cache_dir).has(hash_files([path], True))
+
+
+def test_evicted_entry(monkeypatch, signals, tmp_path) -> None:
+    """Files are read when the entry is gone before it is restored."""
+    out: str = os.path.join(tmp_path, "out")
+    path: str = os.path.join(tmp_path, "motostat.csv")
+    with open(path, "wb") as file:
+        file.write(export(30))
+    monkeypatch.setattr(ResultCache, "has", lambda self, key: True)
+    monkeypatch.setattr(ResultCache, "restore", lambda self, key, output_dir: None)
+    run_converter(monkeypatch, b"", "-o", out, "-r", str(tmp_path / "cache"), path)
+    assert os.path.exists(os.path.join(out, FUELS_FILE))
+    assert os.path.exists(os.path.join(out, COSTS_FILE))
+
+
+def test_stale_files(monkeypatch, signals, tmp_path) -> None:
+    """Files left in output dir by old runs are not cached."""
+    cache_dir: str = os.path.join(tmp_path, "cache")
+    out: str = os.path.join(tmp_path, "out")
+    os.mkdir(out)
+    with open(os.path.join(out, COSTS_FILE), "w") as file:
+        file.write("stale")
+    # fuelings only
+    run_converter(monkeypatch, export(2), "-o", out, "-r", cache_dir)
+    (entry,) = os.listdir(cache_dir)
+    with open(os.path.join(cache_dir, entry, META_FILE)) as file:
+        assert json.load(file)["files"] == [FUELS_FILE]
+    assert sorted(os.listdir(os.path.join(cache_dir, entry))) == sorted(
+        [FUELS_FILE, META_FILE]
+    )
+
+
+def test_eviction(tmp_path) -> None:
+    """Least recently used entries are removed over size limit."""
+    out: str = str(tmp_path)
+    with open(os.path.join(out, COSTS_FILE), "w") as file:
+        file.write("x" * 400)
+    cache = ResultCache(os.path.join(out, "cache"), size_limit=1000)
+    for key in ("a", "b"):
+        cache.store(key, out, [COSTS_FILE, FUELS_FILE], 1, 0, [])
+    os.utime(os.path.join(cache.cache_dir, "a"), (1, 1))
+    os.utime(os.path.join(cache.cache_dir, "b"), (2, 2))
+    assert cache.restore("a", out) == (1, 0, [])
+    cache.store("c", out, [COSTS_FILE], 1, 0, [])
+    assert cache.has("a") and cache.has("c")
+    assert not cache.has("b")
+
+
+# #[EOF]#######################################################################
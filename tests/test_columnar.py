@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+"""
+  test_columnar.py
+  Author : Jacek 'Szumak' Kotlarski --<szumak@virthost.pl>
+  Created: 16.10.2026, 15:21:44
+
+  Purpose: Equivalence tests of columnar conversion engine.
+"""
+
+import re
+
+from typing import List
+
+import pytest
+
+from libs.columnar import ColumnarConversion
+from libs.conversion import Conversion
+from tests.conftest import INVALID, export
+
+
+@pytest.mark.parametrize("miles", [False, True])
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_same_output(miles: bool, use_numpy: bool) -> None:
+    """Columnar engine produces the same csv lines as the row engine."""
+    lines: List[str] = export(200).decode().splitlines() + INVALID
+    rows = Conversion(miles=miles)
+    rows.add_batch(lines)
+    columns = ColumnarConversion(miles=miles, use_numpy=use_numpy)
+    columns.add_batch(lines[:50])
+    columns.add_batch(lines[50:])
+    assert columns.convert() == rows.convert()
+    assert columns.records == rows.records
+    assert columns.skipped == rows.skipped == 5
+    assert re.findall(r"row \d+", "".join(columns.pop_errors())) == re.findall(
+        r"row \d+", "".join(rows.pop_errors())
+    )
+    assert columns.records == rows.records
+    assert columns.skipped == rows.skipped == 5
+
+
+# #[EOF]#######################################################################
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+  test_comms.py
+  Author : Jacek 'Szumak' Kotlarski --<szumak@virthost.pl>
+  Created: 17.10.2026, 00:08:36
+
+  Purpose: Tests of bounded communication queue.
+"""
+
+import json, os, time
+
+from queue import Empty
+from threading import Thread
+
+import pytest
+
+from libs.comms import CommsQueue
+from tests.conftest import export, run_converter
+
+
+def test_backpressure() -> None:
+    """Producer waits while the queue is full."""
+    queue = CommsQueue(maxsize=2, timeout=0.01)
+    producer = Thread(target=lambda: [queue.put(["a", "b"]) for _ in range(5)])
+    producer.start()
+    time.sleep(0.1)
+    assert queue.qsize() == 2
+    for _ in range(5):
+        assert queue.get() == ["a", "b"]
+    producer.join()
+    with pytest.raises(Empty):
+        queue.get()
+    stats = queue.stats()
+    assert stats["batches"] == 5
+    assert stats["lines"] == 10
+    assert stats["max_queue_depth"] == 2
+    assert stats["producer_stall"] > 0.05
+
+
+def test_close() -> None:
+    """Closed queue does not block producer."""
+    queue = CommsQueue(maxsize=1, timeout=0.01)
+    queue.put(["a"])
+    queue.close()
+    queue.put(["b", "c"])
+    assert queue.qsize() == 1
+    # dropped batch is not counted
+    stats = queue.stats()
+    assert stats["batches"] == 1
+    assert stats["lines"] == 1
+    assert stats["max_batch_size"] == 1
+
+
+def test_zero_timeout() -> None:
+    """Zero timeout is not replaced by the default of the queue."""
+    queue = CommsQueue(maxsize=1, timeout=5)
+    start: float = time.perf_counter()
+    with pytest.raises(Empty):
+        queue.get(timeout=0)
+    assert time.perf_counter() - start < 1
+
+
+def test_processor_exit(monkeypatch, signals, tmp_path) -> None:
+    """Reader is not blocked when processor exits early."""
+    state: str = os.path.join(tmp_path, "state")
+    os.mkdir(state)
+    path: str = os.path.join(tmp_path, "motostat.csv")
+    with open(path, "wb") as file:
+        file.write(export(20000))
+    out: str = os.path.join(tmp_path, "stats.json")
+    elapsed: float = run_converter(
+        monkeypatch,
+        b"",
+        "-o",
+        str(tmp_path),
+        "-q",
+        "1",
+        "-i",
+        state,
+        "--stats",
+        out,
+        path,
+    )
+    assert elapsed < 5
+    with open(out) as file:
+        stats = json.load(file)
+    # processor exited before parsing, the reader dropped the rest of batches
+    assert stats["counters"]["lines_read"] == 0
+    assert stats["queue"]["batches"] <= 1
+    assert stats["counters"]["bytes_in"] == os.path.getsize(path)
+    assert sorted(os.listdir(tmp_path)) == ["motostat.csv", "state", "stats.json"]
+
+
+# #[EOF]#######################################################################
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+  test_compression.py
+  Author : Jacek 'Szumak' Kotlarski --<szumak@virthost.pl>
+  Created: 17.10.2026, 02:48:21
+
+  Purpose: Tests of compressed input and output files.
+"""
+
+import bz2, gzip, io, lzma, os
+
+import pytest
+
+import libs.compression
+
+from libs.compression import (
+    SUFFIXES,
+    ThreadedReader,
+    detect,
+    open_compressed,
+    open_input,
+)
+from libs.writer import AtomicCsvWriter
+from tests.conftest import export, run_converter
+
+COMPRESS = {"gzip": gzip.compress, "bz2": bz2.compress, "xz": lzma.compress}
+DECOMPRESS = {"gzip": gzip.decompress, "bz2": bz2.decompress, "xz": lzma.decompress}
+
+
+def read(path: str) -> bytes:
+    with open(path, "rb") as file:
+        return file.read()
+
+
+@pytest.mark.parametrize("fmt", sorted(COMPRESS))
+def test_input(monkeypatch, signals, tmp_path, fmt) -> None:
+    """Compressed STDIN and files give the same output as plain input."""
+    run_converter(monkeypatch, export(), "-o", str(tmp_path))
+    fuels: bytes = read(os.path.join(tmp_path, "spritmonitor_fuels.csv"))
+    data: bytes = COMPRESS[fmt](export())
+    assert detect(data) == fmt
+    out: str = str(tmp_path / fmt)
+    os.mkdir(out)
+    run_converter(monkeypatch, data, "-o", out)
+    assert read(os.path.join(out, "spritmonitor_fuels.csv")) == fuels
+    path: str = os.path.join(tmp_path, f"motostat.csv{SUFFIXES[fmt]}")
+    with open(path, "wb") as file:
+        file.write(data)
+    os.remove(os.path.join(out, "spritmonitor_fuels.csv"))
+    run_converter(monkeypatch, b"", "-o", out, path)
+    assert read(os.path.join(out, "spritmonitor_fuels.csv")) == fuels
+
+
+@pytest.mark.parametrize("fmt", sorted(COMPRESS))
+def test_output(monkeypatch, signals, tmp_path, fmt) -> None:
+    """Output files are compressed with suffix of format."""
+    run_converter(monkeypatch, export(), "-o", str(tmp_path))
+    run_converter(monkeypatch, export(), "-o", str(tmp_path), "-z", fmt)
+    for name in ("spritmonitor_costs.csv", "spritmonitor_fuels.csv"):
+        data: bytes = read(os.path.join(tmp_path, name + SUFFIXES[fmt]))
+        assert DECOMPRESS[fmt](data) == read(os.path.join(tmp_path, name))
+
+
+def test_append(tmp_path) -> None:
+    """Appended lines are the next compressed stream with a single header."""
+    path: str = os.path.join(tmp_path, "out.csv.gz")
+    for lines in (["a", "b"], ["c"]):
+        with AtomicCsvWriter(path, "h", append=True, compression="gzip") as writer:
+            writer.write_lines(lines)
+    assert gzip.decompress(read(path)) == b"h\na\nb\nc\n"
+
+
+def test_buffered(monkeypatch, tmp_path) -> None:
+    """Reader honours size, works in BufferedReader and closes the file."""
+    files = []
+
+    def tracked(*args, **kwargs):
+        files.append(open(*args, **kwargs))
+        return files[-1]
+
+    monkeypatch.setattr(libs.compression, "open", tracked, raising=False)
+    data: bytes = export(300)
+    path: str = os.path.join(tmp_path, "motostat.csv.gz")
+    with open(path, "wb") as file:
+        file.write(gzip.compress(data))
+    stream = open_compressed(path)
+    assert isinstance(stream, ThreadedReader)
+    with io.BufferedReader(stream, 64) as buffered:  # type: ignore
+        assert buffered.read(10) == data[:10]
+        assert buffered.readline() == data[10 : data.index(b"\n") + 1]
+        parts = [data[: data.index(b"\n") + 1]]
+        while True:
+            part: bytes = buffered.read(1000)
+            assert len(part) <= 1000
+            if not part:
+                break
+            parts.append(part)
+    assert b"".join(parts) == data
+    assert files and all(file.closed for file in files)
+
+    stream = ThreadedReader(io.BytesIO(data), chunk_size=100)  # type: ignore
+    assert stream.read(30) + stream.read(100) + stream.read() == data
+    stream.close()
+
+
+def test_corrupted() -> None:
+    """Decompression error is raised in reader."""
+    data: bytes = gzip.compress(export())[:-100] + b"\x00" * 100
+    stream = open_input(io.BytesIO(data))  # type: ignore
+    assert isinstance(stream, ThreadedReader)
+    with pytest.raises(Exception):
+        while stream.read():
+            pass
+    stream.close()
+
+
+# #[EOF]#######################################################################
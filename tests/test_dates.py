@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""
+  test_dates.py
+  Author : Jacek 'Szumak' Kotlarski --<szumak@virthost.pl>
+  Created: 16.10.2026, 16:12:05
+
+  Purpose: Tests for memoized date codec.
+"""
+
+import time
+
+import pytest
+
+from libs.dates import decode_date, format_date
+
+
+def test_decode() -> None:
+    """ISO and not padded dates are decoded to UTC midnight."""
+    assert decode_date("2024-05-03") == (1714694400, "03.05.2024")
+    assert decode_date("2024-5-3") == decode_date("2024-05-03")
+    with pytest.raises(ValueError):
+        decode_date("2024-02-30")
+    with pytest.raises(ValueError):
+        decode_date("")
+
+
+def test_cache() -> None:
+    """Repeated dates are served from cache."""
+    decode_date.cache_clear()
+    for _ in range(10):
+        decode_date("2024-01-01")
+    assert decode_date.cache_info().hits == 9
+
+
+@pytest.mark.parametrize("zone", ["UTC", "America/Los_Angeles", "Pacific/Kiritimati"])
+def test_time_zone(monkeypatch, zone: str) -> None:
+    """Formatting does not depend on the local time zone."""
+    monkeypatch.setenv("TZ", zone)
+    time.tzset()
+    ts, text = decode_date("2024-03-31")
+    assert format_date(ts + 9999 / 10000) == text == "31.03.2024"
+    monkeypatch.undo()
+    time.tzset()
+
+
+# #[EOF]#######################################################################
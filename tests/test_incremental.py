@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+  test_incremental.py
+  Author : Jacek 'Szumak' Kotlarski --<szumak@virthost.pl>
+  Created: 16.10.2026, 22:05:18
+
+  Purpose: Tests of incremental conversion with persisted watermark.
+"""
+
+import json, os
+
+import pytest
+
+from typing import List
+
+from libs.conversion import Conversion
+from libs.formatter import FUELING_CSV_HEADER
+from libs.incremental import Watermark, delta_names
+from tests.conftest import INVALID, export, run_converter
+
+
+def test_watermark(tmp_path) -> None:
+    """Rows converted in previous run are skipped before parsing."""
+    state: str = os.path.join(tmp_path, "state.json")
+    old: List[str] = export(30).decode().splitlines()
+    new: List[str] = export(40).decode().splitlines()
+
+    first = Watermark(state)
+    assert first.filter(old) == old
+    first.advance([])
+    first.save()
+    with open(state) as file:
+        assert json.load(file) == {"cost_id": 30, "fueling_id": 29}
+
+    second = Watermark(state)
+    lines: List[str] = second.filter(new)
+    assert len(lines) == len(new)
+    assert len([line for line in lines if line]) == 11
+    conversion = Conversion()
+    conversion.add_batch(lines)
+    costs, fuels = conversion.convert()
+    assert len(costs) + len(fuels) == 10
+    second.advance(conversion.pop_errors())
+    assert second.cost_id == 39
+    assert second.fueling_id == 40
+
+
+def test_invalid_rows(tmp_path) -> None:
+    """Skipped rows keep their numbers and do not move the watermark."""
+    state: str = os.path.join(tmp_path, "state.json")
+    lines: List[str] = export(30).decode().splitlines()
+    first = Watermark(state)
+    first.filter(lines)
+    first.advance([])
+    first.save()
+    valid: str = (
+        ';45;;2024-12-01;12;5;30000;400.5;40.12;250.50;"";full;summer;normal;'
+        '1;0;1;;;0;PLN;"Diesel";"Orlen"'
+    )
+    # the newest fueling is invalid in the next export
+    invalid: str = valid.replace("2024-12-01", "2024-13-01")
+    second = Watermark(state)
+    conversion = Conversion()
+    # truncated row is ignored by the parser
+    conversion.add_batch(second.filter([lines[0], invalid, ";46;;2024-12-01;12"]))
+    conversion.add_batch(second.filter([valid.replace(";45;", ";44;")] + lines[1:]))
+    errors: List[str] = conversion.pop_errors()
+    assert errors == ["row 2: invalid date: '2024-13-01'"]
+    assert conversion.count == 34
+    assert conversion.records == 1
+    second.advance(errors)
+    second.save()
+    assert second.fueling_id == 44
+
+    # corrected row is converted in the next run
+    third = Watermark(state)
+    conversion = Conversion()
+    conversion.add_batch(third.filter([lines[0], valid] + lines[1:]))
+    assert conversion.records == 1
+    third.advance(conversion.pop_errors())
+    assert third.fueling_id == 45
+
+
+def test_append_delta(monkeypatch, signals, tmp_path) -> None:
+    """Runs append only new rows to delta files of the day."""
+    state: str = os.path.join(tmp_path, "state.json")
+    path: str = os.path.join(tmp_path, "motostat.csv")
+    for rows in (30, 40, 40):
+        with open(path, "wb") as file:
+            file.write(export(rows))
+        run_converter(monkeypatch, b"", "-o", str(tmp_path), "-i", state, path)
+    costs_file, fuels_file = delta_names()
+    with open(os.path.join(tmp_path, fuels_file)) as file:
+        lines: List[str] = file.readlines()
+    assert len(lines) == 28
+    assert [line.rstrip("\n") for line in lines].count(FUELING_CSV_HEADER) == 1
+    assert lines[0].rstrip("\n") == FUELING_CSV_HEADER
+    with open(os.path.join(tmp_path, costs_file)) as file:
+        assert len(file.readlines()) == 14
+    assert not os.path.exists(os.path.join(tmp_path, "spritmonitor_fuels.csv"))
+
+
+@pytest.mark.parametrize("args", [[], ["-c"], ["-j", "2"]])
+def test_invalid_not_converted(monkeypatch, signals, tmp_path, args) -> None:
+    """Invalid rows do not move the watermark with any engine."""
+    state: str = os.path.join(tmp_path, "state.json")
+    data: bytes = export(30) + ("\n".join(INVALID) + "\n").encode()
+    run_converter(monkeypatch, data, "-o", str(tmp_path), "-i", state, *args)
+    # the last row of INVALID is a valid cost
+    with open(state) as file:
+        assert json.load(file) == {"cost_id": 2004, "fueling_id": 29}
+
+
+# #[EOF]#######################################################################
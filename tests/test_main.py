@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""
+  test_main.py
+  Author : Jacek 'Szumak' Kotlarski --<szumak@virthost.pl>
+  Created: 16.10.2026, 10:02:17
+
+  Purpose: Tests for Converter pipeline.
+"""
+
+import os
+
+import pytest
+
+from tests.conftest import INVALID, export, run_converter
+
+
+def test_small_conversion_overhead(monkeypatch, signals, tmp_path) -> None:
+    """Small conversion is not delayed by fixed sleeps."""
+    elapsed: float = run_converter(monkeypatch, export(), "-o", str(tmp_path))
+    with open(os.path.join(tmp_path, "spritmonitor_fuels.csv")) as file:
+        assert len(file.readlines()) == 35
+    with open(os.path.join(tmp_path, "spritmonitor_costs.csv")) as file:
+        assert len(file.readlines()) == 17
+    assert elapsed < 0.1
+
+
+def test_input_files(monkeypatch, signals, tmp_path) -> None:
+    """Records are read from files given as arguments."""
+    path = os.path.join(tmp_path, "motostat.csv")
+    with open(path, "wb") as file:
+        file.write(export())
+    run_converter(monkeypatch, b"", "-o", str(tmp_path), path)
+    with open(os.path.join(tmp_path, "spritmonitor_fuels.csv")) as file:
+        assert len(file.readlines()) == 35
+
+
+@pytest.mark.parametrize("args", [[], ["-c"], ["-l", "1"], ["-j", "2"]])
+def test_invalid_rows(monkeypatch, signals, tmp_path, args) -> None:
+    """Invalid rows are skipped by every engine, valid rows are written."""
+    data: bytes = export() + ("\n".join(INVALID) + "\n").encode()
+    run_converter(monkeypatch, data, "-o", str(tmp_path), *args)
+    with open(os.path.join(tmp_path, "spritmonitor_fuels.csv")) as file:
+        assert len(file.readlines()) == 35
+
+
+# #[EOF]#######################################################################
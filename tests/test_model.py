@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+  test_model.py
+  Author : Jacek 'Szumak' Kotlarski --<szumak@virthost.pl>
+  Created: 16.10.2026, 14:10:37
+
+  Purpose: Tests for motostat records.
+"""
+
+import random, time
+
+from decimal import Decimal
+from operator import attrgetter
+from typing import List
+
+import pytest
+
+from libs.conversion import Conversion
+from libs.formatter import FUEL_CODES, FUELING_CSV_HEADER, format_fuel
+from libs.model import MotoStat, MotoStatRecord, SpritMonitor, parse_record
+
+FUELING: str = (
+    ';1002;;2024-05-03;12;55;15000;{trip};40.12;250.50;"note; x";full;summer;'
+    'normal;1;0;1;;;0;PLN;"Diesel";"Orlen"'
+)
+
+
+def test_typed_values() -> None:
+    """Numeric fields are parsed once into typed values."""
+    record = parse_record(FUELING.format(trip="512.3"))
+    assert record is not None
+    assert record.odometer == Decimal("15000")
+    assert record.trip_odometer == 512.3
+    assert record.quantity == Decimal("40.12")
+    assert record.route_motorway == 1.0
+    item = MotoStat.from_record(record)
+    assert item.trip_odometer == "512.30"
+    assert item.quantity == "40.12"
+
+
+def test_miles() -> None:
+    """Distances are converted to miles at parse time."""
+    item = MotoStat(FUELING.format(trip="512.3"), miles=True)
+    assert item.odometer == "9321"
+    assert item.trip_odometer == "318.00"
+
+
+def test_invalid_number() -> None:
+    """Invalid numbers are reported with the row number."""
+    with pytest.raises(ValueError, match="row 7"):
+        parse_record(FUELING.format(trip="5x"), row=7)
+    conversion = Conversion()
+    conversion.add_batch([FUELING.format(trip="1"), FUELING.format(trip="")])
+    assert conversion.records == 1
+    assert conversion.skipped == 1
+    assert "row 2" in conversion.pop_errors()[0]
+
+
+def test_unknown_codes() -> None:
+    """Unknown fueling type and driving style are reported with the row number."""
+    with pytest.raises(ValueError) as ex:
+        parse_record(FUELING.format(trip="1").replace(";full;", ";mixed;"), row=3)
+    assert f"{ex.value}" == "row 3: unknown fueling type: 'mixed'"
+    with pytest.raises(ValueError) as ex:
+        parse_record(FUELING.format(trip="1").replace(";normal;", ";;"), row=4)
+    assert f"{ex.value}" == "row 4: unknown driving style: ''"
+    # first fueling has no type in spritmonitor
+    assert parse_record(FUELING.format(trip="0").replace(";full;", ";;")) is not None
+
+
+def test_formatter() -> None:
+    """Precompiled formatter builds spritmonitor line from typed record."""
+    record = parse_record(FUELING.format(trip="512.3"))
+    assert format_fuel(record) == (  # type: ignore
+        "03.05.2024;15000,00;512,30;40,12;250,50;PLN;1;1;6;2;1;"
+        '""note; x"";7,83;;;;""Orlen"";"PL";"";""'
+    )
+    item = SpritMonitor(MotoStat.from_record(record))
+    assert item.csv_header == FUELING_CSV_HEADER
+    assert item.csv_data == format_fuel(record)  # type: ignore
+    with pytest.raises(TypeError):
+        FUEL_CODES["Diesel"] = "4"  # type: ignore
+
+
+def test_sort_key() -> None:
+    """Records are ordered by integer key built from date and id."""
+    old = MotoStat(FUELING.format(trip="1"))
+    new = MotoStat(FUELING.format(trip="1").replace(";1002;", ";1003;"))
+    assert new.sort_key - old.sort_key == 1
+    assert new.sort_key == round(new.date * 10000)
+    assert old < new and new > old and old != new
+    assert sorted([old, new], key=attrgetter("sort_key")) == [old, new]
+
+
+def test_sort_benchmark() -> None:
+    """Conversion sorts 1M newest-first records in linear time."""
+    records: List[MotoStatRecord] = []
+    for key in range(1_000_000, 0, -1):
+        record: MotoStatRecord = MotoStatRecord.__new__(MotoStatRecord)
+        record.key = key
+        records.append(record)
+    ordered = Conversion()
+    ordered.add_records(list(records), [], len(records))
+    mixed = Conversion()
+    mixed.add_records(random.sample(records, len(records)), [], len(records))
+    start: float = time.perf_counter()
+    out: List[MotoStatRecord] = ordered.sort()
+    ordered_time: float = time.perf_counter() - start
+    start = time.perf_counter()
+    mixed.sort()
+    mixed_time: float = time.perf_counter() - start
+    assert out == records
+    assert mixed.sort() == records
+    assert ordered_time < 1.0
+    assert ordered_time < mixed_time / 2
+    # sorted records are not sorted again
+    start = time.perf_counter()
+    assert ordered.sort() is out
+    assert time.perf_counter() - start < ordered_time
+
+
+# #[EOF]#######################################################################
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""
+  test_output.py
+  Author : Jacek 'Szumak' Kotlarski --<szumak@virthost.pl>
+  Created: 17.10.2026, 01:38:05
+
+  Purpose: Tests of streaming output to STDOUT and file descriptors.
+"""
+
+import io, os, sys
+
+from typing import List
+
+import pytest
+
+from libs.conversion import parse_batch
+from libs.main import Converter
+from libs.output import (
+    OrderedEmitter,
+    PresortedConversion,
+    StreamWriter,
+    write_outputs,
+)
+from libs.writer import AtomicCsvWriter
+from libs.streaming import COST, FUEL
+from tests.conftest import export, run_converter
+
+
+def sorted_export() -> bytes:
+    """Returns export with rows in newest-first order."""
+    header, *rows = export().decode().splitlines()
+
+    def key(line: str):
+        data: List[str] = line.split(";")
+        return data[3], int(data[0] or data[1])
+
+    return ("\n".join([header] + sorted(rows, key=key, reverse=True)) + "\n").encode()
+
+
+def read(path: str) -> str:
+    with open(path) as file:
+        return file.read()
+
+
+def test_stdout(monkeypatch, signals, tmp_path, capfd) -> None:
+    """Cost lines are written to STDOUT, logs go to STDERR."""
+    run_converter(monkeypatch, export(), "-o", str(tmp_path))
+    costs: str = read(os.path.join(tmp_path, "spritmonitor_costs.csv"))
+    fuels: str = read(os.path.join(tmp_path, "spritmonitor_fuels.csv"))
+    capfd.readouterr()
+    out = str(tmp_path / "out")
+    os.mkdir(out)
+    fuels_out = os.path.join(tmp_path, "fuels.csv")
+    run_converter(
+        monkeypatch, export(), "-o", out, "--costs_out", "-", "--fuels_out", fuels_out
+    )
+    captured = capfd.readouterr()
+    assert captured.out == costs
+    assert "records" in captured.err
+    assert read(fuels_out) == fuels
+    assert os.listdir(out) == []
+
+
+def test_presorted(monkeypatch, signals, tmp_path) -> None:
+    """Presorted input gives the same lines as sorted conversion."""
+    run_converter(monkeypatch, sorted_export(), "-o", str(tmp_path))
+    read_fd, write_fd = os.pipe()
+    try:
+        run_converter(
+            monkeypatch,
+            sorted_export(),
+            "-o",
+            str(tmp_path),
+            "--presorted",
+            "--fuels_out",
+            f"fd:{write_fd}",
+        )
+        os.close(write_fd)
+        with os.fdopen(read_fd) as file:
+            assert file.read() == read(os.path.join(tmp_path, "spritmonitor_fuels.csv"))
+    finally:
+        for fd in (read_fd, write_fd):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+
+def test_presorted_without_target(monkeypatch, signals, capsys) -> None:
+    """Presorted flag is rejected without stream target."""
+    monkeypatch.setattr(sys, "argv", ["motostat-to-spritmonitor", "--presorted"])
+    monkeypatch.setattr(sys, "stdin", io.TextIOWrapper(io.BytesIO(export())))
+    with pytest.raises(SystemExit):
+        Converter().run()
+    assert "--presorted" in capsys.readouterr().out
+
+
+def test_presorted_abort(tmp_path) -> None:
+    """Files of presorted conversion are removed when writing fails."""
+
+    class Broken(StreamWriter):
+        def write(self, line: str) -> None:
+            # fails when the costs file is already open
+            if self.count == 20:
+                raise OSError("broken pipe")
+            super().write(line)
+
+    def factory(kind: str):
+        if kind == FUEL:
+            return Broken(os.path.join(tmp_path, "fuels.csv"), "header")
+        return AtomicCsvWriter(os.path.join(tmp_path, "costs.csv"), "header")
+
+    conversion = PresortedConversion(factory)
+    conversion.add_batch(sorted_export().decode().splitlines()[1:])
+    with pytest.raises(OSError):
+        write_outputs(conversion, factory)
+    # stream target stays, temporary file of costs is removed
+    assert os.listdir(tmp_path) == ["fuels.csv"]
+
+
+def test_early_output(tmp_path) -> None:
+    """Lines are written before the end of input, late records are counted."""
+    paths = {kind: os.path.join(tmp_path, f"{kind}.csv") for kind in (COST, FUEL)}
+    lines: List[str] = sorted_export().decode().splitlines()[1:]
+    records, errors = parse_batch(lines, False, 0)
+    assert not errors
+    emitter = OrderedEmitter(lambda kind: StreamWriter(paths[kind], kind), window=4)
+    emitter.add_records(records[:10])
+    # the newest records over window size are already written with headers
+    written = [
+        read(path).splitlines() for path in paths.values() if os.path.exists(path)
+    ]
+    assert sum(len(item) - 1 for item in written) == 6
+    # records newer than already emitted ones
+    emitter.add_records(records[:2])
+    costs, fuels = emitter.finish()
+    assert emitter.late == 2
+    assert costs + fuels == 12
+
+
+# #[EOF]#######################################################################
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+  test_parallel.py
+  Author : Jacek 'Szumak' Kotlarski --<szumak@virthost.pl>
+  Created: 16.10.2026, 23:31:05
+
+  Purpose: Tests of parallel parsing on a process pool.
+"""
+
+import os, subprocess, sys
+
+from typing import List
+
+from libs.conversion import FUELS_FILE, Conversion
+from libs.parallel import START_METHOD, ParallelParser
+from libs.streaming import StreamingConversion
+from libs.synthetic import export_bytes
+from tests.conftest import INVALID, export, run_converter
+
+
+def test_same_order(tmp_path) -> None:
+    """Parallel parsing gives the same records, errors and order."""
+    lines: List[str] = export(300).decode().splitlines() + INVALID
+    rows = Conversion(miles=True)
+    rows.add_batch(lines)
+    parallel = Conversion(miles=True)
+    stream = StreamingConversion(miles=True, memory_limit=2000, tmp_dir=str(tmp_path))
+    parser = ParallelParser(3, miles=True, depth=2)
+    for i in range(0, len(lines), 17):
+        for parsed in parser.submit(lines[i : i + 17]):
+            parallel.add_records(*parsed)
+            stream.add_records(*parsed)
+    for parsed in parser.finish():
+        parallel.add_records(*parsed)
+        stream.add_records(*parsed)
+    assert parallel.count == rows.count
+    assert parallel.convert() == rows.convert() == stream.convert()
+    assert parallel.pop_errors() == rows.pop_errors() == stream.pop_errors()
+
+
+def test_jobs(monkeypatch, signals, tmp_path) -> None:
+    """Converter with jobs option writes the same files."""
+    one: str = os.path.join(tmp_path, "one")
+    many: str = os.path.join(tmp_path, "many")
+    run_converter(monkeypatch, export(500), "-o", one)
+    run_converter(monkeypatch, export(500), "-o", many, "-j", "2")
+    with open(os.path.join(one, FUELS_FILE), "rb") as file:
+        expected: bytes = file.read()
+    with open(os.path.join(many, FUELS_FILE), "rb") as file:
+        assert file.read() == expected
+
+
+def test_jobs_stdin(tmp_path) -> None:
+    """Workers are not forked while the reader thread holds STDIN lock."""
+    assert START_METHOD != "fork"
+    path: str = os.path.join(tmp_path, "motostat.csv")
+    with open(path, "wb") as file:
+        file.write(export_bytes(20000))
+    root: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    for i in range(3):
+        out: str = os.path.join(tmp_path, f"out{i}")
+        os.mkdir(out)
+        with open(path, "rb") as stdin:
+            result = subprocess.run(
+                [sys.executable, "start.py", "-j", "4", "-o", out],
+                stdin=stdin,
+                capture_output=True,
+                cwd=root,
+                timeout=60,
+            )
+        assert result.returncode == 0
+        assert os.path.getsize(os.path.join(out, FUELS_FILE)) > 0
+
+
+# #[EOF]#######################################################################
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""
+  test_profiling.py
+  Author : Jacek 'Szumak' Kotlarski --<szumak@virthost.pl>
+  Created: 17.10.2026, 05:12:40
+
+  Purpose: Tests of per-stage profiling reports.
+"""
+
+import os, pstats
+
+from libs.profiling import StageProfiler
+from libs.stats import STAGES
+from tests.conftest import export, run_converter
+
+
+def test_profile(monkeypatch, signals, tmp_path) -> None:
+    """Every stage has pstats and memory report in profile directory."""
+    profile: str = os.path.join(tmp_path, "profile")
+    run_converter(monkeypatch, export(), "-o", str(tmp_path), "--profile", profile)
+    assert os.path.exists(os.path.join(tmp_path, "spritmonitor_fuels.csv"))
+    for stage in STAGES:
+        path: str = os.path.join(profile, f"{stage}.pstats")
+        assert pstats.Stats(path).total_calls > 0
+        with open(os.path.join(profile, f"{stage}.memory.txt")) as file:
+            report: str = file.read()
+        assert report.startswith(f"stage: {stage}\n")
+        assert "peak traced memory of process during stage:" in report
+
+
+def test_concurrent_peak(tmp_path) -> None:
+    """Stage entered in another thread does not reset the peak of a stage."""
+    profiler = StageProfiler(str(tmp_path))
+    parse = profiler.enter("parse")
+    data = bytearray(10 * 1024 * 1024)
+    del data
+    # the second segment starts while the first one is running
+    write = profiler.enter("write")
+    profiler.exit("parse", parse)
+    profiler.exit("write", write)
+    profiler.write()
+    with open(os.path.join(tmp_path, "parse.memory.txt")) as file:
+        peak: int = int(file.read().split("during stage: ")[1].split()[0])
+    assert peak >= 10 * 1024 * 1024
+
+
+# #[EOF]#######################################################################
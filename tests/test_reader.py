@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+  test_reader.py
+  Author : Jacek 'Szumak' Kotlarski --<szumak@virthost.pl>
+  Created: 18.10.2026, 11:05:32
+
+  Purpose: Tests of bulk readers of motostat csv input.
+"""
+
+import hashlib, io, os
+
+from typing import List
+
+import pytest
+
+from libs.reader import ChunkReader, MmapReader, RecordSplitter, record_bounds
+from libs.synthetic import export_bytes
+from tests.conftest import MULTILINE
+
+# records with multi-line note, empty line and non-ASCII characters
+DATA: bytes = 'a;1\n"x\r\ny\r\nz";2\n\nżółć;3\nlast'.encode()
+RECORDS: List[str] = ["a;1", '"x\r\ny\r\nz";2', "", "żółć;3", "last"]
+
+
+def split(data: bytes, size: int) -> List[str]:
+    """Returns records of data fed to splitter in chunks of given size."""
+    splitter = RecordSplitter()
+    out: List[str] = []
+    for i in range(0, len(data), size):
+        out.extend(splitter.feed(data[i : i + size]))
+    return out + splitter.flush()
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 5, 8, 1024])
+def test_splitter_chunks(size: int) -> None:
+    """Records split between chunks are joined, '\\r\\n' does not end them."""
+    assert split(DATA, size) == RECORDS
+    assert split(DATA + b"\n", size) == RECORDS
+
+
+def test_splitter_edges() -> None:
+    """Empty input gives no records, the last record needs no new line."""
+    assert split(b"", 1) == []
+    assert split(b"\n", 1) == [""]
+    assert split(b"only", 2) == ["only"]
+    splitter = RecordSplitter()
+    assert splitter.feed(b'a;"x\r\n') == []
+    assert splitter.buffered > 0
+    assert splitter.feed(b'y"\n') == ['a;"x\r\ny"']
+    assert splitter.buffered == 0
+
+
+@pytest.mark.parametrize("size", [1, 4, 1024])
+def test_chunk_reader(size: int) -> None:
+    """Batches of stream give the same records for any chunk size."""
+    hasher = hashlib.sha256()
+    reader = ChunkReader(io.BytesIO(DATA), chunk_size=size)
+    records: List[str] = [
+        record for batch in reader.batches(hasher) for record in batch
+    ]
+    assert records == RECORDS
+    assert reader.size == len(DATA)
+    assert hasher.digest() == hashlib.sha256(DATA).digest()
+    assert list(ChunkReader(io.BytesIO(b""), chunk_size=size).batches()) == []
+
+
+def test_record_bounds() -> None:
+    """Offsets point to records, empty lines are omitted."""
+    bounds = list(record_bounds(DATA))
+    assert [DATA[a:b].decode() for a, b in bounds] == [
+        record for record in RECORDS if record
+    ]
+    assert bounds[0] == (0, 3)
+    assert list(record_bounds(b"")) == []
+    assert list(record_bounds(b"\n\n")) == []
+    # the note at the end of input is not finished
+    assert list(record_bounds(b'a\n"x\r\n')) == [(0, 1), (2, 6)]
+    # scanned region
+    assert list(record_bounds(DATA, 4, 14)) == [(4, 14)]
+
+
+@pytest.mark.parametrize("batch_size", [1, 3, 4096])
+def test_mmap_reader(tmp_path, batch_size: int) -> None:
+    """Memory mapped file gives the same records as stream reader."""
+    path: str = os.path.join(tmp_path, "motostat.csv")
+    for data in (DATA, export_bytes(500) + MULTILINE, b""):
+        with open(path, "wb") as file:
+            file.write(data)
+        batches = list(MmapReader(path, batch_size=batch_size).batches())
+        assert all(len(batch) <= batch_size for batch in batches)
+        mapped: List[str] = [record for batch in batches for record in batch]
+        streamed: List[str] = [
+            record
+            for batch in ChunkReader(io.BytesIO(data), chunk_size=7).batches()
+            for record in batch
+            if record
+        ]
+        assert mapped == streamed
+
+
+# #[EOF]#######################################################################
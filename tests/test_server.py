@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""
+  test_server.py
+  Author : Jacek 'Szumak' Kotlarski --<szumak@virthost.pl>
+  Created: 17.10.2026, 09:05:48
+
+  Purpose: Tests of HTTP conversion service.
+"""
+
+import gzip, io, os, socket, time, zipfile
+
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event, Thread
+from typing import Iterator, Tuple
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+import pytest
+
+from libs.server import ConversionServer, ConversionService, parse_address
+from tests.conftest import MULTILINE, export, run_converter
+
+
+class BlockingExecutor(ThreadPoolExecutor):
+    """Executor holding conversions until released."""
+
+    def __init__(self) -> None:
+        ThreadPoolExecutor.__init__(self, max_workers=4)
+        self.started = Event()
+        self.release = Event()
+
+    def submit(self, fn, *args, **kwargs):
+        def wait():
+            self.started.set()
+            self.release.wait(5)
+            return fn(*args, **kwargs)
+
+        return ThreadPoolExecutor.submit(self, wait)
+
+
+def serve(server: ConversionServer) -> Iterator[str]:
+    """Runs server in thread, yields its url."""
+    thread = Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture(scope="module")
+def url() -> Iterator[str]:
+    """Returns url of server with one worker process."""
+    yield from serve(ConversionServer(("127.0.0.1", 0), ConversionService(jobs=1)))
+
+
+def post(url: str, data: bytes) -> Tuple[int, bytes, dict]:
+    """Returns status, body and headers of POST request."""
+    try:
+        with urlopen(Request(url, data=data, method="POST")) as response:
+            return response.status, response.read(), dict(response.headers)
+    except HTTPError as ex:
+        return ex.code, ex.read(), dict(ex.headers)
+
+
+def read(path: str) -> bytes:
+    with open(path, "rb") as file:
+        return file.read()
+
+
+def test_convert(monkeypatch, signals, tmp_path, url) -> None:
+    """Zip and selected files are the same as files written by converter."""
+    run_converter(monkeypatch, export(), "-o", str(tmp_path))
+    costs: bytes = read(os.path.join(tmp_path, "spritmonitor_costs.csv"))
+    fuels: bytes = read(os.path.join(tmp_path, "spritmonitor_fuels.csv"))
+    status, body, headers = post(f"{url}/convert", gzip.compress(export()))
+    assert status == 200
+    assert headers["Content-Type"] == "application/zip"
+    assert headers["X-Skipped-Rows"] == "0"
+    with zipfile.ZipFile(io.BytesIO(body)) as archive:
+        assert archive.read("spritmonitor_costs.csv") == costs
+        assert archive.read("spritmonitor_fuels.csv") == fuels
+    assert post(f"{url}/convert?file=fuels", export())[1] == fuels
+    assert post(f"{url}/convert?file=costs", export())[1] == costs
+    assert post(f"{url}/convert?file=other", export())[0] == 400
+    assert post(f"{url}/other", export())[0] == 404
+
+
+def test_metrics(url) -> None:
+    """Metrics count conversions and records."""
+    post(f"{url}/convert?file=costs", export())
+    with urlopen(f"{url}/metrics") as response:
+        lines = response.read().decode().splitlines()
+    assert "motostat_server_in_flight 0" in lines
+    assert "motostat_server_max_requests 2" in lines
+    conversions = [x for x in lines if x.startswith("motostat_server_conversions")]
+    assert int(conversions[0].split()[1]) >= 1
+    with urlopen(f"{url}/health") as response:
+        assert response.read() == b"ok\n"
+
+
+def test_concurrency_limit() -> None:
+    """Requests over the limit are rejected with 503."""
+    executor = BlockingExecutor()
+    service = ConversionService(max_requests=1, executor=executor)
+    for url in serve(ConversionServer(("127.0.0.1", 0), service)):
+        first: list = []
+        thread = Thread(target=lambda: first.append(post(f"{url}/convert", export())))
+        thread.start()
+        assert executor.started.wait(5)
+        status, _, headers = post(f"{url}/convert", export())
+        assert status == 503
+        assert headers["Retry-After"] == "1"
+        executor.release.set()
+        thread.join(5)
+        assert first[0][0] == 200
+        assert "motostat_server_rejected_total 1" in service.metrics()
+    executor.shutdown()
+
+
+def test_slot_before_body() -> None:
+    """The slot is taken before the upload is read, not after."""
+    service = ConversionService(max_requests=1, executor=ThreadPoolExecutor(1))
+    for url in serve(ConversionServer(("127.0.0.1", 0), service)):
+        data: bytes = export()
+        with socket.create_connection(
+            ("127.0.0.1", int(url.rsplit(":", 1)[1]))
+        ) as sock:
+            sock.sendall(
+                b"POST /convert?file=fuels HTTP/1.0\r\n"
+                + f"Content-Length: {len(data)}\r\n\r\n".encode()
+                + data[:100]
+            )
+            # the first upload is still being sent
+            for _ in range(50):
+                if "motostat_server_in_flight 1" in service.metrics():
+                    break
+                time.sleep(0.01)
+            assert post(f"{url}/convert", export())[0] == 503
+            sock.sendall(data[100:])
+            response: bytes = b"".join(iter(lambda: sock.recv(65536), b""))
+        assert response.startswith(b"HTTP/1.0 200")
+        assert post(f"{url}/convert", export())[0] == 200
+
+
+def test_multiline_note(url) -> None:
+    """Records with multi-line notes are converted, not skipped."""
+    status, body, headers = post(f"{url}/convert?file=fuels", export() + MULTILINE)
+    assert status == 200
+    assert headers["X-Skipped-Rows"] == "0"
+    assert b"first\r\nsecond; line" in body
+    # header, 34 fuelings of export and the record with note
+    assert body.count(b"\n") - body.count(b"\r\n") == 36
+
+
+def test_bind_error(monkeypatch, signals) -> None:
+    """Worker pool is stopped when the port cannot be bound."""
+    closed = []
+    monkeypatch.setattr(ConversionService, "close", lambda self: closed.append(1))
+    with socket.socket() as busy:
+        busy.bind(("127.0.0.1", 0))
+        busy.listen()
+        run_converter(monkeypatch, b"", "--serve", f"127.0.0.1:{busy.getsockname()[1]}")
+    assert closed
+
+
+def test_parse_address() -> None:
+    assert parse_address("8080") == ("127.0.0.1", 8080)
+    assert parse_address("0.0.0.0:80") == ("0.0.0.0", 80)
+    with pytest.raises(ValueError):
+        parse_address("localhost:http")
+
+
+# #[EOF]#######################################################################
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""
+  test_stats.py
+  Author : Jacek 'Szumak' Kotlarski --<szumak@virthost.pl>
+  Created: 17.10.2026, 03:58:12
+
+  Purpose: Tests of run statistics and metrics export.
+"""
+
+import json, os, re
+
+from libs.stats import STAGES
+from tests.conftest import export, run_converter
+
+
+def test_stats(monkeypatch, signals, tmp_path) -> None:
+    """Statistics of the run are written as JSON and Prometheus textfile."""
+    stats: str = os.path.join(tmp_path, "stats.json")
+    metrics: str = os.path.join(tmp_path, "motostat.prom")
+    data: bytes = export()
+    run_converter(
+        monkeypatch,
+        data,
+        "-o",
+        str(tmp_path),
+        "--stats",
+        stats,
+        "--metrics",
+        metrics,
+    )
+    with open(stats) as file:
+        report = json.load(file)
+    counters = report["counters"]
+    assert counters["lines_read"] == 51
+    assert counters["records_parsed"] == 50
+    assert counters["records_skipped"] == 0
+    assert counters["costs_emitted"] == 16
+    assert counters["fuels_emitted"] == 34
+    assert counters["bytes_in"] == len(data)
+    assert counters["bytes_out"] == sum(
+        os.path.getsize(os.path.join(tmp_path, name))
+        for name in ("spritmonitor_costs.csv", "spritmonitor_fuels.csv")
+    )
+    assert sorted(report["stages"]) == sorted(STAGES)
+    assert report["stages"]["parse"]["wall"] > 0
+    assert report["records_per_second"] > 0
+    assert report["peak_rss"] > 0
+    assert report["queue"]["lines"] == 51
+
+    with open(metrics) as file:
+        lines = file.read().splitlines()
+    sample = re.compile(r'^motostat_[a-z_]+(\{[a-z]+="[a-z]+"\})? [0-9.e+-]+$')
+    for line in lines:
+        assert line.startswith("# ") or sample.match(line), line
+    assert 'motostat_records_emitted{type="fuel"} 34' in lines
+    assert "motostat_records_parsed 50" in lines
+
+
+# #[EOF]#######################################################################
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""
+  test_streaming.py
+  Author : Jacek 'Szumak' Kotlarski --<szumak@virthost.pl>
+  Created: 16.10.2026, 17:58:31
+
+  Purpose: Tests of bounded memory conversion with external merge sort.
+"""
+
+import os
+
+from typing import List
+
+import libs.streaming
+
+from libs.conversion import Conversion
+from libs.streaming import StreamingConversion, _escape, _unescape
+from tests.conftest import export
+
+
+def test_escape() -> None:
+    """Spilled lines keep new lines and backslashes."""
+    for line in ['"a\r\nb"', "x\\", "\\n\n\\\\n", "plain"]:
+        assert "\n" not in _escape(line)
+        assert _unescape(_escape(line)) == line
+
+
+def test_merge_runs(tmp_path) -> None:
+    """Merged runs give the same output as in memory conversion."""
+    lines: List[str] = export(300).decode().splitlines()
+    lines.insert(
+        20,
+        ';999;;2024-05-03;12;5;100;10;1;1;"multi\r\nline\\ note";full;summer;'
+        'normal;1;0;1;;;0;PLN;"Diesel";""',
+    )
+    rows = Conversion()
+    rows.add_batch(lines)
+    stream = StreamingConversion(memory_limit=2000, tmp_dir=str(tmp_path))
+    for i in range(0, len(lines), 10):
+        stream.add_batch(lines[i : i + 10])
+    assert stream.runs > 5
+    assert stream.records == rows.records
+    assert stream.convert() == rows.convert()
+    assert os.listdir(tmp_path) == []
+
+
+def test_bounded_fan_in(tmp_path, monkeypatch) -> None:
+    """Many runs are merged in groups with bounded number of open files."""
+    lines: List[str] = export(200).decode().splitlines()
+    rows = Conversion()
+    rows.add_batch(lines)
+    opened: List[int] = [0, 0]
+
+    class Tracked:
+        """File wrapper counting open run files."""
+
+        def __init__(self, *args, **kwargs) -> None:
+            self.file = open(*args, **kwargs)
+            opened[0] += 1
+            opened[1] = max(opened)
+
+        def __iter__(self):
+            return iter(self.file)
+
+        def close(self) -> None:
+            self.file.close()
+            opened[0] -= 1
+
+    monkeypatch.setattr(libs.streaming, "open", Tracked, raising=False)
+    stream = StreamingConversion(memory_limit=1, tmp_dir=str(tmp_path), fan_in=3)
+    for i in range(0, len(lines), 3):
+        stream.add_batch(lines[i : i + 3])
+    assert stream.runs > 50
+    assert stream.convert() == rows.convert()
+    assert opened == [0, 2]
+    assert os.listdir(tmp_path) == []
+
+
+def test_write(tmp_path) -> None:
+    """Files are written straight from merge."""
+    lines: List[str] = export(100).decode().splitlines()
+    rows = Conversion()
+    rows.add_batch(lines)
+    stream = StreamingConversion(memory_limit=1000, tmp_dir=str(tmp_path))
+    for i in range(0, len(lines), 7):
+        stream.add_batch(lines[i : i + 7])
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    assert stream.write(str(tmp_path / "a")) == rows.write(str(tmp_path / "b"))
+    for name in os.listdir(tmp_path / "b"):
+        assert (tmp_path / "a" / name).read_bytes() == (
+            tmp_path / "b" / name
+        ).read_bytes()
+    assert sorted(os.listdir(tmp_path)) == ["a", "b"]
+
+
+# #[EOF]#######################################################################
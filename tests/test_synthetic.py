@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""
+  test_synthetic.py
+  Author : Jacek 'Szumak' Kotlarski --<szumak@virthost.pl>
+  Created: 17.10.2026, 06:07:19
+
+  Purpose: Tests of synthetic motostat export generator.
+"""
+
+from libs.conversion import Conversion
+from libs.formatter import COST_TYPES, FUEL_CODES
+from libs.model import MOTOSTAT_HEADER
+from libs.synthetic import export_bytes, generate
+from libs.tokenizer import split_line
+
+
+def test_generate() -> None:
+    """Export is deterministic and covers columns, fuels and cost types."""
+    lines = list(generate(300))
+    assert lines == list(generate(300))
+    assert lines != list(generate(300, seed=1))
+    assert lines[0] == ";".join(MOTOSTAT_HEADER)
+    assert len(lines) == 301
+    rows = [split_line(line) for line in lines[1:]]
+    assert {len(row) for row in rows} == {21, 23}
+    assert {row[2] for row in rows if row[0]} == set(COST_TYPES)
+    assert {row[21].strip('"') for row in rows if row[1]} == set(FUEL_CODES)
+    assert any(";" in row[10] for row in rows)
+
+
+def test_parse() -> None:
+    """All generated rows are parsed and converted."""
+    conversion = Conversion()
+    conversion.add_batch(export_bytes(1000).decode().splitlines())
+    assert conversion.records == 1000
+    assert conversion.skipped == 0
+    costs, fuels = conversion.convert()
+    assert len(costs) == 333
+    assert len(fuels) == 667
+
+
+# #[EOF]#######################################################################
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""
+  test_tokenizer.py
+  Author : Jacek 'Szumak' Kotlarski --<szumak@virthost.pl>
+  Created: 16.10.2026, 13:05:51
+
+  Purpose: Equivalence tests and benchmark of motostat csv tokenizer.
+"""
+
+import itertools, time
+
+from typing import Callable, List
+
+import pytest
+
+from libs.tokenizer import SPLIT_REGEX, split_line
+
+FUELING: str = (
+    ";1002;;2024-05-03;12;55;15000;512.3;40.12;250.50;{note};full;summer;"
+    'normal;1;0;1;;;0;PLN;"Diesel";"Orlen"'
+)
+
+
+@pytest.mark.parametrize(
+    "note",
+    [
+        '""',
+        '"note; with ; semicolons"',
+        '"it\'s; here"',
+        "\"isn't; 'quoted; text'; end\"",
+        '"first\r\nsecond; line"',
+        '"\'"',
+        '"unbalanced \'apostrophe; ; "',
+        '";;;"',
+        "plain; text",
+        "",
+    ],
+)
+def test_quoted_notes(note: str) -> None:
+    """Tokenizer returns the same fields as the lookahead regex."""
+    line: str = FUELING.format(note=note)
+    assert split_line(line) == SPLIT_REGEX.split(line)
+
+
+def test_all_short_lines() -> None:
+    """Every combination of special characters is split like by regex."""
+    for size in range(9):
+        for chars in itertools.product(";\"'a", repeat=size):
+            line: str = "".join(chars)
+            assert split_line(line) == SPLIT_REGEX.split(line), line
+
+
+def best_time(func: Callable[[str], List[str]], line: str, rounds: int = 5) -> float:
+    """Returns the best time of func call."""
+    out: List[float] = []
+    for _ in range(rounds):
+        start: float = time.perf_counter()
+        func(line)
+        out.append(time.perf_counter() - start)
+    return min(out)
+
+
+@pytest.mark.parametrize(
+    "note",
+    [
+        '"' + "long note; " * 400 + '"',
+        '"' + "it's; long; note " * 10 + '"',
+    ],
+)
+def test_benchmark_long_notes(note: str) -> None:
+    """Tokenizer is faster than the lookahead regex on long notes."""
+    line: str = FUELING.format(note=note)
+    regex: float = best_time(SPLIT_REGEX.split, line)
+    tokenizer: float = best_time(split_line, line)
+    print(f"regex: {regex * 1e6:.1f}us, tokenizer: {tokenizer * 1e6:.1f}us")
+    assert tokenizer * 2 < regex
+
+
+# #[EOF]#######################################################################
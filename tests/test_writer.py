@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+  test_writer.py
+  Author : Jacek 'Szumak' Kotlarski --<szumak@virthost.pl>
+  Created: 17.10.2026, 00:46:52
+
+  Purpose: Tests of buffered and atomic output writers.
+"""
+
+import os
+
+import pytest
+
+from libs import writer
+from libs.writer import AtomicCsvWriter, file_mode, write_csv_files
+
+
+def test_atomic(tmp_path) -> None:
+    """Interrupted writing leaves the old file untouched."""
+    path: str = os.path.join(tmp_path, "out.csv")
+    with open(path, "w") as file:
+        file.write("h\nold\n")
+    with pytest.raises(KeyboardInterrupt):
+        with AtomicCsvWriter(path, "h") as writer:
+            writer.write_lines(["new"] * 100000)
+            raise KeyboardInterrupt()
+    with open(path) as file:
+        assert file.read() == "h\nold\n"
+    assert os.listdir(tmp_path) == ["out.csv"]
+
+
+def test_write_files(tmp_path) -> None:
+    """Files are written concurrently, appended lines keep one header."""
+    costs: str = os.path.join(tmp_path, "costs.csv")
+    fuels: str = os.path.join(tmp_path, "fuels.csv")
+    lines = [f"{i}" for i in range(20000)]
+    assert write_csv_files([(costs, "c", lines), (fuels, "f", [])]) == [20000, 0]
+    assert write_csv_files([(costs, "c", ["x"])], append=True, fsync=True) == [1]
+    with open(costs) as file:
+        assert file.read() == "c\n" + "\n".join(lines) + "\nx\n"
+    assert not os.path.exists(fuels)
+    with open(os.path.join(tmp_path, "plain.csv"), "w"):
+        pass
+    mode: int = os.stat(os.path.join(tmp_path, "plain.csv")).st_mode & 0o777
+    assert os.stat(costs).st_mode & 0o777 == mode
+
+
+def test_file_mode(monkeypatch, tmp_path) -> None:
+    """Mode is read without changing umask, probe file is removed."""
+    umask: int = os.umask(0o027)
+    try:
+        assert file_mode() == 0o640
+        monkeypatch.setattr(writer, "_STATUS", os.path.join(tmp_path, "missing"))
+        assert file_mode(str(tmp_path)) == 0o640
+        assert os.listdir(tmp_path) == []
+    finally:
+        os.umask(umask)
+
+
+# #[EOF]#######################################################################